@@ -0,0 +1,17 @@
+"""
+Benchmarks for dynamic_content
+
+Run from the repository root with the framework on the path, e.g.
+
+    PYTHONPATH=dynamic_content python3 -m benchmarks.pipeline
+
+benchmarks.micro measures leaf components (parsers, path maps, headers,
+ html rendering) at growing input sizes, benchmarks.load drives a
+ running server over sockets.
+
+Results can be stored as a json baseline (--save-baseline) and
+ compared against in later runs (--baseline).
+"""
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
@@ -0,0 +1,251 @@
+"""
+Measurement, reporting and baseline handling shared by the benchmarks
+"""
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+clock = time.perf_counter
+
+
+def percentile(values, q):
+    """
+    Nearest rank percentile
+
+    :param values: sorted sequence of numbers
+    :param q: percentile in 0..100
+    :return: value or None for an empty sequence
+    """
+    if not values:
+        return None
+    rank = max(int(math.ceil(q / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class Result(object):
+    """
+    Measurements of one benchmark
+    """
+    __slots__ = 'name', 'timings', 'alloc_bytes', 'retained_bytes', 'errors'
+
+    def __init__(self, name, timings, alloc_bytes=None, retained_bytes=None,
+                 errors=0):
+        self.name = name
+        self.timings = sorted(timings)
+        self.alloc_bytes = alloc_bytes
+        self.retained_bytes = retained_bytes
+        self.errors = errors
+
+    @property
+    def ops_per_sec(self):
+        total = sum(self.timings)
+        return len(self.timings) / total if total else 0.0
+
+    @property
+    def p50(self):
+        return percentile(self.timings, 50)
+
+    @property
+    def p99(self):
+        return percentile(self.timings, 99)
+
+    def to_dict(self):
+        return {
+            'ops_per_sec': self.ops_per_sec,
+            'p50': self.p50,
+            'p99': self.p99,
+            'alloc_bytes': self.alloc_bytes,
+            'retained_bytes': self.retained_bytes,
+            'errors': self.errors,
+            'iterations': len(self.timings)
+        }
+
+
+def measure(name, function, iterations=1000, warmup=100, allocations=True):
+    """
+    Time function calls and optionally trace their allocations
+
+    Allocations are measured in a separate, shorter pass since
+     tracemalloc slows down execution considerably.
+
+    :param name: benchmark name
+    :param function: callable without arguments
+    :param iterations: timed calls
+    :param warmup: untimed calls before measuring
+    :param allocations: whether to measure allocations
+    :return: Result
+    """
+    errors = 0
+    for _ in range(warmup):
+        function()
+
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            start = clock()
+            try:
+                function()
+            except Exception:
+                errors += 1
+            timings.append(clock() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    alloc_bytes = retained_bytes = None
+    if allocations:
+        alloc_bytes, retained_bytes = measure_allocations(
+            function, max(iterations // 10, 10)
+        )
+    return Result(name, timings, alloc_bytes, retained_bytes, errors)
+
+
+def measure_allocations(function, iterations):
+    """
+    Average peak allocation and retained memory per call
+
+    :param function: callable without arguments
+    :param iterations: number of traced calls
+    :return: (peak bytes per call, retained bytes per call)
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        before, _ = tracemalloc.get_traced_memory()
+        peaks = 0
+        for _ in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            try:
+                function()
+            except Exception:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            peaks += peak - current
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+    return peaks // iterations, (after - before) // iterations
+
+
+def environment():
+    """
+    Description of the interpreter and machine for the baseline file
+
+    :return: dict
+    """
+    return {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system()
+    }
+
+
+def save_baseline(results, path):
+    """
+    Write results as json baseline
+
+    :param results: iterable of Result
+    :param path: file path
+    :return: None
+    """
+    with open(str(path), 'w') as file:
+        json.dump(
+            {
+                'environment': environment(),
+                'results': {r.name: r.to_dict() for r in results}
+            },
+            file,
+            indent=2,
+            sort_keys=True
+        )
+
+
+def load_baseline(path):
+    """
+    Read a json baseline
+
+    :param path: file path
+    :return: dict {name: result dict}
+    """
+    with open(str(path)) as file:
+        return json.load(file)['results']
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Find results that regressed compared to the baseline
+
+    A result regresses if its throughput dropped or its p99
+     latency grew by more than tolerance.
+
+    :param results: iterable of Result
+    :param baseline: dict as returned by load_baseline()
+    :param tolerance: allowed relative change
+    :return: list of (name, metric, baseline value, current value)
+    """
+    regressions = []
+    for result in results:
+        old = baseline.get(result.name)
+        if old is None:
+            continue
+        if result.ops_per_sec < old['ops_per_sec'] * (1 - tolerance):
+            regressions.append(
+                (result.name, 'ops_per_sec', old['ops_per_sec'], result.ops_per_sec)
+            )
+        if old['p99'] and result.p99 > old['p99'] * (1 + tolerance):
+            regressions.append((result.name, 'p99', old['p99'], result.p99))
+    return regressions
+
+
+def _change(new, old):
+    if not old or new is None:
+        return ''
+    return '{:+.1f}%'.format((new - old) / old * 100)
+
+
+def report(results, baseline=None, file=sys.stdout):
+    """
+    Print a table of results, with relative changes if a baseline is given
+
+    :param results: iterable of Result
+    :param baseline: dict as returned by load_baseline() or None
+    :param file: output stream
+    :return: None
+    """
+    baseline = baseline or {}
+    row = '{:<24} {:>10} {:>8} {:>10} {:>8} {:>10} {:>10} {:>10} {:>6}'
+    print(row.format(
+        'benchmark', 'ops/sec', '', 'p50 ms', 'p99 ms', '',
+        'alloc KiB', 'kept B', 'errors'
+    ), file=file)
+    for result in results:
+        old = baseline.get(result.name, {})
+        print(row.format(
+            result.name,
+            '{:.1f}'.format(result.ops_per_sec),
+            _change(result.ops_per_sec, old.get('ops_per_sec')),
+            '{:.3f}'.format(result.p50 * 1000),
+            '{:.3f}'.format(result.p99 * 1000),
+            _change(result.p99, old.get('p99')),
+            '-' if result.alloc_bytes is None
+            else '{:.1f}'.format(result.alloc_bytes / 1024),
+            '-' if result.retained_bytes is None else result.retained_bytes,
+            result.errors
+        ), file=file)
@@ -0,0 +1,485 @@
+"""
+Socket level load generator and soak test
+
+Starts the application in a separate process on localhost, using the
+ plain http or the wsgi server, and sends a configurable mix of requests
+ from concurrent client threads over real sockets. Throughput, latency
+ percentiles, error rates and status codes are reported, the server
+ process' RSS, open file descriptors and database table sizes are
+ sampled over time.
+
+In soak mode (--soak) the samples are checked for steady growth,
+ which uncovers leaks like file handles that are never closed or
+ tables that grow with every request. The exit code is 1 if growth
+ was detected.
+
+    PYTHONPATH=dynamic_content python3 -m benchmarks.load \\
+        --server plain --concurrency 8 --duration 30
+    PYTHONPATH=dynamic_content python3 -m benchmarks.load \\
+        --soak --duration 600 --sample-interval 5
+"""
+import argparse
+import collections
+import http.client
+import os
+import pathlib
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import _harness
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+REPOSITORY = pathlib.Path(__file__).resolve().parent.parent
+
+DEMO_APP = REPOSITORY / 'demo_app'
+
+RequestSpec = collections.namedtuple(
+    'RequestSpec', ('method', 'path', 'body', 'weight')
+)
+
+default_mix = (
+    RequestSpec('GET', '/node/1', None, 5),
+    RequestSpec('GET', '/node', None, 2),
+    RequestSpec('GET', '/login', None, 1),
+    RequestSpec('GET', '/theme/default_theme/config.json', None, 2),
+)
+
+Sample = collections.namedtuple(
+    'Sample', ('time', 'requests', 'rss', 'fds', 'rows')
+)
+
+
+def parse_mix(spec):
+    """
+    Parse a request mix like 'GET /node/1=5,POST /login?username=a=1'
+
+    The query string of POST requests is sent as form encoded body.
+
+    :param spec: comma separated 'METHOD path=weight' items
+    :return: tuple of RequestSpec
+    """
+    mix = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        request, _, weight = item.rpartition('=')
+        if not request or not weight.isdigit():
+            request, weight = item, '1'
+        method, _, path = request.strip().partition(' ')
+        method = method.upper()
+        body = None
+        if method == 'POST' and '?' in path:
+            path, body = path.split('?', 1)
+        mix.append(RequestSpec(method, path.strip(), body, int(weight)))
+    if not mix:
+        raise ValueError('empty request mix')
+    return tuple(mix)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+class ServerProcess(object):
+    """
+    The application running in a child process
+
+    A temporary project directory is created with the settings of the
+     demo_app and a file based SQLite database, so that the tables can
+     be inspected from this process.
+    """
+    __slots__ = 'port', 'server', 'directory', 'database', 'process', '_tmp'
+
+    def __init__(self, port, server='plain', project=DEMO_APP):
+        self.port = port
+        self.server = server
+        self._tmp = tempfile.TemporaryDirectory(prefix='dc-load-')
+        self.directory = pathlib.Path(self._tmp.name)
+        self.database = str(self.directory / 'load.db')
+        self.process = None
+        self._prepare(pathlib.Path(project))
+
+    def _prepare(self, project):
+        from framework.util import config
+
+        settings = config.read_config(project / 'settings.yml')
+        settings['database'] = {'type': 'sqlite', 'name': self.database}
+        settings['logging_level'] = 'warning'
+        config.write_config(settings, self.directory / 'settings.yml')
+        for package in settings.get('import', ()):
+            os.symlink(
+                str(project / package), str(self.directory / package)
+            )
+
+    def start(self, timeout=60):
+        """
+        Start the server and wait until it accepts connections
+
+        :param timeout: seconds to wait
+        :return: None
+        """
+        self.process = subprocess.Popen(
+            (
+                sys.executable, str(REPOSITORY / 'dynamic_content'),
+                str(self.directory),
+                '--port', str(self.port),
+                '--host', 'localhost',
+                # __main__ takes the missing server settings from the
+                #  (empty) defaults once any of them is given
+                '--ssl_port', str(free_port()),
+                '--server', self.server
+            ),
+            # the application waits for input on stdin, keep it open
+            stdin=subprocess.PIPE,
+            cwd=str(REPOSITORY)
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    'server exited with {}'.format(self.process.returncode)
+                )
+            try:
+                socket.create_connection(('localhost', self.port), 1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError('server did not start within {}s'.format(timeout))
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._tmp.cleanup()
+
+    def rss(self):
+        """
+        Resident set size of the server process
+
+        :return: bytes or None if it cannot be determined
+        """
+        try:
+            with open('/proc/{}/status'.format(self.process.pid)) as file:
+                for line in file:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process(self.process.pid).memory_info().rss
+
+    def fds(self):
+        """
+        Number of open file descriptors of the server process
+
+        :return: int or None if it cannot be determined
+        """
+        try:
+            return len(os.listdir('/proc/{}/fd'.format(self.process.pid)))
+        except OSError:
+            return None
+
+    def rows(self):
+        """
+        Row count of every table in the database
+
+        :return: dict {table: rows}
+        """
+        try:
+            connection = sqlite3.connect(self.database, timeout=1)
+        except sqlite3.Error:
+            return {}
+        try:
+            tables = [a for a, in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )]
+            return {
+                table: connection.execute(
+                    'SELECT count(*) FROM "{}"'.format(table.replace('"', '""'))
+                ).fetchone()[0]
+                for table in tables
+            }
+        except sqlite3.Error:
+            return {}
+        finally:
+            connection.close()
+
+
+class Statistics(object):
+    """Thread safe collection of request outcomes"""
+    __slots__ = 'timings', 'codes', 'errors', '_lock'
+
+    def __init__(self):
+        self.timings = []
+        self.codes = collections.Counter()
+        self.errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def add(self, duration, code=None, error=None):
+        with self._lock:
+            self.timings.append(duration)
+            if code is not None:
+                self.codes[code] += 1
+            if error is not None:
+                self.errors[error] += 1
+
+    @property
+    def count(self):
+        return len(self.timings)
+
+
+def client(host, port, mix, statistics, stop, keep_alive=True, seed=None):
+    """
+    Send requests from the mix until stop is set
+
+    :param host:
+    :param port:
+    :param mix: tuple of RequestSpec
+    :param statistics: Statistics to record in
+    :param stop: threading.Event
+    :param keep_alive: reuse the connection between requests
+    :param seed: random seed for the request order
+    :return: None
+    """
+    choose = random.Random(seed).choices
+    weights = [spec.weight for spec in mix]
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {} if keep_alive else {'Connection': 'close'}
+    while not stop.is_set():
+        spec, = choose(mix, weights)
+        request_headers = dict(headers)
+        if spec.body is not None:
+            request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        start = _harness.clock()
+        try:
+            connection.request(
+                spec.method, spec.path,
+                body=spec.body.encode() if spec.body is not None else None,
+                headers=request_headers
+            )
+            response = connection.getresponse()
+            response.read()
+            statistics.add(_harness.clock() - start, code=response.status)
+            if not keep_alive or response.will_close:
+                connection.close()
+        except (OSError, http.client.HTTPException) as error:
+            statistics.add(
+                _harness.clock() - start, error=type(error).__name__
+            )
+            connection.close()
+    connection.close()
+
+
+def sampler(server, statistics, samples, stop, interval):
+    """
+    Record resource usage of the server every interval seconds
+
+    :return: None
+    """
+    start = time.time()
+    while True:
+        samples.append(Sample(
+            time.time() - start,
+            statistics.count,
+            server.rss(),
+            server.fds(),
+            server.rows()
+        ))
+        if stop.wait(interval):
+            return
+
+
+def slope(points):
+    """
+    Least squares slope of (x, y) points
+
+    :param points: list of (x, y)
+    :return: slope or 0.0 for fewer than two distinct x
+    """
+    points = [(x, y) for x, y in points if y is not None]
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, y in points) / n
+    mean_y = sum(y for x, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, y in points)
+    if not var:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def detect_growth(samples, warmup=0.2, rss_per_minute=1024 * 1024,
+                  fds_per_kilo_request=1.0, rows_per_kilo_request=1.0):
+    """
+    Check the resource samples of a soak run for steady growth
+
+    The first warmup fraction of the samples is ignored, caches and
+     pools are expected to fill up there.
+
+    :param samples: list of Sample
+    :param warmup: fraction of samples to ignore
+    :param rss_per_minute: accepted RSS growth in bytes per minute
+    :param fds_per_kilo_request: accepted fd growth per 1000 requests
+    :param rows_per_kilo_request: accepted row growth per 1000 requests
+    :return: list of human readable findings
+    """
+    samples = samples[int(len(samples) * warmup):]
+    findings = []
+    if len(samples) < 3:
+        return findings
+
+    rss = slope([(s.time / 60, s.rss) for s in samples])
+    if rss > rss_per_minute:
+        findings.append(
+            'RSS grows by {:.2f} MiB/min'.format(rss / 1024 / 1024)
+        )
+    fds = slope([(s.requests / 1000, s.fds) for s in samples])
+    if fds > fds_per_kilo_request:
+        findings.append(
+            'open file descriptors grow by {:.1f} per 1000 requests'.format(fds)
+        )
+    for table in sorted(samples[-1].rows):
+        rows = slope([(s.requests / 1000, s.rows.get(table)) for s in samples])
+        if rows > rows_per_kilo_request:
+            findings.append(
+                'table {} grows by {:.1f} rows per 1000 requests'.format(
+                    table, rows
+                )
+            )
+    return findings
+
+
+def report(statistics, duration, samples, file=sys.stdout):
+    timings = sorted(statistics.timings)
+    count = len(timings)
+    failed = sum(statistics.errors.values()) + sum(
+        n for code, n in statistics.codes.items() if code >= 500
+    )
+    print('requests       {}'.format(count), file=file)
+    print('throughput     {:.1f} req/s'.format(count / duration if duration else 0), file=file)
+    for q in (50, 90, 99):
+        value = _harness.percentile(timings, q)
+        print('p{:<13} {}'.format(
+            q, '-' if value is None else '{:.2f} ms'.format(value * 1000)
+        ), file=file)
+    if timings:
+        print('max            {:.2f} ms'.format(timings[-1] * 1000), file=file)
+    print('error rate     {:.2%}'.format(failed / count if count else 0), file=file)
+    print('status codes   {}'.format(dict(sorted(statistics.codes.items()))), file=file)
+    if statistics.errors:
+        print('errors         {}'.format(dict(statistics.errors)), file=file)
+    if samples:
+        print('\n{:>8} {:>10} {:>10} {:>6}'.format(
+            'time s', 'requests', 'rss MiB', 'fds'
+        ), file=file)
+        for sample in samples:
+            print('{:>8.1f} {:>10} {:>10} {:>6}'.format(
+                sample.time,
+                sample.requests,
+                '-' if sample.rss is None
+                else '{:.1f}'.format(sample.rss / 1024 / 1024),
+                '-' if sample.fds is None else sample.fds
+            ), file=file)
+
+
+def prepare_parser():
+    parser = argparse.ArgumentParser(
+        description='Load test the http servers over real sockets'
+    )
+    parser.add_argument('--server', choices=('plain', 'wsgi'), default='plain')
+    parser.add_argument('--port', type=int, help='defaults to a free port')
+    parser.add_argument('--concurrency', '-c', type=int, default=4)
+    parser.add_argument('--duration', '-d', type=float, default=10.0,
+                        help='seconds to generate load')
+    parser.add_argument('--no-keep-alive', action='store_true',
+                        help='open a new connection for every request')
+    parser.add_argument('--mix', type=str,
+                        help="request mix like 'GET /node/1=5,GET /node=1'")
+    parser.add_argument('--sample-interval', type=float, default=1.0)
+    parser.add_argument('--soak', action='store_true',
+                        help='check the samples for resource growth')
+    parser.add_argument('--rss-threshold', type=float, default=1.0,
+                        help='accepted RSS growth in MiB per minute (soak)')
+    parser.add_argument('--project', type=str, default=str(DEMO_APP),
+                        help='application directory to run')
+    return parser
+
+
+def main(args=None):
+    """
+    Run the load test
+
+    :param args: command line arguments
+    :return: exit code, 1 if the soak test found growth
+    """
+    options = prepare_parser().parse_args(args)
+    mix = parse_mix(options.mix) if options.mix else default_mix
+    port = options.port or free_port()
+
+    server = ServerProcess(port, options.server, options.project)
+    statistics = Statistics()
+    samples = []
+    stop = threading.Event()
+    try:
+        server.start()
+        threads = [
+            threading.Thread(
+                target=client,
+                args=('localhost', port, mix, statistics, stop,
+                      not options.no_keep_alive, i)
+            )
+            for i in range(options.concurrency)
+        ]
+        monitor = threading.Thread(
+            target=sampler,
+            args=(server, statistics, samples, stop, options.sample_interval)
+        )
+        monitor.start()
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        stop.wait(options.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        duration = time.time() - start
+        monitor.join()
+    finally:
+        stop.set()
+        server.stop()
+
+    report(statistics, duration, samples)
+
+    if options.soak:
+        findings = detect_growth(
+            samples, rss_per_minute=options.rss_threshold * 1024 * 1024
+        )
+        for finding in findings:
+            print('growth detected: ' + finding)
+        if findings:
+            return 1
+        print('no resource growth detected')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
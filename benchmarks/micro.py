@@ -0,0 +1,373 @@
+"""
+Microbenchmarks of the hot leaf components
+
+Every case is measured at growing input sizes. The log-log slope of
+ time per call over input size is reported as the empirical order of
+ growth, cases growing faster than expected (e.g. quadratic where
+ linear is expected) are flagged. No application or database is
+ booted, only the framework has to be importable.
+
+    PYTHONPATH=dynamic_content python3 -m benchmarks.micro
+    PYTHONPATH=dynamic_content python3 -m benchmarks.micro \\
+        -c pathmap.multitable -c pathmap.tree --sizes 100,1000,10000
+
+Results are named '<case>[<size>]' and can be saved and compared as
+ baseline like the other benchmarks.
+"""
+import argparse
+import collections
+import logging
+import math
+import sys
+
+from . import _harness
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+DEFAULT_SIZES = (10, 100, 1000, 5000)
+
+
+Case = collections.namedtuple('Case', ('name', 'setup', 'order'))
+# setup(size) returns a callable without arguments, order is the
+# expected exponent of growth in size (0 constant, 1 linear)
+
+
+# ----------------------
+# input generators
+# ----------------------
+
+def html_document(size):
+    """
+    Html document with size sibling sections of nested elements
+
+    :param size: number of sections
+    :return: str
+    """
+    section = (
+        '<div class="section" id="s{0}">'
+        '<h2>Section {0}</h2>'
+        '<p>Some <span>text</span> with a <a href="/node/{0}">link</a></p>'
+        '</div>'
+    )
+    return '<html><body>{}</body></html>'.format(
+        ''.join(section.format(i) for i in range(size))
+    )
+
+
+def dchp_document(size):
+    """
+    Html document containing size dchp blocks between html elements
+
+    :param size: number of dchp blocks
+    :return: str
+    """
+    block = (
+        '<div><span>before {0}</span></div>\n'
+        '<?dchp\n'
+        'for number in range({0}):\n'
+        '  print(number)\n'
+        '?>\n'
+    )
+    return '<html>{}</html>'.format(
+        ''.join(block.format(i) for i in range(size))
+    )
+
+
+def route_paths(size):
+    """
+    Route patterns similar to the ones registered by modules
+
+    :param size: number of routes
+    :return: list of (pattern, example path)
+    """
+    templates = (
+        ('section{0}/page', 'section{0}/page'),
+        ('section{0}/{{int}}', 'section{0}/42'),
+        ('section{0}/{{int}}/edit', 'section{0}/42/edit'),
+        ('section{0}/files/**', 'section{0}/files/a/b/c'),
+    )
+    routes = []
+    for i in range(size):
+        pattern, example = templates[i % len(templates)]
+        routes.append((pattern.format(i), example.format(i)))
+    return routes
+
+
+def header_dict(size):
+    return {'X-Header-{}'.format(i): 'value {}'.format(i) for i in range(size)}
+
+
+# ----------------------
+# cases
+# ----------------------
+
+def html_parse(size):
+    from framework.util.parser import html
+
+    document = html_document(size)
+    return lambda: html.parse(document)
+
+
+def dchp_parse(size):
+    from framework.dchp import parser
+
+    document = dchp_document(size)
+    return lambda: parser.parse(document)
+
+
+def _pathmap(cls, size):
+    from framework import http
+    from framework.route.decorator import ControlFunction
+
+    path_map = cls()
+    routes = route_paths(size)
+    for pattern, _ in routes:
+        path_map.add_path(
+            pattern,
+            ControlFunction(lambda *args: args, pattern, 'get', False, None)
+        )
+    # resolve the first, middle and last registered route
+    requests = [
+        http.Request('localhost', 8080, routes[i][1], 'get',
+                     None, None, False, None)
+        for i in (0, len(routes) // 2, len(routes) - 1)
+    ]
+
+    def run():
+        for request in requests:
+            path_map.find_handler(request)
+    return run
+
+
+def pathmap_multitable(size):
+    from framework.route import _map
+
+    return _pathmap(_map.MultiTablePathMap, size)
+
+
+def pathmap_tree(size):
+    from framework.route import _map
+
+    return _pathmap(_map.TreePathMap, size)
+
+
+def header_auto_construct(size):
+    from framework.http import headers
+
+    raw = header_dict(size)
+    return lambda: list(headers.Header.auto_construct(raw))
+
+
+def header_map(size):
+    from framework.http import headers
+
+    raw = header_dict(size)
+
+    def run():
+        header_map = headers.HeaderMap(raw)
+        header_map.add(('Set-Cookie', 'SESS=abc'))
+        header_map['Content-Length'] = '0'
+        return header_map.to_tuple()
+    return run
+
+
+def html_render_deep(size):
+    from framework.util import html
+
+    element = 'leaf'
+    for i in range(size):
+        element = html.ContainerElement(
+            element, html_type='div', classes={'level'}, element_id=str(i)
+        )
+    return lambda: html.render(element)
+
+
+def html_render_wide(size):
+    from framework.util import html
+
+    element = html.ContainerElement(*(
+        html.ContainerElement(
+            html.A('/node/{}'.format(i), 'node {}'.format(i)),
+            html_type='li'
+        )
+        for i in range(size)
+    ), html_type='ul')
+    return lambda: html.render(element)
+
+
+CASES = (
+    Case('html.parse', html_parse, 1),
+    Case('dchp.parse', dchp_parse, 1),
+    Case('pathmap.multitable', pathmap_multitable, 0),
+    Case('pathmap.tree', pathmap_tree, 0),
+    Case('header.auto_construct', header_auto_construct, 1),
+    Case('header.map', header_map, 1),
+    Case('html.render_deep', html_render_deep, 1),
+    Case('html.render_wide', html_render_wide, 1),
+)
+
+
+# ----------------------
+# scaling analysis
+# ----------------------
+
+def growth_order(points):
+    """
+    Least squares slope of log(time) over log(size)
+
+    :param points: list of (size, seconds per call)
+    :return: exponent or None for less than two points
+    """
+    points = [(math.log(n), math.log(t)) for n, t in points if n > 0 and t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def iterations_for(size, budget):
+    """
+    Scale the iteration count down with the input size
+
+    :param size: input size
+    :param budget: iterations at size 1
+    :return: int
+    """
+    return max(budget // size, 5)
+
+
+def run_case(case, sizes, budget, allocations):
+    """
+    Measure a case at every size
+
+    :param case: Case
+    :param sizes: iterable of input sizes
+    :param budget: iteration budget, see iterations_for()
+    :param allocations: whether to measure allocations
+    :return: list of (size, Result)
+    """
+    measured = []
+    for size in sizes:
+        function = case.setup(size)
+        iterations = iterations_for(size, budget)
+        measured.append((size, _harness.measure(
+            '{}[{}]'.format(case.name, size),
+            function,
+            iterations=iterations,
+            warmup=max(iterations // 10, 1),
+            allocations=allocations
+        )))
+    return measured
+
+
+def report_scaling(scaling, margin, file=sys.stdout):
+    """
+    Print the empirical order of growth per case
+
+    :param scaling: list of (Case, exponent)
+    :param margin: accepted excess over the expected order
+    :param file: output stream
+    :return: list of names of cases growing faster than expected
+    """
+    row = '{:<24} {:>10} {:>10}  {}'
+    print(row.format('case', 'expected', 'measured', ''), file=file)
+    flagged = []
+    for case, exponent in scaling:
+        too_fast = exponent is not None and exponent > case.order + margin
+        if too_fast:
+            flagged.append(case.name)
+        print(row.format(
+            case.name,
+            'n^{}'.format(case.order),
+            '-' if exponent is None else 'n^{:.2f}'.format(exponent),
+            'SUPERLINEAR' if too_fast and case.order >= 1
+            else 'GROWING' if too_fast else ''
+        ), file=file)
+    return flagged
+
+
+def prepare_parser():
+    parser = argparse.ArgumentParser(
+        description='Microbenchmarks with scaling curves in input size'
+    )
+    parser.add_argument(
+        '--case', '-c', action='append',
+        help='only run the named case(s), one of {}'.format(
+            ', '.join(case.name for case in CASES)
+        )
+    )
+    parser.add_argument(
+        '--sizes', type=str,
+        default=','.join(map(str, DEFAULT_SIZES)),
+        help='comma separated input sizes'
+    )
+    parser.add_argument(
+        '--budget', type=int, default=20000,
+        help='iterations at size 1, scaled down linearly with the size'
+    )
+    parser.add_argument(
+        '--margin', type=float, default=0.3,
+        help='accepted excess of the measured over the expected order'
+    )
+    parser.add_argument('--baseline', type=str, help='json file to compare with')
+    parser.add_argument('--save-baseline', type=str, help='json file to write')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='relative change accepted before reporting a regression'
+    )
+    parser.add_argument(
+        '--allocations', action='store_true',
+        help='also run the tracemalloc pass'
+    )
+    return parser
+
+
+def main(args=None):
+    """
+    Run the microbenchmarks
+
+    :param args: command line arguments
+    :return: exit code, 1 if a regression or unexpected growth was found
+    """
+    options = prepare_parser().parse_args(args)
+    sizes = sorted({int(size) for size in options.sizes.split(',') if size})
+
+    results = []
+    scaling = []
+    for case in CASES:
+        if options.case and case.name not in options.case:
+            continue
+        logging.getLogger(__name__).info('running ' + case.name)
+        measured = run_case(case, sizes, options.budget, options.allocations)
+        results.extend(result for _, result in measured)
+        scaling.append((case, growth_order(
+            [(size, result.p50) for size, result in measured]
+        )))
+
+    baseline = _harness.load_baseline(options.baseline) if options.baseline else None
+    _harness.report(results, baseline)
+    print()
+    flagged = report_scaling(scaling, options.margin)
+
+    if options.save_baseline:
+        _harness.save_baseline(results, options.save_baseline)
+
+    regressions = []
+    if baseline is not None:
+        regressions = _harness.compare(results, baseline, options.tolerance)
+        for name, metric, old, new in regressions:
+            print('regression in {}: {} {:.6g} -> {:.6g}'.format(
+                name, metric, old, new
+            ))
+    return 1 if regressions or flagged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+In-process benchmark of the request pipeline
+
+Boots the loader with the demo_app (an in-memory SQLite database filled
+ by demo_app/tss.py) and drives AppThread.process_request directly with
+ synthetic requests for representative routes. No sockets are involved,
+ see benchmarks.load for end to end measurements.
+
+    PYTHONPATH=dynamic_content python3 -m benchmarks.pipeline \\
+        --save-baseline benchmarks/baseline.json
+    PYTHONPATH=dynamic_content python3 -m benchmarks.pipeline \\
+        --baseline benchmarks/baseline.json
+"""
+import argparse
+import collections
+import logging
+import pathlib
+import sys
+
+from . import _harness
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+DEMO_APP = pathlib.Path(__file__).resolve().parent.parent / 'demo_app'
+
+HOST = 'localhost:9012'
+
+ADMIN_USER = 'justus', '???'
+
+
+Scenario = collections.namedtuple('Scenario', ('name', 'factory', 'weight'))
+# factory() returns a new request, weight scales the iteration count
+
+
+def boot(project_dir=DEMO_APP, **overrides):
+    """
+    Load the application into this process without starting servers
+
+    :param project_dir: application directory containing settings.yml
+    :param overrides: settings to set after reading the settings file
+    :return: AppThread ready for process_request()
+    """
+    from framework import includes
+    from framework.util import config
+
+    settings = includes.get_settings()
+    settings.update(config.read_config(project_dir / 'settings.yml'))
+    settings.update(
+        project_dir=str(project_dir),
+        database={'type': 'sqlite', 'name': ':memory:'},
+        logging_level='warning'
+    )
+    settings.update(overrides)
+    sys.path.insert(0, str(project_dir))
+
+    includes._init_log()
+
+    # the orm binds the database on import, import after configuring
+    from framework.application import loader
+    from framework.http import appserver
+
+    loader.Loader().load()
+    thread = appserver.AppThread(False, 'benchmark')
+    thread.load_formatter()
+    return thread
+
+
+def make_request(path, method='get', headers=None, form=None):
+    """
+    Build a request like the servers do
+
+    :param path: path and query string
+    :param method: 'get' or 'post'
+    :param headers: dict of request headers
+    :param form: dict of form values for post requests
+    :return: http.Request
+    """
+    from framework import http
+    from urllib import parse
+
+    headers = dict(headers or {}, Host=HOST)
+    payload = None
+    if form is not None:
+        payload = parse.urlencode(form, doseq=True)
+        form = parse.parse_qs(payload)
+    return http.Request.from_path_and_post(
+        HOST, path, method, headers, False, payload=payload, form=form
+    )
+
+
+def admin_cookie():
+    """
+    Open a session for the demo admin account
+
+    :return: Cookie header value
+    """
+    from dycm.users import session
+
+    return 'SESS=' + session.start_session(*ADMIN_USER)
+
+
+def scenarios():
+    """
+    Representative requests against the demo_app
+
+    Must be called after boot().
+
+    :return: list of Scenario
+    """
+    cookie = {'Cookie': admin_cookie()}
+    return [
+        Scenario('node_view', lambda: make_request('/node/1'), 1),
+        Scenario('node_overview', lambda: make_request('/node'), 1),
+        Scenario(
+            'admin_overview',
+            lambda: make_request('/admin', headers=cookie),
+            1
+        ),
+        Scenario(
+            'login_post',
+            lambda: make_request(
+                '/login', 'post',
+                form={'username': ADMIN_USER[0], 'password': ADMIN_USER[1]}
+            ),
+            # password hashing dominates, keep the run short
+            0.02
+        ),
+        Scenario(
+            'static_file',
+            lambda: make_request('/theme/default_theme/config.json'),
+            1
+        ),
+    ]
+
+
+def runner(thread, factory):
+    """
+    Wrap a scenario into a callable that fails on error responses
+
+    :param thread: booted AppThread
+    :param factory: request factory
+    :return: callable
+    """
+    def run():
+        request = factory()
+        try:
+            response = thread.process_request(request)
+        finally:
+            request.close_files()
+        if response.code >= 400:
+            raise RuntimeError(
+                '{} answered with {}'.format(request.path, response.code)
+            )
+        return response
+    return run
+
+
+def prepare_parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark AppThread.process_request in process'
+    )
+    parser.add_argument('--iterations', '-n', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument(
+        '--scenario', '-s', action='append',
+        help='only run the named scenario(s)'
+    )
+    parser.add_argument('--baseline', type=str, help='json file to compare with')
+    parser.add_argument('--save-baseline', type=str, help='json file to write')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='relative change accepted before reporting a regression'
+    )
+    parser.add_argument(
+        '--no-allocations', action='store_true',
+        help='skip the tracemalloc pass'
+    )
+    parser.add_argument(
+        '--project', type=str, default=str(DEMO_APP),
+        help='application directory to boot'
+    )
+    return parser
+
+
+def main(args=None):
+    """
+    Run the benchmarks
+
+    :param args: command line arguments
+    :return: exit code, 1 if a regression was found
+    """
+    options = prepare_parser().parse_args(args)
+    thread = boot(pathlib.Path(options.project).resolve())
+
+    results = []
+    for scenario in scenarios():
+        if options.scenario and scenario.name not in options.scenario:
+            continue
+        logging.getLogger(__name__).info('running ' + scenario.name)
+        results.append(_harness.measure(
+            scenario.name,
+            runner(thread, scenario.factory),
+            iterations=max(int(options.iterations * scenario.weight), 10),
+            warmup=max(int(options.warmup * scenario.weight), 1),
+            allocations=not options.no_allocations
+        ))
+
+    baseline = _harness.load_baseline(options.baseline) if options.baseline else None
+    _harness.report(results, baseline)
+
+    if options.save_baseline:
+        _harness.save_baseline(results, options.save_baseline)
+
+    if baseline is not None:
+        regressions = _harness.compare(results, baseline, options.tolerance)
+        for name, metric, old, new in regressions:
+            print('regression in {}: {} {:.6g} -> {:.6g}'.format(
+                name, metric, old, new
+            ))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,7 @@ that have not been created yet.
 import pathlib
 import logging
 
+from framework import startup
 from framework.machinery import component
 from framework.includes import SettingsDict
 
@@ -14,6 +15,7 @@ __author__ = 'Justus Adam'
 __version__ = '0.2.1'
 
 
+@startup.timed('init_tables', 'db')
 @component.inject(SettingsDict)
 def init_tables(settings):
     """
@@ -28,32 +30,49 @@ def init_tables(settings):
     from framework.backend import orm
 
     def _init_module(m):
+        """
+        :return: whether all tables of m were created (none existed)
+        """
+        created = True
         for item in dir(m):
             item = getattr(m, item)
             if inspect.isclass(item) and issubclass(item, orm.Model):
                 try:
                     item.create_table()
                 except Exception as e:
+                    created = False
                     logging.getLogger(__name__).error('create_table:{}'.format(e))
+        return created
 
     c = {
         module: import_module('dycm.' + module)
         for module in settings['modules']
     }
 
-    for module in c.values():
-        _init_module(module)
+    fresh = set()
+
+    for name, module in c.items():
+        created = _init_module(module)
         try:
             m = import_module('.model', module.__name__)
-            _init_module(m)
+            created = _init_module(m) and created
         except Exception as error:
             logging.getLogger(__name__).error('init_tables:{}'.format(error))
+        if created:
+            fresh.add(name)
 
     from framework.middleware import alias, csrf
     alias.Alias.create_table()
     csrf.ARToken.create_table()
 
+    # tables created just now have the current schema already,
+    #  existing ones are brought up to date by the migrations
+    from framework.backend import migrations
+    migrations.mark_applied(fresh)
+    migrations.migrate()
+
 
+@startup.timed('initialize', 'db')
 @component.inject(SettingsDict)
 def initialize(settings):
     """
@@ -106,7 +125,9 @@ def initialize(settings):
                 'view other user info',
                 'view permissions',
                 'edit permissions',
-                'access node overview'
+                'access node overview',
+                'manage modules',
+                'access metrics'
             )
         )
     )
@@ -269,6 +290,8 @@ def initialize(settings):
 
     bodyfield = node.model.field('body')
     bodyfield.create_table()
+    from framework.backend import migrations
+    migrations.create_indexes([bodyfield])
 
     page = node.model.Page.create(
         content_type=_ct1,
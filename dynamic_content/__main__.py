@@ -141,7 +141,10 @@ def prepare_parser():
 
     parser.add_argument(
         '--mode', '-m',
-        choices=('run', 'test', 'debug', 'selftest'),
+        choices=(
+            'run', 'test', 'debug', 'selftest', 'precompress', 'migrate',
+            'checkindexes'
+        ),
         default='run'
     )
 
@@ -182,6 +185,16 @@ def prepare_parser():
         )
     parser.add_argument('--ssl_certfile', type=str)
     parser.add_argument('--ssl_keyfile', type=str)
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='print a timeline of the startup, see framework.startup'
+        )
+    parser.add_argument(
+        '--profile-trace',
+        type=str,
+        help='write the startup timeline as Chrome trace event json'
+        )
 
     return parser
 
@@ -239,6 +252,9 @@ def process_cmd_args(settings):
         settings['ssl_certfile'] = startargs.ssl_certfile
     if startargs.ssl_keyfile:
         settings['ssl_keyfile'] = startargs.ssl_keyfile
+    if startargs.profile_startup or startargs.profile_trace:
+        settings['profile_startup'] = True
+        settings['profile_trace'] = startargs.profile_trace
 
     return settings
 
@@ -284,10 +300,17 @@ def main():
 
     startargs = process_cmd_args({})
 
+    if startargs.get('profile_startup'):
+        from framework import startup
+        startup.enable(startargs.get('profile_trace'))
+
     custom_settings = get_custom_settings(startargs)
 
     update_settings(settings, custom_settings, startargs)
 
+    from framework.backend import orm
+    orm.reconnect()
+
     sys.path = [settings['project_dir']] + sys.path
 
     # omitted, due to issues
@@ -307,6 +330,48 @@ def main():
         # start the application
         athread.start()
 
+        # concurrent.futures pools (password hashing) refuse new work once
+        #  the main thread has finished, hence it waits for the application
+        athread.join()
+
+    elif startargs['mode'] == 'precompress':
+
+        # write .gz variants of static files served by the file handlers
+
+        from framework.middleware import compression
+
+        logging.getLogger(__name__).info(
+            'precompressed {} files'.format(
+                compression.precompress_from_settings()
+            )
+        )
+
+    elif startargs['mode'] == 'migrate':
+
+        # apply pending migrations and create missing indexes
+
+        from framework.backend import migrations
+
+        migrations.load()
+        logging.getLogger(__name__).info(
+            'applied {} migrations'.format(len(migrations.migrate()))
+        )
+
+    elif startargs['mode'] == 'checkindexes':
+
+        # report full table scans of the hot queries
+
+        from framework.backend import migrations
+
+        migrations.load()
+        report = migrations.check()
+        for name, scans in report.items():
+            logging.getLogger(__name__).warning(
+                '{}: {}'.format(name, '; '.join(scans))
+            )
+        if report:
+            sys.exit(1)
+
     elif startargs['mode'] == 'test':
 
         # this section does not work yet
@@ -1,4 +1,4 @@
-from . import pages, model
+from . import pages, model, modules
 from framework.util import typesafe
 from .pages import overview, category, subcategory, page
 
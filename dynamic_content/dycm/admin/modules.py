@@ -0,0 +1,60 @@
+"""Enable, disable and reload modules of the running application"""
+import logging
+
+from framework import route, http
+from framework.application import reloader
+from dycm.users import decorator as user_dec
+
+__author__ = 'Justus Adam'
+
+
+MANAGE_PERMISSION = 'manage modules'
+
+_actions = {
+    'enable': reloader.enable,
+    'disable': reloader.disable,
+    'reload': reloader.reload
+}
+
+
+def _known(action, name):
+    """
+    Only configured modules may be disabled or reloaded, enabling also
+     accepts any existing dycm module. Anything else, the framework
+     itself for instance, is off limits.
+    """
+    if reloader.is_configured(name):
+        return True
+    return action == 'enable' and reloader.is_available(name)
+
+
+def _text(code, message):
+    return http.response.Response(
+        body=message.encode('utf-8'),
+        code=code,
+        headers={'Content-Type': 'text/plain; charset=utf-8'}
+    )
+
+
+@route.controller_function(
+    'admin/modules/{str}/{str}',
+    method=http.RequestMethods.POST,
+    query=False
+    )
+@user_dec.authorize(MANAGE_PERMISSION)
+def manage_module(dc_obj, action, name):
+    if action not in _actions:
+        return _text(http.response.HttpResponseCodes.NotFound, 'unknown action')
+    if not _known(action, name):
+        return _text(http.response.HttpResponseCodes.NotFound, 'unknown module')
+    try:
+        _actions[action](name)
+    except Exception as error:
+        logging.getLogger(__name__).exception(
+            'Failed to {} module {}'.format(action, name)
+        )
+        return _text(
+            http.response.HttpResponseCodes.InternalServerError,
+            '{} {} failed: {}'.format(action, name, error)
+        )
+    return _text(http.response.HttpResponseCodes.OK, '{} {}'.format(action, name))
@@ -10,6 +10,13 @@ __author__ = 'Justus Adam'
 __version__ = '0.2'
 
 
+added_default_settings = {
+    # see decorator.RegionCache, a ttl of 0 disables the cache
+    'region_cache_ttl': 30,
+    'region_cache_stale': 300
+}
+
+
 def common_handler(item_type):
     handlers = {
         'menu': menus.Handler,
@@ -1,7 +1,10 @@
 import inspect
 import logging
 
+from framework import hooks
+from framework.application import reloader
 from framework.machinery import component
+from framework.util import module
 
 __author__ = 'Justus Adam'
 
@@ -51,3 +54,15 @@ def implements(element_type, *args, **kwargs):
         return _register(element)
     else:
         return _register
+
+
+@hooks.register()
+class CommonsUnload(reloader.UnloadHook):
+    """Remove the commons handlers of unloaded modules"""
+    __slots__ = ()
+
+    def unload(self, package):
+        mapper = get_mapper()
+        for name, handler in tuple(mapper.items()):
+            if module.defined_in(handler, package):
+                del mapper[name]
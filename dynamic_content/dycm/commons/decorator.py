@@ -1,5 +1,7 @@
 from dycm import theming
-from framework.util import decorators, structures, html
+from framework.http import coalesce
+from framework.includes import SettingsDict
+from framework.util import decorators, structures, html, stale
 from framework.machinery import component
 from . import model, page
 
@@ -86,12 +88,59 @@ def compile_region(region_name, region_config, theme, client):
         )
 
 
+@component.Component('RegionCache')
+class RegionCache(object):
+    """
+    Regions rendered for anonymous clients, served stale while
+     being refreshed in the background (see framework.util.stale)
+
+    Configured from the 'region_cache_ttl' and 'region_cache_stale'
+     settings, a ttl of 0 disables the cache.
+    """
+    __slots__ = 'cache', 'refresher'
+
+    def __init__(self):
+        self.cache = None
+        self.refresher = stale.Refresher('RegionCache-Refresh')
+
+    @component.inject_method(SettingsDict)
+    def configure(self, settings):
+        # a region that cannot be pickled is never cached, instead of
+        #  a warning on every guest request this is an error
+        self.cache = stale.StaleCache(
+            'region',
+            settings.get('region_cache_ttl', 30),
+            settings.get('region_cache_stale', 300),
+            strict=True
+        )
+
+    def get(self, request, region_name, region_config, theme, client):
+        if self.cache is None:
+            self.configure()
+        # only requests without cookies, hence without a session
+        if not self.cache.ttl or coalesce.request_key(request) is None:
+            return compile_region(region_name, region_config, theme, client)
+        return stale.fetch(
+            self.cache,
+            self.refresher,
+            (region_name, theme),
+            lambda: compile_region(region_name, region_config, theme, client)
+        )
+
+
+@component.inject(RegionCache)
+def get_region_cache(cache):
+    return cache
+
+
 def add_regions(dc_obj):
 
     def _regions(client, theme):
         config = dc_obj.config['theme_config']['regions']
+        cache = get_region_cache()
         return {
-            region: compile_region(
+            region: cache.get(
+                dc_obj.request,
                 region,
                 config[region],
                 theme,
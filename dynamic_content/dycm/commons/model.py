@@ -1,4 +1,4 @@
-from framework.backend import orm
+from framework.backend import orm, migrations
 from dycm import theming
 
 
@@ -40,3 +40,17 @@ class Common(orm.BaseModel):
     theme = orm.ForeignKeyField(theming.model.Theme)
     show_title = orm.BooleanField()
     render_args = orm.CharField(null=True)
+
+
+migrations.index(Common, 'region', 'theme')
+migrations.index(MenuItem, 'menu', 'enabled')
+
+
+@migrations.hot_query('commons of a region')
+def _region_commons():
+    return Common.select().where(Common.region == '', Common.theme == 1)
+
+
+@migrations.hot_query('enabled items of a menu')
+def _menu_items():
+    return MenuItem.select().where(MenuItem.menu == 1, MenuItem.enabled == True)
@@ -7,6 +7,7 @@ import pathlib
 from urllib import parse
 import mimetypes
 from framework import http, route, middleware
+from framework.middleware import compression
 from framework.includes import SettingsDict
 from framework.util import html, structures
 from framework.http import response
@@ -73,10 +74,17 @@ def serve_from(settings, request, file, basedir):
     else:
         if trailing_slash:
             return response.Redirect(location=request.path[:-1])
-        return response.Response(
-            body=filepath.open('rb').read(),
-            headers={'Content-Type': '{};charset={}'.format(*mimetypes.guess_type(str(filepath.name)))}
-            )
+        headers = {'Content-Type': '{};charset={}'.format(*mimetypes.guess_type(str(filepath.name)))}
+        variant = compression.precompressed_sibling(filepath)
+        if variant is not None:
+            # both variants depend on the Accept-Encoding of the request
+            headers['Vary'] = 'Accept-Encoding'
+            if compression.accepts_encoding(request, 'gzip'):
+                headers['Content-Encoding'] = 'gzip'
+                filepath = variant
+        with filepath.open('rb') as file:
+            body = file.read()
+        return response.Response(body=body, headers=headers)
 
 
 class PathHandler(middleware.Handler):
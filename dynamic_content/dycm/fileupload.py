@@ -4,9 +4,17 @@ from framework import route
 from framework import http
 
 
-@route.controller_function('/upload', method=http.RequestMethods.post, query=['file', 'name'])
-def upload(dc_obj, file, name):
-    file, name = file[0], name[0]
+@route.controller_function('/upload', method=http.RequestMethods.post, query=['name'])
+def upload(dc_obj, name):
+    uploads = dc_obj.request.files.get('file')
+    if not uploads:
+        return ':redirect:/upload/failed'
+    file = uploads[0]
+    name = name[0] if name and name[0] else file.filename
+    # never trust client supplied paths
+    name = pathlib.PurePosixPath(name.replace('\\', '/')).name
+    if '.' not in name:
+        return ':redirect:/upload/failed'
     name, ext = name.rsplit('.',1)
 
     if ext not in ['img', 'png', 'bmp']:
@@ -17,13 +25,12 @@ def upload(dc_obj, file, name):
     filepath = target_dir / (name + str(datetime.datetime.now()) + '.' + ext)
 
     if not target_dir.exists():
-        target_dir.mkdir()
+        target_dir.mkdir(parents=True)
 
     if filepath.exists():
-        new = filepath.parent / (filepath.stem + '-1' + filepath.suffix)
+        filepath = filepath.parent / (filepath.stem + '-1' + filepath.suffix)
 
-    with open(str(filepath), mode='w') as fileobj:
-        print(file, file=fileobj)
+    file.save(filepath)
 
     return ':redirect:/upload'
 
@@ -0,0 +1,26 @@
+"""Expose the framework metrics for Prometheus scrapers"""
+from framework import route, http, metrics
+from dycm.users import decorator
+
+__author__ = 'Justus Adam'
+
+
+METRICS_PERMISSION = 'access metrics'
+
+
+@route.controller_function(
+    'metrics',
+    method=http.RequestMethods.GET,
+    query=False,
+    anti_csrf=False
+    )
+@decorator.authorize(METRICS_PERMISSION)
+def metrics_page(dc_obj):
+    return http.response.Response(
+        body=metrics.get_registry().render().encode('utf-8'),
+        code=200,
+        headers={
+            'Content-Type': metrics.CONTENT_TYPE,
+            'Cache-Control': 'no-cache'
+        }
+    )
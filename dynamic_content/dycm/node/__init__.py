@@ -1,5 +1,5 @@
-from . import content_handler, field, model
-from .node import make_node
+from . import cache, content_handler, field, model, search
+from .node import make_node, Listing
 
 __author__ = 'Justus Adam'
 
@@ -9,6 +9,14 @@ role = 'page_handler'
 
 path_prefix = 'node'
 
+added_default_settings = {
+    # see cache.NodeCache, a ttl of 0 disables the cache
+    'node_cache_ttl': 300,
+    # see search.NodeSearch, 'auto', 'fts5' or 'memory'
+    'search_backend': 'auto',
+    'search_page_size': 10
+}
+
 text_field_handler = field.Field
 
 
@@ -0,0 +1,121 @@
+"""
+Rendered node parts for reuse in later views
+
+Field contents only depend on the page and the modifier, the editorial
+ links only on the page and the access group of the client. Both are
+ stored in the 'node' namespace of the 'Cache' component
+ (see framework.cache) tagged with the page, content handlers
+ invalidate the tag when a page changes.
+
+Configured from the 'node_cache_ttl' setting, a ttl of 0 disables the
+ cache.
+"""
+from framework import cache as _cache
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+def page_tag(page_id):
+    """
+    Invalidation tag of a page
+
+    :param page_id: oid of the page
+    :return: str
+    """
+    return 'node:{}'.format(page_id)
+
+
+def group_id(client):
+    """
+    :param client: client information
+    :return: oid of the clients access group
+    """
+    group = client.access_group
+    return getattr(group, 'oid', group)
+
+
+@component.Component('NodeCache')
+class NodeCache(object):
+    """
+    Rendered field contents and editorial lists of nodes
+    """
+    __slots__ = 'cache', 'ttl'
+
+    def __init__(self):
+        self.cache = None
+        self.ttl = None
+
+    @component.inject_method(SettingsDict)
+    def configure(self, settings):
+        self.cache = _cache.get_cache().namespace('node')
+        self.ttl = settings.get('node_cache_ttl', 300)
+
+    def _fetch(self, key, page_id, compute):
+        if self.cache is None:
+            self.configure()
+        if not self.ttl:
+            return compute()
+        key = _cache.make_key(key)
+        value = self.cache.get(key)
+        if value is None:
+            value = compute()
+            self.cache.set(key, value, self.ttl, (page_tag(page_id), ))
+        return value
+
+    def content(self, content_type, page_id, modifier, compute):
+        """
+        Rendered field content of a page
+
+        :param content_type: machine name of the content type
+        :param page_id: oid of the page
+        :param modifier: view modifier, e.g. 'access'
+        :param compute: callable without arguments returning the content
+        :return: str
+        """
+        return self._fetch(
+            ('content', content_type, page_id, modifier),
+            page_id,
+            lambda: str(compute())
+        )
+
+    def editorial(self, content_type, page_id, client, compute):
+        """
+        Rendered editorial list of a page for the clients access group
+
+        :param content_type: machine name of the content type
+        :param page_id: oid of the page
+        :param client: client information
+        :param compute: callable without arguments returning the list
+        :return: str
+        """
+        return self._fetch(
+            ('editorial', content_type, page_id, group_id(client)),
+            page_id,
+            lambda: str(compute())
+        )
+
+    def invalidate(self, page_id):
+        """
+        Drop everything cached for a page
+
+        :param page_id: oid of the page
+        :return: None
+        """
+        if self.cache is None:
+            self.configure()
+        self.cache.invalidate(page_tag(page_id))
+
+
+@component.inject(NodeCache)
+def get_node_cache(cache):
+    """
+    Convenience method to obtain the node cache
+
+    :param cache: injected node cache component
+    :return: NodeCache
+    """
+    return cache
@@ -6,17 +6,21 @@ These are the classes exposed to the framework
 
 from datetime import datetime
 import functools
+from html import escape
 import logging
+from urllib import parse
 
 from framework import http, route
+from framework.backend import orm, search as backend_search
+from framework.includes import get_settings
 from framework.machinery import component
-from framework.util import lazy, html, clean
+from framework.util import lazy, html, clean, pagination
 from dycm import wysiwyg
 from dycm.commons import menus as _menus, model as commonsmodel
 from dycm.users import decorator as user_dec
 
-from . import model as _model, field
-from .node import make_node
+from . import model as _model, field, cache as _cache, search as _search
+from .node import make_node, Listing
 
 
 __author__ = 'Justus Adam'
@@ -29,6 +33,10 @@ _add_modifier = 'add'
 
 _publishing_flag = 'published'
 
+# modifiers whose field content is reused from the node cache, the forms
+#  contain menus and other state not tied to the page
+_cached_modifiers = frozenset({_access_modifier})
+
 _step = 5
 
 _scroll_left = '<'
@@ -99,9 +107,27 @@ class FieldBasedPageContent(object):
             ):
             return None
 
+        client = dc_obj.request.client
+        node_cache = _cache.get_node_cache()
+
+        if modifier in _cached_modifiers:
+            content = node_cache.content(
+                self.content_type,
+                page.oid,
+                modifier,
+                lambda: mapped[modifier](page)
+                )
+        else:
+            content = mapped.get(modifier, _)(page)
+
         node = dict(
-            editorial=self.editorial(page, dc_obj.request.client),
-            content=mapped.get(modifier, _)(page),
+            editorial=node_cache.editorial(
+                self.content_type,
+                page.oid,
+                client,
+                lambda: self.editorial(page, client)
+                ),
+            content=content,
             title=page.page_title
             )
 
@@ -169,15 +195,23 @@ class FieldBasedPageContent(object):
         return ':redirect:/node/{}{}'.format(page.oid, '' if success else '/add')
 
     def do_edit(self, page, query):
-        for one_field in self.fields:
-            one_field.process_edit_request(page.oid, query[one_field.name][0])
-        page.page_title = clean.remove_dangerous_tags(query['title'][0])
-        page.published = _publishing_flag in query
-        page.menu_item = (
+        # resolve the menu before any write
+        menu_item = (
                 None if query['parent-menu'][0] == 'none'
                 else self.get_menu(*query['parent-menu'][0].rsplit('-', 1))
                 )
-        page.save()
+        # all or nothing, and a single commit (fsync) for the whole node
+        with orm.atomic():
+            for one_field in self.fields:
+                one_field.process_edit_request(
+                    page.oid, query[one_field.name][0]
+                )
+            page.page_title = clean.remove_dangerous_tags(query['title'][0])
+            page.published = _publishing_flag in query
+            page.menu_item = menu_item
+            page.save()
+        _cache.get_node_cache().invalidate(page.oid)
+        _search.get_node_search().update(page)
         return True
 
     @wysiwyg.use()
@@ -252,23 +286,28 @@ class FieldBasedPageContent(object):
         )
 
     def process_add(self, query, client):
-        page = _model.Page.create(
-            content_type=self.dbobj,
-            creator=client.user,
-            page_title=clean.remove_dangerous_tags(query['title'][0]),
-            published=_publishing_flag in query,
-            date_created=datetime.now(),
-            menu_item=(
-                None if query['parent-menu'][0] == 'none'
-                else self.get_menu(*query['parent-menu'][0].rsplit('-', 1))
-                )
-        )
-        for field in self.fields:
-            field.process_add(
-                page_type=self.page_type,
-                page_id=page.oid,
-                content=query.get(field.name, [None])[0]
+        menu_item = (
+            None if query['parent-menu'][0] == 'none'
+            else self.get_menu(*query['parent-menu'][0].rsplit('-', 1))
+            )
+        # no page without its fields if one of the inserts fails
+        with orm.atomic():
+            page = _model.Page.create(
+                content_type=self.dbobj,
+                creator=client.user,
+                page_title=clean.remove_dangerous_tags(query['title'][0]),
+                published=_publishing_flag in query,
+                date_created=datetime.now(),
+                menu_item=menu_item
             )
+            for field in self.fields:
+                field.process_add(
+                    page_type=self.page_type,
+                    page_id=page.oid,
+                    content=query.get(field.name, [None])[0]
+                )
+        _cache.get_node_cache().invalidate(page.oid)
+        _search.get_node_search().update(page)
 
         return ':redirect:/node/{}'.format(page.oid)
 
@@ -372,15 +411,13 @@ class CMSController(object):
     @user_dec.authorize('access node overview')
     @make_node()
     def overview(self, dc_obj, get):
-        my_range = (
-            int(get['from'][0]) if 'from' in get else 0,
-            int(get['to'][0]) if 'to' in get else _step
+        page = pagination.keyset(
+            _model.Page.select(),
+            (_model.Page.date_created, _model.Page.oid),
+            _step,
+            get
         )
-        for a in (_model.Page
-            .select()
-            .limit('{},{}'.format(my_range[0], my_range[1] - my_range[0] + 1))
-            .order_by('date_created desc')
-            ):
+        for a in page:
             handler = self.compiler_map[a.content_type.machine_name]
             node = handler.access(dc_obj, a)
             if not node:
@@ -388,6 +425,88 @@ class CMSController(object):
             node['title'] = html.A(node['title'], href='/node/{}'.format(a.oid))
             yield node
 
+        # the cursors are known once the page has been streamed
+        links = [
+            html.A(label, href=url, classes={'pagination-link'})
+            for label, url in (
+                (_scroll_left, page.prev_url('/node')),
+                (_scroll_right, page.next_url('/node'))
+            )
+            if url is not None
+        ]
+        if links:
+            yield dict(
+                editorial='',
+                content=html.ContainerElement(*links, classes={'pagination'}),
+                title=''
+            )
+
+    @route.controller_method(
+        '/search',
+        method=http.RequestMethods.GET,
+        query=True
+        )
+    @make_node()
+    def search(self, dc_obj, get):
+        text = get['q'][0] if 'q' in get else ''
+        try:
+            number = max(int(get['page'][0]), 1) if 'page' in get else 1
+        except ValueError:
+            number = 1
+        size = get_settings().get('search_page_size', 10)
+        # one more to know whether there is a next page
+        hits = _search.get_node_search().search(
+            text, size + 1, (number - 1) * size
+        )
+        return Listing(
+            'Search results for "{}"'.format(escape(text)) if text else 'Search',
+            self.search_results(dc_obj, text, number, hits[:size], len(hits) > size)
+        )
+
+    def search_results(self, dc_obj, text, number, hits, more):
+        client = dc_obj.request.client
+        pages = {
+            page.oid: page for page in _model.Page.select().where(
+                _model.Page.oid << [hit.doc_id for hit in hits]
+            )
+        } if hits else {}
+        for hit in hits:
+            page = pages.get(hit.doc_id)
+            # removed since it was indexed
+            if page is None:
+                continue
+            handler = self.compiler_map[page.content_type.machine_name]
+            if not client.check_permission(
+                    handler.get_permission(page, _access_modifier)):
+                continue
+            yield dict(
+                editorial='',
+                content=html.ContainerElement(
+                    backend_search.render_snippet(hit.snippet),
+                    classes={'search-snippet'}
+                ),
+                title=html.A(page.page_title, href='/node/{}'.format(page.oid))
+            )
+
+        links = [
+            html.A(
+                label,
+                href='/search?' + parse.urlencode({'q': text, 'page': target}),
+                classes={'pagination-link'}
+            )
+            for label, target, show in (
+                (_scroll_left, number - 1, number > 1),
+                (_scroll_right, number + 1, more)
+            )
+            if show
+        ]
+        if links:
+            yield dict(
+                editorial='',
+                content=html.ContainerElement(*links, classes={'pagination'}),
+                title=''
+            )
+
     @route.controller_method(
         '/node/add/{str}',
         method=http.RequestMethods.GET,
@@ -80,12 +80,30 @@ class _Field(object):
             raise
 
     def process_edit_request(self, page_id, content):
-        try:
-            db_obj = self.from_db(page_id)
-            db_obj.content = clean.remove_dangerous_tags(content)
-            db_obj.save()
-        except:
-            raise
+        """
+        Replace the content with a single UPDATE instead of
+         loading and saving the row, the row is created
+         if the field was added to the content type later
+
+        :param page_id: oid of the page
+        :param content: new (unclean) content
+        :return: None
+        """
+        data = model.field(self.name)
+        content = clean.remove_dangerous_tags(content)
+        updated = (data
+            .update(content=content)
+            .where(
+                (data.page_id == page_id) & (data.page_type == self.page_type)
+            )
+            .execute()
+            )
+        if not updated:
+            data.create(
+                content=content,
+                page_id=page_id,
+                page_type=self.page_type
+                )
 
     def from_db(self, page_id):
         return model.field(self.name).get(
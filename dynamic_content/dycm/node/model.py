@@ -1,7 +1,8 @@
 import functools
 from dycm import theming
+from framework import metrics
 from framework.util import time
-from framework.backend import orm
+from framework.backend import orm, migrations
 from dycm.users import model as usersmodel
 from dycm.commons import model as commonsmodel
 
@@ -22,7 +23,7 @@ class Page(orm.BaseModel):
     page_title = orm.CharField()
     creator = orm.ForeignKeyField(usersmodel.User)
     published = orm.BooleanField(default=False)
-    date_created = orm.DateField(default=time.utcnow())
+    date_created = orm.DateTimeField(default=time.utcnow)
     menu_item = orm.ForeignKeyField(commonsmodel.MenuItem, null=True)
 
 
@@ -36,9 +37,14 @@ def field(name):
         page_id = orm.IntegerField()
         content = orm.TextField()
 
+    migrations.index(FieldData, 'page_type', 'page_id')
+
     return FieldData
 
 
+metrics.register_lru_cache('node_field_model', field)
+
+
 class FieldType(orm.BaseModel):
     machine_name = orm.CharField(unique=True)
     handler = orm.CharField(null=False)
@@ -51,3 +57,49 @@ class FieldConfig(orm.BaseModel):
     description = orm.TextField(null=True)
 
 
+# the keyset of the node overview, see content_handler.CMSController
+migrations.index(Page, 'date_created', 'oid')
+
+
+@migrations.migration('node', 1, 'store the creation time of pages')
+def _page_creation_time(database):
+    # date_created was a DateField while datetimes were written to it
+    table = migrations.quote(database, migrations.table_name(Page))
+    column = migrations.quote(
+        database, migrations.column_name(Page, 'date_created')
+    )
+    if migrations.is_mysql(database):
+        database.execute_sql(
+            'ALTER TABLE {} MODIFY {} DATETIME NOT NULL'.format(table, column)
+        )
+    else:
+        # sqlite kept the written text, only plain dates lack a time
+        database.execute_sql(
+            "UPDATE {0} SET {1} = {1} || ' 00:00:00' "
+            "WHERE length({1}) = 10".format(table, column)
+        )
+
+
+@migrations.hot_query('node overview')
+def _overview():
+    return Page.select().order_by(
+        Page.date_created.desc(), Page.oid.desc()
+    ).limit(6)
+
+
+@migrations.dynamic_models
+def field_models():
+    """
+    Data tables of all field types
+    """
+    if not FieldType.table_exists():
+        return []
+    return [field(a.machine_name) for a in FieldType.select()]
+
+
+@migrations.hot_query('field data of a page')
+def _field_data():
+    for model in field_models():
+        yield model.select().where(
+            model.page_type == 'node', model.page_id == 1
+        )
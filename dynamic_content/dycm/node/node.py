@@ -3,38 +3,64 @@ import pathlib
 from framework import dchp
 from framework.http import response
 from framework.util import config, structures
-from framework import mvc
+from framework import metrics, mvc
 from dycm import theming, commons
 
 __author__ = 'Justus Adam'
 __version__ = '0.2'
 
 
+class Listing(object):
+    """
+    Nodes to be shown on one page together with a page title
+    """
+    __slots__ = 'title', 'nodes'
+
+    def __init__(self, title, nodes):
+        self.title = title
+        self.nodes = nodes
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+
+@functools.lru_cache()
+def _get_template(_type, theme_path=None, theme_template=None):
+    if theme_template is not None:
+        r = theme_path + '/' + theme_template
+    else:
+        basepath = pathlib.Path(__file__).parent
+        r = config.read_config(basepath / 'config')[_type]
+        r = str(basepath / r)
+
+    r = r if r.endswith('.html') else r + '.html'
+    path = str(pathlib.Path(r))
+
+    with open(path) as template:
+        return template.read()
+
+
+metrics.register_lru_cache('node_template', _get_template)
+
+
 def compile_nodes(res, dc_obj):
 
-    @functools.lru_cache()
-    def _get_template(_type):
+    def get_template(_type):
         if ('theme_config' in dc_obj.config
             and dc_obj.config['theme_config'] is not None
             and _type in dc_obj.config['theme_config']):
-            r = dc_obj.config['theme_config']['path'] + '/' + dc_obj.config['theme_config'][_type]
-        else:
-            basepath = pathlib.Path(__file__).parent
-            r = config.read_config(basepath / 'config')[_type]
-            r = str(basepath / r)
-
-        r = r if r.endswith('.html') else r + '.html'
-        path = str(pathlib.Path(r))
-
-        with open(path) as template:
-            return template.read()
-
+            return _get_template(
+                _type,
+                dc_obj.config['theme_config']['path'],
+                dc_obj.config['theme_config'][_type]
+            )
+        return _get_template(_type)
 
     if isinstance(res, dict):
         # assign title, if it exists
         if 'title' in res:
             dc_obj.context['title'] = res['title']
-        template = _get_template('single_node_template')
+        template = get_template('single_node_template')
         content = dchp.evaluator.evaluate_html(template, res)
     elif hasattr(res, '__iter__'):
         # try to find if object carries a title
@@ -45,7 +71,7 @@ def compile_nodes(res, dc_obj):
         else:
             dc_obj.context['title'] = 'Overview'
 
-        template = _get_template('multi_node_template')
+        template = get_template('multi_node_template')
         content = structures.InvisibleList(
             (dchp.evaluator.evaluate_html(template, a) for a in res)
             )
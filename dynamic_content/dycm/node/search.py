@@ -0,0 +1,112 @@
+"""
+Full-text search over nodes
+
+Page titles and the contents of all fields are kept in a search index
+ (see framework.backend.search), FTS5 on SQLite if available and an in
+ memory index otherwise, as chosen by the 'search_backend' setting
+ ('auto', 'fts5' or 'memory'). The content handlers update the index
+ when pages are added or edited, an empty index is filled from the
+ database on first use.
+"""
+from framework.backend import search as _search
+from framework.includes import SettingsDict
+from framework.machinery import component
+from framework.util import lazy
+
+from . import model as _model
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+_page_type = 'node'
+
+
+def field_contents(page_id=None):
+    """
+    Contents of the fields of the pages, one query per field type
+
+    :param page_id: only this page if given
+    :return: dict page_id -> list of contents
+    """
+    contents = {}
+    for data in _model.field_models():
+        query = data.select().where(data.page_type == _page_type)
+        if page_id is not None:
+            query = query.where(data.page_id == page_id)
+        for row in query:
+            contents.setdefault(row.page_id, []).append(row.content or '')
+    return contents
+
+
+@component.Component('NodeSearch')
+class NodeSearch(lazy.Loadable):
+    """
+    Search index of all nodes
+    """
+    __slots__ = 'index',
+
+    def __init__(self):
+        super().__init__()
+        self.index = None
+
+    @component.inject_method(SettingsDict)
+    def load(self, settings):
+        self.index = _search.create_index(
+            kind=settings.get('search_backend', 'auto'), table='node_search'
+        )
+        if getattr(self.index, 'created', True):
+            self.rebuild()
+
+    def rebuild(self):
+        """
+        Index all pages again
+
+        :return: None
+        """
+        contents = field_contents()
+        self.index.clear()
+        for page in _model.Page.select():
+            self.index.update(
+                page.oid, page.page_title, ' '.join(contents.get(page.oid, ()))
+            )
+
+    @lazy.ensure_loaded
+    def update(self, page):
+        """
+        Index the current title and fields of page
+
+        :param page: page value object
+        :return: None
+        """
+        self.index.update(
+            page.oid,
+            page.page_title,
+            ' '.join(field_contents(page.oid).get(page.oid, ()))
+        )
+
+    @lazy.ensure_loaded
+    def remove(self, page_id):
+        self.index.remove(page_id)
+
+    @lazy.ensure_loaded
+    def search(self, text, limit, offset=0):
+        """
+        :param text: search query
+        :param limit: maximum number of hits
+        :param offset: number of best hits to skip
+        :return: list of framework.backend.search.Hit
+        """
+        return self.index.search(text, limit, offset)
+
+
+@component.inject(NodeSearch)
+def get_node_search(node_search):
+    """
+    Convenience method to obtain the node search index
+
+    :param node_search: injected search component
+    :return: NodeSearch
+    """
+    return node_search
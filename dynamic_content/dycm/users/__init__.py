@@ -1,5 +1,5 @@
 from framework.includes import get_settings
-from . import users, model, client, session, decorator , middleware
+from . import users, model, client, session, decorator , middleware, throttle
 
 
 if get_settings().get('use_login_page', False):
@@ -15,5 +15,9 @@ START_THEME = 'default_theme'
 
 added_default_settings = {
     'sess_token_length': 16,
-    'sess_length': -1
+    'sess_length': -1,
+    # see throttle.LoginThrottle, 0 disables the limit
+    'login_attempts_per_address': 30,
+    'login_failures_per_user': 5,
+    'login_throttle_window': 300
 }
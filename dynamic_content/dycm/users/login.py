@@ -3,10 +3,11 @@ import logging
 from http import cookies
 
 from framework import http, hooks, route
+from framework.errors import exceptions
 from framework.util import html
 from framework.middleware import csrf
 from dycm import commons, theming
-from . import session, users, decorator
+from . import session, users, decorator, throttle
 
 
 __author__ = 'Justus Adam'
@@ -17,12 +18,12 @@ logout_prefix = 'logout'
 _cookie_time_format = '%a, %d %b %Y %H:%M:%S GMT'
 
 USERNAME_INPUT = (
-    html.Label('Username', label_for='username'),
-    html.Input(name='username', required=True)
+    html.Label('Username', label_for='username').freeze(),
+    html.Input(name='username', required=True).freeze()
     )
 PASSWORD_INPUT = (
-    html.Label('Password', label_for='password'),
-    html.Input(input_type='password', required=True,name='password')
+    html.Label('Password', label_for='password').freeze(),
+    html.Input(input_type='password', required=True,name='password').freeze()
     )
 
 LOGOUT_TARGET = '/login'
@@ -31,12 +32,23 @@ LOGOUT_BUTTON = html.A(
     'Logout',
     href='/' + logout_prefix,
     classes={'logout', 'button'}
-    )
+    ).freeze()
 
 
 _login_failed = ':redirect:/login/failed'
 
 
+def _retry_later(code, seconds, message):
+    return http.response.Response(
+        body=message.encode('utf-8'),
+        code=code,
+        headers={
+            'Content-Type': 'text/plain; charset=utf-8',
+            'Retry-After': str(max(int(seconds), 1))
+        }
+    )
+
+
 class LoginHook(hooks.ClassHook):
     """
     A Hook designed to allow custom interaction with the login process.
@@ -183,15 +195,32 @@ def login_post(dc_obj, query):
             return ':redirect:/login/failed'
         username = username[0]
         password = password[0]
+    limiter = throttle.get_throttle()
+    wait = limiter.attempt(username, throttle.client_address(dc_obj.request))
+    if wait:
+        return _retry_later(
+            http.response.HttpResponseCodes.TooManyRequests,
+            wait,
+            'Too many login attempts, please try again later.'
+        )
     try:
         token = session.start_session(username, password)
+    except (exceptions.HashingQueueFull, exceptions.HashingTimeout):
+        # overload, not a wrong password, hence not counted as failure
+        return _retry_later(
+            http.response.HttpResponseCodes.ServiceUnavailable,
+            1,
+            'The server is busy, please try again later.'
+        )
     except Exception:
-        return _login_failed
+        token = None
     if token:
+        limiter.succeeded(username)
         cookie = cookies.SimpleCookie({'SESS': token})
         dc_obj.config['cookies'] = cookie
         return ':redirect:/'
     else:
+        limiter.failed(username)
         return _login_failed
 
 
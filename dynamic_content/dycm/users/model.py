@@ -1,6 +1,6 @@
 """Database objects of the users module"""
 
-from framework.backend import orm
+from framework.backend import orm, migrations
 from framework.util import time
 
 __author__ = 'Justus Adam'
@@ -41,4 +41,20 @@ class Session(orm.BaseModel):
 class UserAuth(orm.BaseModel):
     uid = orm.ForeignKeyField(User)
     password = orm.BlobField()
-    salt = orm.BlobField()
\ No newline at end of file
+    salt = orm.BlobField()
+
+
+migrations.index(Session, 'token')
+migrations.index(AccessGroupPermission, 'permission')
+
+
+@migrations.hot_query('session by token')
+def _session_by_token():
+    return Session.select().where(Session.token == b'')
+
+
+@migrations.hot_query('groups granted a permission')
+def _groups_by_permission():
+    return AccessGroupPermission.select().where(
+        AccessGroupPermission.permission == ''
+    )
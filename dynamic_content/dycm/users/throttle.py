@@ -0,0 +1,169 @@
+"""
+Login throttling per user and per client address
+
+Every login attempt costs a password hash. Attempts are counted in a
+ sliding window per client address, failed attempts additionally per
+ username. Requests over either limit are rejected before any hashing
+ is done so that credential stuffing cannot starve regular traffic.
+"""
+import collections
+import threading
+import time
+
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+class Throttle(object):
+    """
+    Sliding window event counter per key
+    """
+    __slots__ = 'limit', 'window', 'clock', '_events', '_lock', '_max_keys'
+
+    def __init__(self, limit, window, clock=time.monotonic, max_keys=10000):
+        """
+        :param limit: events allowed per key within window
+        :param window: window length in seconds
+        :param clock: time source
+        :param max_keys: number of keys after which expired keys are purged
+        """
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self._events = {}
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def _prune(self, key, now):
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def retry_after(self, key):
+        """
+        Seconds until key may act again
+
+        :param key: hashable
+        :return: 0 if key is not throttled
+        """
+        if not self.limit:
+            return 0
+        with self._lock:
+            now = self.clock()
+            events = self._prune(key, now)
+            if events is None or len(events) < self.limit:
+                return 0
+            return max(events[0] + self.window - now, 0)
+
+    def hit(self, key):
+        """
+        Record an event for key
+
+        :param key: hashable
+        :return: None
+        """
+        if not self.limit:
+            return
+        with self._lock:
+            now = self.clock()
+            if len(self._events) >= self._max_keys:
+                for k in tuple(self._events):
+                    self._prune(k, now)
+            events = self._events.setdefault(
+                key, collections.deque(maxlen=self.limit)
+            )
+            events.append(now)
+
+    def reset(self, key):
+        """
+        Forget all events for key
+
+        :param key: hashable
+        :return: None
+        """
+        with self._lock:
+            self._events.pop(key, None)
+
+
+@component.Component('LoginThrottle')
+class LoginThrottle(object):
+    """
+    Combined per address and per user login throttle
+
+    Configured lazily from the 'login_attempts_per_address',
+     'login_failures_per_user' and 'login_throttle_window' settings,
+     a limit of 0 disables the respective throttle.
+    """
+    __slots__ = 'addresses', 'users'
+
+    def __init__(self):
+        self.addresses = self.users = None
+
+    @component.inject_method(SettingsDict)
+    def configure(self, settings):
+        window = settings.get('login_throttle_window', 300)
+        self.addresses = Throttle(
+            settings.get('login_attempts_per_address', 0), window
+        )
+        self.users = Throttle(settings.get('login_failures_per_user', 0), window)
+
+    def attempt(self, username, address):
+        """
+        Register a login attempt
+
+        :param username: submitted username
+        :param address: client address or None
+        :return: seconds to wait if throttled, 0 if the attempt may proceed
+        """
+        if self.addresses is None:
+            self.configure()
+        wait = max(
+            self.users.retry_after(username),
+            self.addresses.retry_after(address) if address else 0
+        )
+        if not wait and address:
+            self.addresses.hit(address)
+        return wait
+
+    def failed(self, username):
+        if self.users is None:
+            self.configure()
+        self.users.hit(username)
+
+    def succeeded(self, username):
+        if self.users is not None:
+            self.users.reset(username)
+
+
+@component.inject('LoginThrottle')
+def get_throttle(throttle):
+    """
+    Convenience method to obtain the login throttle
+
+    :param throttle: injected throttle component
+    :return: LoginThrottle
+    """
+    return throttle
+
+
+def client_address(request):
+    """
+    The address a request originates from
+
+    Set as 'REMOTE_ADDR' header by both server implementations.
+
+    :param request: http.Request
+    :return: str or None
+    """
+    header = request.headers.get('REMOTE_ADDR')
+    return header.value if header is not None else None
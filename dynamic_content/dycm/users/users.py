@@ -1,5 +1,5 @@
 from framework.machinery import component
-from framework.util.py34 import hashlib
+from framework.util import hashing
 import os
 import logging
 from framework.includes import SettingsDict
@@ -195,8 +195,14 @@ class Group:
 
 @component.inject(SettingsDict)
 def hash_password(settings, password, salt):
-    """hash a password according to the settings"""
-    return hashlib.pbkdf2_hmac(
+    """
+    hash a password according to the settings
+
+    computed in the hashing pool, see framework.util.hashing
+
+    :raises exceptions.HashingQueueFull: if the pool is saturated
+    """
+    return hashing.get_pool().pbkdf2(
         settings['hashing_algorithm'],
         password,
         salt,
@@ -4,11 +4,11 @@ from framework.mvc import context
 
 __author__ = 'Justus Adam'
 
-basic_script = html.Script(src='/public/tinymce/tinymce.min.js')
+basic_script = html.Script(src='/public/tinymce/tinymce.min.js').freeze()
 
 apply_script = html.Script(
     'tinymce.init({selector: "textarea.' + identifier + '"});'
-)
+).freeze()
 
 
 def decorator_hook(dc_obj:structures.DynamicContent):
@@ -2,7 +2,7 @@
 Implementation of the class loading all important components/modules
 """
 
-from framework import middleware
+from framework import middleware, startup
 import logging
 from framework.machinery import component, registry, scanner
 
@@ -27,13 +27,17 @@ class Loader:
         :return: None
         """
         logging.getLogger(__name__).info('Loading Components ... ')
-        from framework import mvc, route, dchp
+        with startup.span('components', 'boot'):
+            from framework import mvc, route, dchp
         logging.getLogger(__name__).warning('Loading Middleware ...')
-        middleware.load(self.settings['middleware'])
+        with startup.span('middleware', 'boot'):
+            middleware.load(self.settings['middleware'])
         logging.getLogger(__name__).info('Loading Modules ...')
-        self.run_scanner()
+        with startup.span('scanner', 'boot'):
+            self.run_scanner()
         if callable(self.init_function):
-            self.init_function()
+            with startup.span('init_function', 'boot'):
+                self.init_function()
 
     def run_scanner(self):
         """
@@ -0,0 +1,185 @@
+"""
+Enable, disable and reload modules of a running application
+
+Unloading a module removes everything it registered with the
+ framework: its routes from the path map, its middleware and other
+ hook instances, its scanner hooks, its components and its links,
+ then drops it from sys.modules. Modules keeping registries of their
+ own (like the commons handlers) take part through the UnloadHook.
+
+Loading imports the module again, which registers its routes,
+ instantiates its middleware from the 'middleware' setting and
+ scans it, just like during startup.
+
+Requests keep being served while a module is reloaded, requests for
+ its routes arriving in between are answered as not found.
+ Other modules keep references to objects of the old module
+ (e.g. from 'from dycm.node import model'), reload those as well if
+ they depend on the module's state.
+"""
+import importlib
+import logging
+import pkgutil
+import sys
+import threading
+
+from framework import hooks, middleware
+from framework.includes import SettingsDict
+from framework.machinery import component, linker, scanner
+from framework.util import module as _module
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+_lock = threading.RLock()
+
+
+class UnloadHook(hooks.ClassHook):
+    """
+    Remove what a module registered in registries
+     not known to the framework
+    """
+    __slots__ = ()
+    hook_name = 'module_unload'
+
+    def unload(self, package):
+        """
+        :param package: dotted name of the package being unloaded
+        :return: None
+        """
+        raise NotImplementedError
+
+
+UnloadHook.init_hook()
+
+
+@component.inject(SettingsDict)
+def package_name(settings, name):
+    """
+    The dotted package name of a module as named in settings
+
+    :param settings: injected settings
+    :param name: name in the 'modules' (or 'import') setting
+    :return: str
+    """
+    if name in settings.get('modules', ()):
+        return 'dycm.' + name
+    return name
+
+
+@component.inject(SettingsDict)
+def is_configured(settings, name):
+    """
+    Whether name is one of the modules in the 'modules' setting
+
+    :param settings: injected settings
+    :param name: module name
+    :return: bool
+    """
+    return name in settings.get('modules', ())
+
+
+def is_available(name):
+    """
+    Whether a dycm module called name exists
+
+    :param name: module name
+    :return: bool
+    """
+    package = importlib.import_module('dycm')
+    return any(
+        module_name == name
+        for _, module_name, _ in pkgutil.iter_modules(package.__path__)
+    )
+
+
+@component.inject(linker.Linker, 'PathMap')
+def unload(linker_, pathmap, name):
+    """
+    Remove a module from the running application
+
+    :param linker_: injected linker
+    :param pathmap: injected path map
+    :param name: module name as in settings
+    :return: None
+    """
+    package = package_name(name)
+    with _lock:
+        logging.getLogger(__name__).info('Unloading ' + package)
+        UnloadHook.blank_call_hooks_with(
+            lambda hook, package: hook.unload(package), package
+        )
+        if name in linker_:
+            linker_.remove(name)
+        pathmap.remove_module(package)
+        hooks.HookManager.manager().remove_module(package)
+        scanner.remove_module(package)
+        component.release_module(package)
+        for module_name in tuple(sys.modules):
+            if _module.in_package(module_name, package):
+                del sys.modules[module_name]
+        importlib.invalidate_caches()
+
+
+@component.inject(SettingsDict)
+def load(settings, name):
+    """
+    Import, register and scan a module
+
+    :param settings: injected settings
+    :param name: module name as in settings
+    :return: the module object
+    """
+    package = package_name(name)
+    with _lock:
+        logging.getLogger(__name__).info('Loading ' + package)
+        module = importlib.import_module(package)
+        middleware.load(
+            item for item in settings['middleware']
+            if _module.in_package(item.rsplit('.', 1)[0], package)
+        )
+        scanner.Scanner().scan(((name, module), ))
+        return module
+
+
+def reload(name):
+    """
+    Unload and load a module again, e.g. after its code changed
+
+    :param name: module name as in settings
+    :return: the new module object
+    """
+    with _lock:
+        unload(name)
+        return load(name)
+
+
+@component.inject(SettingsDict)
+def enable(settings, name):
+    """
+    Load a module and add it to the 'modules' setting
+
+    :param settings: injected settings
+    :param name: name of a dycm module
+    :return: the module object
+    """
+    with _lock:
+        if name not in settings['modules']:
+            settings['modules'] = list(settings['modules']) + [name]
+        return load(name)
+
+
+@component.inject(SettingsDict)
+def disable(settings, name):
+    """
+    Unload a module and remove it from the 'modules' setting
+
+    :param settings: injected settings
+    :param name: name of a dycm module
+    :return: None
+    """
+    with _lock:
+        unload(name)
+        settings['modules'] = [m for m in settings['modules'] if m != name]
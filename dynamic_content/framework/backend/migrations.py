@@ -0,0 +1,432 @@
+"""
+Schema indexes, versioned migrations and a query plan checker
+
+Indexes are declared next to the models
+
+    migrations.index(Session, 'token')
+    migrations.index(Common, 'region', 'theme')
+
+and created by create_indexes() for every existing table lacking an
+ index with these leading columns. Tables created at runtime are
+ reported by functions decorated with dynamic_models.
+
+Migrations are forward only functions taking the database, registered
+ per module with a version
+
+    @migrations.migration('node', 1, 'add page summaries')
+    def add_summary(database):
+        ...
+
+migrate() runs the pending migrations of every module in version order,
+ each in its own transaction, records them in the 'appliedmigration'
+ table and creates missing indexes afterwards.
+
+Queries executed on every request are registered with hot_query,
+ check() explains them and reports those scanning a whole table.
+
+Modules register their declarations when imported, load() imports the
+ dycm modules (and their model submodules) named in the settings. From the
+ command line
+
+    python -m dynamic_content --mode migrate
+    python -m dynamic_content --mode checkindexes
+"""
+import collections
+import datetime
+import importlib
+import importlib.util
+import logging
+
+from framework.includes import SettingsDict
+from framework.machinery import component
+from . import orm
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+Index = collections.namedtuple('Index', ('model', 'fields', 'unique'))
+
+Migration = collections.namedtuple(
+    'Migration', ('module', 'version', 'description', 'function')
+)
+
+# model -> list of Index
+_indexes = collections.OrderedDict()
+
+# functions returning further models
+_dynamic_models = []
+
+# (module, version) -> Migration
+_migrations = {}
+
+# name -> function returning a query
+_hot_queries = collections.OrderedDict()
+
+# length of the indexed prefix of text columns on MySQL
+_mysql_prefix = 255
+
+
+class MigrationError(Exception):
+    pass
+
+
+class AppliedMigration(orm.BaseModel):
+    module = orm.CharField()
+    version = orm.IntegerField()
+    description = orm.TextField(null=True)
+    applied = orm.DateTimeField()
+
+
+def table_name(model):
+    """
+    :param model: model class
+    :return: name of the models table
+    """
+    meta = model._meta
+    return getattr(meta, 'db_table', None) or meta.table_name
+
+
+def column_name(model, field):
+    """
+    :param model: model class
+    :param field: field name
+    :return: name of the fields column
+    """
+    field = model._meta.fields[field]
+    return getattr(field, 'db_column', None) or field.column_name
+
+
+def index(model, *fields, unique=False):
+    """
+    Declare an index of model
+
+    :param model: model class
+    :param fields: names of the indexed fields, in index order
+    :param unique: whether the index is unique
+    :return: model
+    """
+    if not fields:
+        raise ValueError('An index needs at least one field')
+    for field in fields:
+        if field not in model._meta.fields:
+            raise ValueError('{} has no field {}'.format(model.__name__, field))
+    spec = Index(model, fields, unique)
+    specs = _indexes.setdefault(model, [])
+    if spec not in specs:
+        specs.append(spec)
+    return model
+
+
+def dynamic_models(function):
+    """
+    Register a function returning models created at runtime
+     whose indexes should be created as well
+
+    Calling the function should declare their indexes if necessary.
+
+    :param function: callable without arguments returning models
+    :return: function
+    """
+    _dynamic_models.append(function)
+    return function
+
+
+def declared_indexes(model):
+    """
+    :param model: model class
+    :return: list of Index
+    """
+    return list(_indexes.get(model, ()))
+
+
+def indexed_models():
+    """
+    :return: models with declared indexes, including dynamic ones
+    """
+    for function in _dynamic_models:
+        for model in function():
+            _indexes.setdefault(model, [])
+    return [model for model, specs in _indexes.items() if specs]
+
+
+def is_mysql(database):
+    return isinstance(database, orm.MySQLDatabase)
+
+
+def quote(database, name):
+    char = getattr(database, 'quote_char', None) or getattr(database, 'quote', '"')[0]
+    return char + name + char
+
+
+def index_name(spec):
+    """
+    Name of an index, same as peewee would choose
+
+    :param spec: Index
+    :return: str
+    """
+    return '_'.join(
+        (table_name(spec.model), ) +
+        tuple(column_name(spec.model, field) for field in spec.fields)
+    )
+
+
+def create_index_sql(database, spec):
+    """
+    :param database: database of the model
+    :param spec: Index
+    :return: sql creating the index
+    """
+    columns = []
+    for field in spec.fields:
+        column = quote(database, column_name(spec.model, field))
+        # MySQL can only index a prefix of text and blob columns
+        if is_mysql(database) and isinstance(
+                spec.model._meta.fields[field], (orm.TextField, orm.BlobField)):
+            column += '({})'.format(_mysql_prefix)
+        columns.append(column)
+    return 'CREATE {}INDEX {} ON {} ({})'.format(
+        'UNIQUE ' if spec.unique else '',
+        quote(database, index_name(spec)),
+        quote(database, table_name(spec.model)),
+        ', '.join(columns)
+    )
+
+
+def missing_indexes(model, database=None):
+    """
+    Declared indexes of model not yet present in the database
+
+    An existing index covers a declared one if its leading columns are
+     the declared columns. Missing tables have no missing indexes.
+
+    :param model: model class
+    :param database: defaults to the database of the model
+    :return: list of Index
+    """
+    database = model._meta.database if database is None else database
+    table = table_name(model)
+    if table not in database.get_tables():
+        return []
+    existing = [tuple(a.columns) for a in database.get_indexes(table)]
+    missing = []
+    for spec in declared_indexes(model):
+        columns = tuple(column_name(model, field) for field in spec.fields)
+        if not any(a[:len(columns)] == columns for a in existing):
+            missing.append(spec)
+    return missing
+
+
+def create_indexes(models=None):
+    """
+    Create the missing declared indexes
+
+    :param models: model classes, defaults to all with declared indexes
+    :return: list of names of the created indexes
+    """
+    created = []
+    for model in indexed_models() if models is None else models:
+        database = model._meta.database
+        for spec in missing_indexes(model, database):
+            database.execute_sql(create_index_sql(database, spec))
+            created.append(index_name(spec))
+            logging.getLogger(__name__).info(
+                'created index {}'.format(index_name(spec))
+            )
+    return created
+
+
+def migration(module, version, description=None):
+    """
+    Decorator registering a migration
+
+    :param module: name of the module owning the migration
+    :param version: int, migrations of a module run in ascending order
+    :param description: short text recorded with the migration
+    :return: decorator
+    """
+    def inner(function):
+        key = (module, version)
+        if key in _migrations and _migrations[key].function is not function:
+            raise MigrationError(
+                'Duplicate migration {} version {}'.format(module, version)
+            )
+        _migrations[key] = Migration(
+            module, version, description or function.__doc__, function
+        )
+        return function
+    return inner
+
+
+def ensure_table():
+    orm.database_proxy.create_tables([AppliedMigration], safe=True)
+
+
+def applied():
+    """
+    :return: set of (module, version) already applied
+    """
+    ensure_table()
+    return {(a.module, a.version) for a in AppliedMigration.select()}
+
+
+def pending():
+    """
+    :return: list of Migration not yet applied, in execution order
+    """
+    done = applied()
+    return [
+        _migrations[key] for key in sorted(_migrations) if key not in done
+    ]
+
+
+def _record(one):
+    AppliedMigration.create(
+        module=one.module,
+        version=one.version,
+        description=one.description,
+        applied=datetime.datetime.utcnow()
+    )
+
+
+def mark_applied(modules=None):
+    """
+    Record all pending migrations as applied without running them,
+     for tables just created with the current schema
+
+    :param modules: only the migrations of these modules, None for all
+    :return: list of recorded Migration
+    """
+    result = [
+        one for one in pending() if modules is None or one.module in modules
+    ]
+    with orm.database_proxy.atomic():
+        for one in result:
+            _record(one)
+    return result
+
+
+def migrate():
+    """
+    Apply the pending migrations, then create missing indexes
+
+    A failing migration is rolled back and stops the run,
+     migrations applied before stay applied.
+
+    :return: list of applied Migration
+    """
+    database = orm.database_proxy
+    result = []
+    for one in pending():
+        logging.getLogger(__name__).info(
+            'applying migration {} version {}'.format(one.module, one.version)
+        )
+        try:
+            with database.atomic():
+                one.function(database)
+                _record(one)
+        except Exception as error:
+            raise MigrationError(
+                'Migration {} version {} failed: {}'.format(
+                    one.module, one.version, error
+                )
+            ) from error
+        result.append(one)
+    create_indexes()
+    return result
+
+
+def hot_query(name):
+    """
+    Decorator registering a query for check()
+
+    :param name: description of the query
+    :return: decorator for a function without arguments returning
+        a query or an iterable of queries
+    """
+    def inner(function):
+        _hot_queries[name] = function
+        return function
+    return inner
+
+
+def query_database(query):
+    """
+    :param query: peewee query
+    :return: database the query runs on
+    """
+    model = getattr(query, 'model_class', None) or query.model
+    return model._meta.database
+
+
+def explain(query, database=None):
+    """
+    Query plan of query
+
+    :param query: peewee query
+    :param database: defaults to the database of the query
+    :return: list of dicts, one per plan row
+    """
+    database = query_database(query) if database is None else database
+    sql, params = query.sql()
+    cursor = database.execute_sql(
+        ('EXPLAIN ' if is_mysql(database) else 'EXPLAIN QUERY PLAN ') + sql,
+        params
+    )
+    names = [a[0] for a in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def full_scans(query, database=None):
+    """
+    Tables query reads entirely
+
+    :param query: peewee query
+    :param database: defaults to the database of the query
+    :return: list of str describing the scans
+    """
+    database = query_database(query) if database is None else database
+    scans = []
+    for row in explain(query, database):
+        if is_mysql(database):
+            if row.get('type') == 'ALL':
+                scans.append('full scan of {}'.format(row.get('table')))
+        else:
+            detail = str(row.get('detail', list(row.values())[-1]))
+            if detail.startswith('SCAN') and 'USING' not in detail:
+                scans.append(detail)
+    return scans
+
+
+def check():
+    """
+    Explain all hot queries
+
+    :return: dict name -> list of full scans, only for queries with any
+    """
+    report = collections.OrderedDict()
+    for name, function in _hot_queries.items():
+        queries = function()
+        if hasattr(queries, 'sql'):
+            queries = queries,
+        scans = [scan for query in queries for scan in full_scans(query)]
+        if scans:
+            report[name] = scans
+    return report
+
+
+@component.inject(SettingsDict)
+def load(settings):
+    """
+    Import the modules from the settings so that their
+     declarations are registered
+
+    :param settings: injected settings
+    :return: None
+    """
+    for name in settings.get('modules', ()):
+        module = importlib.import_module('dycm.' + name)
+        if importlib.util.find_spec(module.__name__ + '.model') is not None:
+            importlib.import_module(module.__name__ + '.model')
@@ -1,38 +1,159 @@
+import sys
+
+import peewee
 from peewee import *
 
+from framework import instrumentation, startup
 from framework.includes import SettingsDict
 from framework.machinery import component
+from . import querylog, replicas
 
 __author__ = 'Justus Adam'
 __version__ = '0.1'
 
 
+class _Instrumented(object):
+    """
+    Database mixin recording a span for every executed query
+     and accounting for it in the query log of the request
+     (or the startup profile outside of requests)
+    """
+
+    def execute_sql(self, sql, *args, **kwargs):
+        trace = instrumentation.current()
+        if trace is None:
+            if startup.active() is None:
+                return super().execute_sql(sql, *args, **kwargs)
+            start = startup.clock()
+            try:
+                return super().execute_sql(sql, *args, **kwargs)
+            finally:
+                startup.accumulate('queries', 'db', startup.clock() - start)
+        span = trace.span('db')
+        try:
+            with span:
+                return super().execute_sql(sql, *args, **kwargs)
+        finally:
+            querylog.record(sql, span.duration)
+
+
+class InstrumentedMySQLDatabase(_Instrumented, MySQLDatabase):
+    pass
+
+
+class InstrumentedSqliteDatabase(_Instrumented, SqliteDatabase):
+    pass
+
+
+class RoutedMySQLDatabase(replicas.Routing, InstrumentedMySQLDatabase):
+    pass
+
+
+class RoutedSqliteDatabase(replicas.Routing, InstrumentedSqliteDatabase):
+    pass
+
+
+def _connection_options(options):
+    """
+    Constructor arguments of a database from its settings
+
+    :param options: dict from the 'database' setting
+    :return: tuple (args, kwargs)
+    """
+    options = {a: b for a, b in options.items() if a not in ('type', 'replicas')}
+    if 'name' in options:
+        args = options.pop('name'),
+    else:
+        args = options.pop('database', None),
+    return args, options
+
+
 @component.inject(SettingsDict)
 def proxy_db(settings):
     """
     Return the database specified in settings.
 
+    With 'replicas' in the database settings reads are routed to them,
+     see framework.backend.replicas
+
     :return:
     """
-    if settings['database']['type'].lower() == 'mysql':
-        mysqld = MySQLDatabase(
-            **{
-                a: b
-                for a, b in settings['database'].keys()
-                if not a == 'type'
-            }
+    config = settings['database']
+    kind = config['type'].lower()
+    if kind == 'mysql':
+        single, routed = InstrumentedMySQLDatabase, RoutedMySQLDatabase
+    elif kind == 'sqlite':
+        single, routed = InstrumentedSqliteDatabase, RoutedSqliteDatabase
+    else:
+        return None
+
+    args, kwargs = _connection_options(config)
+    replica_set = None
+    if config.get('replicas'):
+        members = []
+        for index, replica_config in enumerate(config['replicas']):
+            replica_args, replica_kwargs = _connection_options(
+                dict(config, **replica_config)
+            )
+            members.append(replicas.Replica(
+                replica_config.get('name', replica_config.get('host', index)),
+                single(*replica_args, **replica_kwargs)
+            ))
+        replica_set = replicas.ReplicaSet(
+            members, settings.get('replica_retry_interval', 5)
         )
-        mysqld.connect()
-        return mysqld
-    elif settings['database']['type'].lower() == 'sqlite':
-        sqlited = SqliteDatabase(settings['database']['name'])
-        sqlited.connect()
-        return sqlited
+    db = routed(*args, replicas=replica_set, **kwargs)
+    with startup.span('connect', 'db'):
+        db.connect()
+    return db
+
+
+querylog.skip_module(peewee)
+querylog.skip_module(sys.modules[__name__])
+querylog.skip_module(replicas)
 
 
 database_proxy = proxy_db()
 
 
+def reconnect():
+    """
+    Point database_proxy at the database currently configured in settings
+
+    This module is imported (by the registry models of the framework
+     package) before the settings file of a project is read, hence
+     database_proxy starts out with the default settings. The models
+     keep referencing database_proxy, it is therefore changed in place.
+
+    :return: None
+    """
+    database = proxy_db()
+    if database is None:
+        return
+    if (type(database) is type(database_proxy)
+            and database.database == database_proxy.database
+            and database.connect_kwargs == database_proxy.connect_kwargs):
+        database.close()
+        return
+    if not database_proxy.is_closed():
+        database_proxy.close()
+    database_proxy.__class__ = type(database)
+    database_proxy.__dict__.clear()
+    database_proxy.__dict__.update(database.__dict__)
+
+
+def atomic():
+    """
+    Run the enclosed queries in a single transaction.
+
+    Usable as context manager and decorator, the transaction is rolled
+     back if an exception escapes, nested uses become savepoints.
+
+    :return: context manager
+    """
+    return database_proxy.atomic()
+
+
 class ConnectedModel(Model):
     """Abstract Model with a working database connection"""
     class Meta:
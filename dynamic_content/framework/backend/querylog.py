@@ -0,0 +1,219 @@
+"""
+Per request accounting of database queries
+
+While a request is traced (see framework.instrumentation) and the
+ 'query_accounting' setting is enabled, every query executed through
+ the database proxy is recorded together with its duration, its shape
+ (the sql with literals and parameter lists collapsed) and the call
+ site outside the orm.
+
+Shapes executed at least 'n_plus_one_threshold' times in one request
+ are reported as N+1 suspects. The summary is logged when the request
+ finishes, framework.middleware.debug.Toolbar adds it to html pages.
+"""
+import collections
+import logging
+import os
+import re
+import sys
+import threading
+
+from framework import instrumentation
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_placeholder_list = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)')
+_whitespace = re.compile(r'\s+')
+
+# frames from these files are skipped when looking for the call site
+_orm_files = set()
+
+
+def _module_file(module):
+    return os.path.normcase(os.path.splitext(os.path.abspath(module.__file__))[0])
+
+
+def skip_module(module):
+    """
+    Exclude the frames of a module from call site detection
+
+    :param module: module object
+    :return: None
+    """
+    _orm_files.add(_module_file(module))
+
+
+def sql_shape(sql):
+    """
+    Normalize sql so that queries differing only in parameters are equal
+
+    :param sql: sql string
+    :return: normalized sql
+    """
+    shape = _string_literal.sub('?', sql)
+    shape = _number_literal.sub('?', shape)
+    shape = _placeholder_list.sub('(?...)', shape)
+    return _whitespace.sub(' ', shape).strip()
+
+
+def call_site(depth=2):
+    """
+    Find the first frame outside the orm and this module
+
+    :param depth: frames to skip unconditionally
+    :return: 'path/to/file.py:line in function' or None
+    """
+    frame = sys._getframe(depth)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.normcase(os.path.splitext(filename)[0]) not in _orm_files:
+            parts = filename.replace('\\', '/').rsplit('/', 3)[-3:]
+            return '{}:{} in {}'.format(
+                '/'.join(parts), frame.f_lineno, frame.f_code.co_name
+            )
+        frame = frame.f_back
+    return None
+
+
+class Query(object):
+    """A single executed query"""
+    __slots__ = 'shape', 'duration', 'site'
+
+    def __init__(self, shape, duration, site):
+        self.shape = shape
+        self.duration = duration
+        self.site = site
+
+    def __repr__(self):
+        return '<Query {:.3f}ms {}>'.format(self.duration * 1000, self.shape)
+
+
+class QueryLog(object):
+    """
+    Queries executed while handling one request
+    """
+    __slots__ = 'queries', 'threshold'
+
+    def __init__(self, threshold=3):
+        self.queries = []
+        self.threshold = threshold
+
+    def record(self, sql, duration, site=None):
+        self.queries.append(Query(sql_shape(sql), duration, site))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(query.duration for query in self.queries)
+
+    def by_shape(self):
+        """
+        Group the queries by shape
+
+        :return: OrderedDict {shape: [Query]} in order of first execution
+        """
+        shapes = collections.OrderedDict()
+        for query in self.queries:
+            shapes.setdefault(query.shape, []).append(query)
+        return shapes
+
+    def suspects(self):
+        """
+        Shapes executed at least threshold times, most frequent first
+
+        :return: list of (shape, [Query])
+        """
+        return sorted(
+            (
+                (shape, queries)
+                for shape, queries in self.by_shape().items()
+                if len(queries) >= self.threshold
+            ),
+            key=lambda a: len(a[1]),
+            reverse=True
+        )
+
+    def report(self, route=None):
+        """
+        Log a summary and a warning for each N+1 suspect
+
+        :param route: name of the route for the messages
+        :return: None
+        """
+        logger = logging.getLogger(__name__)
+        logger.debug('{} queries in {:.3f}ms for {}'.format(
+            self.count, self.duration * 1000, route
+        ))
+        for shape, queries in self.suspects():
+            sites = collections.Counter(q.site for q in queries)
+            logger.warning(
+                'possible N+1 in {}: {} queries of shape "{}" from {}'.format(
+                    route, len(queries), shape, ', '.join(
+                        '{} ({}x)'.format(site, count)
+                        for site, count in sites.most_common()
+                    )
+                )
+            )
+
+
+class _Local(threading.local):
+    log = None
+
+
+_local = _Local()
+
+
+def current():
+    """
+    The query log of the request handled by the current thread
+
+    :return: QueryLog or None
+    """
+    return _local.log
+
+
+def record(sql, duration):
+    """
+    Record an executed query in the current query log, if any
+
+    :param sql: executed sql
+    :param duration: seconds
+    :return: None
+    """
+    log = _local.log
+    if log is not None:
+        log.record(sql, duration, call_site(2))
+
+
+class QueryAccounting(instrumentation.Collector):
+    """
+    Opens a query log for each traced request and reports it
+    """
+    __slots__ = ()
+
+    @component.inject_method(SettingsDict)
+    def trace_started(self, settings, request, trace):
+        if settings.get('query_accounting', False):
+            _local.log = QueryLog(settings.get('n_plus_one_threshold', 3))
+        else:
+            _local.log = None
+
+    def trace_finished(self, request, response, trace):
+        log, _local.log = _local.log, None
+        if log is not None:
+            log.report(trace.route)
+
+
+QueryAccounting.register_class()
+instrumentation.tracing_settings.append('query_accounting')
+skip_module(sys.modules[__name__])
@@ -0,0 +1,273 @@
+"""
+Routing of reads to database replicas
+
+With replicas in the 'database' setting
+
+    database: {
+      type: 'mysql', database: 'dc', host: 'primary', user: 'dc',
+      replicas: [{host: 'replica1'}, {host: 'replica2'}]
+    }
+
+(each replica entry overrides the connection parameters of the
+ primary), SELECT statements are sent to the replicas round-robin.
+ Writes, reads inside transactions and SELECT ... FOR UPDATE go to the
+ primary.
+
+Read your writes: once a thread wrote, or while it handles a POST
+ request, all queries go to the primary until the request finishes.
+ The response of a non GET request that wrote pins the client to the
+ primary for 'replica_pin_seconds' seconds by a cookie, so the redirect
+ after a form submission shows the new data even if the replicas lag
+ behind. Writes during GET requests are bookkeeping (csrf tokens for
+ instance) and do not pin, otherwise every visitor would carry the
+ cookie, bypassing request coalescing and the page cache.
+
+A replica failing a query is probed with 'SELECT 1'. If the probe
+ fails too it is taken out of rotation for 'replica_retry_interval'
+ seconds and the query retried elsewhere, eventually on the primary.
+"""
+import http.cookies
+import itertools
+import logging
+import threading
+import time
+
+import peewee
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+PIN_COOKIE = 'DCPRIMARY'
+
+_connection_errors = (peewee.OperationalError, peewee.InterfaceError)
+
+
+def is_read(sql):
+    """
+    Whether sql may run on a replica
+
+    :param sql: sql string
+    :return: bool
+    """
+    head = sql.lstrip()[:6].upper()
+    return head == 'SELECT' and 'FOR UPDATE' not in sql.upper()
+
+
+def in_transaction(database):
+    """
+    :param database: peewee database
+    :return: whether the current thread is inside a transaction
+    """
+    check = getattr(database, 'in_transaction', None)
+    if check is not None:
+        return check()
+    return database.transaction_depth() > 0
+
+
+class Replica(object):
+    """
+    A replica database and its health
+    """
+    __slots__ = 'name', 'database', 'down_until'
+
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+        self.down_until = None
+
+    def healthy(self, now):
+        return self.down_until is None or self.down_until <= now
+
+    def probe(self):
+        """
+        :return: whether the replica answers a trivial query
+        """
+        try:
+            self.database.execute_sql('SELECT 1').fetchall()
+        except _connection_errors:
+            return False
+        return True
+
+
+class ReplicaSet(object):
+    """
+    Round-robin over the healthy replicas
+    """
+    __slots__ = 'replicas', 'retry_interval', 'clock', '_cycle', '_lock'
+
+    def __init__(self, replicas, retry_interval=5, clock=time.monotonic):
+        """
+        :param replicas: sequence of Replica
+        :param retry_interval: seconds a failed replica is skipped
+        :param clock: time source
+        """
+        self.replicas = tuple(replicas)
+        self.retry_interval = retry_interval
+        self.clock = clock
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+
+    def choose(self, exclude=()):
+        """
+        Next healthy replica
+
+        :param exclude: replicas not to choose
+        :return: Replica or None if none is healthy
+        """
+        now = self.clock()
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if replica not in exclude and replica.healthy(now):
+                    return replica
+        return None
+
+    def failed(self, replica, error):
+        """
+        Handle a query failing on replica
+
+        :param replica: Replica
+        :param error: the exception
+        :return: whether the replica was taken out of rotation,
+            otherwise the query itself is at fault
+        """
+        if replica.probe():
+            return False
+        replica.down_until = self.clock() + self.retry_interval
+        logging.getLogger(__name__).warning(
+            'replica {} down for {}s: {}'.format(
+                replica.name, self.retry_interval, error
+            )
+        )
+        return True
+
+
+class _Local(threading.local):
+    pinned = False
+    wrote = False
+
+
+_local = _Local()
+
+
+def pinned():
+    """
+    Whether the current thread reads from the primary
+
+    :return: bool
+    """
+    return _local.pinned
+
+
+def pin():
+    """
+    Send all further queries of the current request to the primary
+
+    :return: None
+    """
+    _local.pinned = True
+
+
+def reset():
+    """
+    Forget the read your writes state of the current thread
+
+    :return: None
+    """
+    _local.wrote = False
+    _local.pinned = False
+
+
+class Routing(object):
+    """
+    Database mixin sending reads to a ReplicaSet
+    """
+
+    def __init__(self, *args, replicas=None, **kwargs):
+        """
+        :param replicas: ReplicaSet or None to use only this database
+        """
+        self.replicas = replicas
+        super().__init__(*args, **kwargs)
+
+    def execute_sql(self, sql, *args, **kwargs):
+        if self.replicas is None:
+            return super().execute_sql(sql, *args, **kwargs)
+        if not is_read(sql):
+            _local.wrote = True
+            _local.pinned = True
+        elif not _local.pinned and not in_transaction(self):
+            tried = []
+            replica = self.replicas.choose()
+            while replica is not None:
+                try:
+                    return replica.database.execute_sql(sql, *args, **kwargs)
+                except _connection_errors as error:
+                    if not self.replicas.failed(replica, error):
+                        raise
+                tried.append(replica)
+                replica = self.replicas.choose(tried)
+        return super().execute_sql(sql, *args, **kwargs)
+
+
+class Scope(object):
+    """
+    Read your writes state of one request
+    """
+    __slots__ = 'pin_seconds', 'safe'
+
+    # methods whose writes do not pin the client
+    safe_methods = frozenset(('get', 'head'))
+
+    def __init__(self, request, pin_seconds=5):
+        """
+        :param request: http.Request
+        :param pin_seconds: seconds a client reads from the primary
+            after a non GET request that wrote
+        """
+        self.pin_seconds = pin_seconds
+        self.safe = request.method in self.safe_methods
+        _local.wrote = False
+        _local.pinned = request.method == 'post' or PIN_COOKIE in cookies(request)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        reset()
+
+    def stamp(self, response):
+        """
+        Pin the client to the primary if the request wrote
+         and was not a GET request
+
+        :param response: http.response.Response or None
+        :return: response
+        """
+        if (
+            response is None or self.safe or not _local.wrote
+            or not self.pin_seconds
+        ):
+            return response
+        if 'Set-Cookie' in response.headers and not response.cookies:
+            # set manually, we can not add to it
+            return response
+        response.cookies[PIN_COOKIE] = '1'
+        response.cookies[PIN_COOKIE]['max-age'] = self.pin_seconds
+        response.cookies[PIN_COOKIE]['path'] = '/'
+        response.headers['Set-Cookie'] = response.cookies.output(header='')[1:]
+        return response
+
+
+def cookies(request):
+    """
+    :param request: http.Request
+    :return: SimpleCookie of the request
+    """
+    header = None
+    for key in ('Cookie', 'HTTP_COOKIE'):
+        if key in request.headers:
+            header = request.headers[key].value
+    return http.cookies.SimpleCookie(header) if header else {}
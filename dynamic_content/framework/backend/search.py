@@ -0,0 +1,301 @@
+"""
+Full-text search indexes
+
+Documents consist of an id, a title and a body (html is stripped
+ before indexing). Two implementations with the same interface:
+
+    Fts5Index       an SQLite FTS5 virtual table in the database,
+                     ranked by bm25
+    MemoryIndex     an inverted index in the memory of the process,
+                     ranked by bm25 as well, for databases without FTS5
+
+create_index() picks one. Queries match documents containing all
+ words, title matches weigh TITLE_WEIGHT times as much as body matches.
+ Snippets are plain text with the matched words between
+ HIGHLIGHT_START and HIGHLIGHT_END, render_snippet() turns them into
+ html.
+"""
+import collections
+import html
+import logging
+import math
+import re
+import threading
+
+from . import orm
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+TITLE_WEIGHT = 5.0
+
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+# words around the first match in a snippet
+SNIPPET_WORDS = 16
+
+Hit = collections.namedtuple('Hit', ('doc_id', 'score', 'snippet'))
+
+_tag = re.compile(r'<[^>]*>')
+_word = re.compile(r'\w+')
+
+
+def strip_tags(text):
+    """
+    :param text: html
+    :return: plain text
+    """
+    return html.unescape(_tag.sub(' ', text or ''))
+
+
+def tokenize(text):
+    """
+    :param text: plain text
+    :return: list of lower case words
+    """
+    return [a.lower() for a in _word.findall(text or '')]
+
+
+def render_snippet(snippet):
+    """
+    :param snippet: snippet of a Hit
+    :return: html with the matches in <b> elements
+    """
+    return html.escape(snippet).replace(
+        HIGHLIGHT_START, '<b>'
+    ).replace(HIGHLIGHT_END, '</b>')
+
+
+class Index(object):
+    """
+    Index interface
+    """
+    __slots__ = ()
+
+    def update(self, doc_id, title, body):
+        """
+        Add or replace a document
+
+        :param doc_id: int
+        :param title: plain text
+        :param body: html or plain text
+        :return: None
+        """
+        raise NotImplementedError
+
+    def remove(self, doc_id):
+        raise NotImplementedError
+
+    def search(self, text, limit, offset=0):
+        """
+        :param text: query, all words have to match
+        :param limit: maximum number of hits
+        :param offset: number of best hits to skip
+        :return: list of Hit, best first
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryIndex(Index):
+    """
+    Inverted index with bm25 ranking
+    """
+    __slots__ = 'k1', 'b', '_postings', '_terms', '_lengths', '_bodies', '_lock'
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {doc_id: weighted term frequency}
+        self._postings = collections.defaultdict(dict)
+        # doc_id -> set of terms
+        self._terms = {}
+        # doc_id -> weighted length
+        self._lengths = {}
+        # doc_id -> body words for snippets
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def _unlink(self, doc_id):
+        for term in self._terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._lengths.pop(doc_id, None)
+        self._bodies.pop(doc_id, None)
+
+    def update(self, doc_id, title, body):
+        title_terms = tokenize(title)
+        words = strip_tags(body).split()
+        frequencies = collections.Counter()
+        for term in title_terms:
+            frequencies[term] += TITLE_WEIGHT
+        for term in tokenize(' '.join(words)):
+            frequencies[term] += 1
+        with self._lock:
+            self._unlink(doc_id)
+            for term, frequency in frequencies.items():
+                self._postings[term][doc_id] = frequency
+            self._terms[doc_id] = set(frequencies)
+            self._lengths[doc_id] = sum(frequencies.values())
+            self._bodies[doc_id] = words
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._unlink(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._terms.clear()
+            self._lengths.clear()
+            self._bodies.clear()
+
+    def _snippet(self, doc_id, terms):
+        words = self._bodies.get(doc_id, ())
+        matches = [
+            i for i, word in enumerate(words)
+            if set(tokenize(word)) & terms
+        ]
+        start = max(matches[0] - SNIPPET_WORDS // 2, 0) if matches else 0
+        window = words[start:start + SNIPPET_WORDS]
+        marked = [
+            HIGHLIGHT_START + word + HIGHLIGHT_END
+            if set(tokenize(word)) & terms else word
+            for word in window
+        ]
+        return (
+            ('... ' if start else '') + ' '.join(marked) +
+            (' ...' if start + SNIPPET_WORDS < len(words) else '')
+        )
+
+    def search(self, text, limit, offset=0):
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            count = len(self._lengths)
+            average = sum(self._lengths.values()) / count
+            candidates = set.intersection(*(set(a) for a in postings))
+            scores = {}
+            for doc_id in candidates:
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[doc_id] / average
+                )
+                score = 0.0
+                for term_postings in postings:
+                    frequency = term_postings[doc_id]
+                    idf = math.log(
+                        1 + (count - len(term_postings) + 0.5) /
+                        (len(term_postings) + 0.5)
+                    )
+                    score += idf * frequency * (self.k1 + 1) / (frequency + norm)
+                scores[doc_id] = score
+            ranked = sorted(scores.items(), key=lambda a: (-a[1], a[0]))
+            return [
+                Hit(doc_id, score, self._snippet(doc_id, terms))
+                for doc_id, score in ranked[offset:offset + limit]
+            ]
+
+
+class Fts5Index(Index):
+    """
+    Index stored in an SQLite FTS5 table, the document id is the rowid
+    """
+    __slots__ = 'database', 'table', 'created'
+
+    def __init__(self, database, table='search_index'):
+        """
+        :param database: peewee SqliteDatabase
+        :param table: name of the virtual table
+        """
+        self.database = database
+        self.table = table
+        self.created = table not in database.get_tables()
+        database.execute_sql(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS "{}" USING '
+            "fts5(title, body, tokenize='unicode61')".format(table)
+        )
+
+    def update(self, doc_id, title, body):
+        with self.database.atomic():
+            self.remove(doc_id)
+            self.database.execute_sql(
+                'INSERT INTO "{}" (rowid, title, body) VALUES (?, ?, ?)'.format(
+                    self.table
+                ),
+                (doc_id, title or '', strip_tags(body))
+            )
+
+    def remove(self, doc_id):
+        self.database.execute_sql(
+            'DELETE FROM "{}" WHERE rowid = ?'.format(self.table), (doc_id, )
+        )
+
+    def clear(self):
+        self.database.execute_sql('DELETE FROM "{}"'.format(self.table))
+
+    def search(self, text, limit, offset=0):
+        terms = tokenize(text)
+        if not terms:
+            return []
+        # quoted terms, the query syntax of fts5 is not exposed
+        match = ' '.join('"{}"'.format(term) for term in terms)
+        cursor = self.database.execute_sql(
+            'SELECT rowid, bm25("{0}", {1}, 1.0) AS score, '
+            'snippet("{0}", 1, ?, ?, \'...\', {2}) '
+            'FROM "{0}" WHERE "{0}" MATCH ? '
+            'ORDER BY score, rowid LIMIT ? OFFSET ?'.format(
+                self.table, TITLE_WEIGHT, SNIPPET_WORDS
+            ),
+            (HIGHLIGHT_START, HIGHLIGHT_END, match, limit, offset)
+        )
+        # bm25() is lower for better matches
+        return [Hit(a[0], -a[1], a[2]) for a in cursor.fetchall()]
+
+
+def fts5_available(database):
+    """
+    :param database: peewee database
+    :return: whether the database supports FTS5 tables
+    """
+    if not isinstance(database, orm.SqliteDatabase):
+        return False
+    try:
+        database.execute_sql(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS temp."fts5_probe" USING fts5(a)'
+        )
+        database.execute_sql('DROP TABLE temp."fts5_probe"')
+    except orm.OperationalError:
+        return False
+    return True
+
+
+def create_index(database=None, kind='auto', table='search_index'):
+    """
+    :param database: defaults to the database proxy
+    :param kind: 'fts5', 'memory' or 'auto' for fts5 if available
+    :param table: name of the fts5 table
+    :return: Index, check the 'created' attribute of a Fts5Index
+        to know whether it needs to be filled
+    """
+    database = orm.database_proxy if database is None else database
+    if kind == 'memory':
+        return MemoryIndex()
+    if fts5_available(database):
+        return Fts5Index(database, table)
+    if kind == 'fts5':
+        raise ValueError('FTS5 is not available for {}'.format(database))
+    logging.getLogger(__name__).info(
+        'FTS5 not available, using the in memory search index'
+    )
+    return MemoryIndex()
@@ -0,0 +1,26 @@
+"""
+Cache layer shared by the caching features of the framework and modules
+
+The 'Cache' component stores pickled values in the backend configured
+ by the 'cache' setting, a dict with the backend 'type' and its options:
+
+    memory: in process LRU (max_entries)
+    shared: memory mapped table shared by processes (path, slots, slot_size)
+    disk: one file per entry (directory)
+    memcached: memcached servers (servers, pool_size, timeout)
+
+Features use their own namespace of the component, e.g.
+ cache.get_cache().namespace('page').
+"""
+from ._base import (
+    Backend, Cache, get_cache, create_backend, register_backend,
+    backend_types, make_key
+)
+from .memory import MemoryBackend
+from .shared import SharedMemoryBackend
+from .disk import DiskBackend
+from .memcached import MemcachedBackend
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
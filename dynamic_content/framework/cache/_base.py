@@ -0,0 +1,272 @@
+"""Cache component and backend interface"""
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+
+from framework import metrics
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+_TAG_PREFIX = '\x00tag:'
+
+
+class Backend(object):
+    """
+    Storage of a cache, maps string keys to bytes
+
+    Backends enforce the ttl themselves and may evict entries at any time.
+    """
+    __slots__ = ()
+
+    def get(self, key):
+        """
+        :param key: str
+        :return: bytes or None if missing or expired
+        """
+        raise NotImplementedError
+
+    def get_many(self, keys):
+        """
+        :param keys: iterable of str
+        :return: dict {key: bytes} of the keys found
+        """
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def set(self, key, value, ttl=None):
+        """
+        :param key: str
+        :param value: bytes
+        :param ttl: seconds until the entry expires, None for no expiry
+        :return: whether the value was stored
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+backend_types = {}
+
+
+def register_backend(name):
+    """
+    Class decorator making a backend available
+     as 'type' in the 'cache' setting
+
+    :param name: type name
+    :return: decorator
+    """
+    def inner(cls):
+        backend_types[name] = cls
+        return cls
+    return inner
+
+
+def make_key(*parts):
+    """
+    Fixed length key from arbitrary (repr-able) parts
+
+    :param parts: key components
+    :return: str
+    """
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+@component.inject(SettingsDict)
+def create_backend(settings, config=None):
+    """
+    Instantiate the backend described by config
+
+    Relative 'path' and 'directory' options are resolved
+     against the 'project_dir' setting.
+
+    :param settings: injected settings
+    :param config: dict with the backend 'type' and its options,
+        defaults to the 'cache' setting
+    :return: Backend
+    """
+    config = dict(config or settings.get('cache') or {'type': 'memory'})
+    cls = backend_types[config.pop('type', 'memory').lower()]
+    for option in ('path', 'directory'):
+        if option in config:
+            config[option] = str(
+                pathlib.Path(settings.get('project_dir', '.')) / config[option]
+            )
+    return cls(**config)
+
+
+@component.Component('Cache')
+class Cache(object):
+    """
+    Key value cache with ttl and tag based invalidation
+
+    Values are pickled, every get returns a fresh copy. Entries stored
+     with tags are invalidated together by invalidate(tag), tags are
+     shared by all namespaces.
+
+    The 'Cache' component is configured from the 'cache' setting,
+     features should use a namespace() of it.
+    """
+    __slots__ = 'backend', 'prefix', 'name'
+
+    def __init__(self, backend=None, prefix='', name=None):
+        """
+        :param backend: Backend or None to configure it from settings
+        :param prefix: prepended to all keys
+        :param name: cache name for the metrics or None to not record any
+        """
+        self.backend = backend
+        self.prefix = prefix
+        self.name = name
+
+    def _backend(self):
+        if self.backend is None:
+            self.backend = create_backend()
+        return self.backend
+
+    def namespace(self, prefix, record=True):
+        """
+        View of this cache with its own key space
+
+        :param prefix: namespace name
+        :param record: whether to report hits and misses as cache prefix
+        :return: Cache
+        """
+        return type(self)(
+            self._backend(),
+            self.prefix + prefix + ':',
+            prefix if record else None
+        )
+
+    def _record(self, hit):
+        if self.name is not None:
+            if hit:
+                metrics.cache_hit(self.name)
+            else:
+                metrics.cache_miss(self.name)
+
+    def _load(self, key, raw):
+        try:
+            value, tags = pickle.loads(raw)
+        except Exception as error:
+            logging.getLogger(__name__).warning(
+                'Dropping unreadable cache entry {}: {}'.format(key, error)
+            )
+            self._backend().delete(key)
+            return False, None
+        if tags:
+            current = self._backend().get_many(tags)
+            if any(current.get(tag) != token for tag, token in tags.items()):
+                self._backend().delete(key)
+                return False, None
+        return True, value
+
+    def get(self, key, default=None):
+        """
+        :param key: str
+        :param default: returned if key is missing
+        :return: cached value or default
+        """
+        key = self.prefix + key
+        raw = self._backend().get(key)
+        found, value = (False, None) if raw is None else self._load(key, raw)
+        self._record(found)
+        return value if found else default
+
+    def get_many(self, keys):
+        """
+        :param keys: iterable of str
+        :return: dict {key: value} of the keys found
+        """
+        keys = tuple(keys)
+        raw = self._backend().get_many(self.prefix + key for key in keys)
+        result = {}
+        for key in keys:
+            entry = raw.get(self.prefix + key)
+            found, value = (False, None) if entry is None else self._load(
+                self.prefix + key, entry
+            )
+            self._record(found)
+            if found:
+                result[key] = value
+        return result
+
+    def _tag_tokens(self, tags):
+        keys = tuple(_TAG_PREFIX + tag for tag in tags)
+        tokens = self._backend().get_many(keys)
+        for key in keys:
+            if key not in tokens:
+                tokens[key] = os.urandom(8)
+                self._backend().set(key, tokens[key])
+        return tokens
+
+    def set(self, key, value, ttl=None, tags=(), strict=False):
+        """
+        :param key: str
+        :param value: any picklable object
+        :param ttl: seconds until the entry expires, None for no expiry
+        :param tags: iterable of tag names
+        :param strict: raise instead of logging if value cannot be pickled
+        :return: whether the value was stored
+        """
+        tags = self._tag_tokens(tags) if tags else None
+        try:
+            raw = pickle.dumps((value, tags), pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            if strict:
+                raise
+            logging.getLogger(__name__).warning(
+                'Not caching {}: {}'.format(key, error)
+            )
+            return False
+        return self._backend().set(self.prefix + key, raw, ttl)
+
+    def delete(self, key):
+        self._backend().delete(self.prefix + key)
+
+    def invalidate(self, *tags):
+        """
+        Invalidate all entries stored with any of the tags
+
+        :param tags: tag names
+        :return: None
+        """
+        for tag in tags:
+            self._backend().set(_TAG_PREFIX + tag, os.urandom(8))
+
+    def clear(self):
+        """
+        Remove all entries of all namespaces
+
+        :return: None
+        """
+        self._backend().clear()
+
+
+@component.inject(Cache)
+def get_cache(cache):
+    """
+    Convenience method to obtain the cache
+
+    :param cache: injected cache component
+    :return: Cache
+    """
+    return cache
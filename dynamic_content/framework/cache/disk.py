@@ -0,0 +1,88 @@
+"""On disk cache backend, one file per entry"""
+import hashlib
+import os
+import pathlib
+import shutil
+import struct
+import tempfile
+import time
+
+from ._base import Backend, register_backend
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+# expiry timestamp, 0 for no expiry
+_header = struct.Struct('<d')
+
+
+@register_backend('disk')
+class DiskBackend(Backend):
+    """
+    Entries stored as files below directory
+
+    Survives restarts and is shared by all processes using the same
+     directory. Files are replaced atomically, expired entries are
+     removed when read.
+    """
+    __slots__ = 'directory', 'clock'
+
+    def __init__(self, directory, clock=time.time):
+        """
+        :param directory: cache directory, created if missing
+        :param clock: time source
+        """
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.directory / digest[:2] / digest[2:]
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with path.open('rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < _header.size:
+            return None
+        expires, = _header.unpack_from(data)
+        if expires and expires <= self.clock():
+            self._remove(path)
+            return None
+        return data[_header.size:]
+
+    def set(self, key, value, ttl=None):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        expires = 0.0 if ttl is None else self.clock() + ttl
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(_header.pack(expires))
+                file.write(value)
+            os.replace(tmp, str(path))
+        except OSError:
+            self._remove(pathlib.Path(tmp))
+            return False
+        return True
+
+    @staticmethod
+    def _remove(path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key):
+        self._remove(self._path(key))
+
+    def clear(self):
+        for child in self.directory.iterdir():
+            if child.is_dir():
+                shutil.rmtree(str(child), ignore_errors=True)
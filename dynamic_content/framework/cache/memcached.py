@@ -0,0 +1,300 @@
+"""
+Memcached cache backend
+
+Speaks the memcached text protocol with any number of servers. Keys are
+ distributed by a consistent hash ring, so adding or removing a server
+ only moves the keys of that server. Every server has a small pool of
+ persistent connections, get_many() sends one multi-get per server.
+
+Unreachable servers are treated as cache misses (and failed stores),
+ the error is logged and the connection discarded.
+
+For tests and single host development framework.cache.standin provides
+ a compatible server.
+"""
+import bisect
+import collections
+import hashlib
+import logging
+import math
+import socket
+import threading
+
+from ._base import Backend, register_backend
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+# memcached interprets larger expiration times as unix timestamps
+MAX_RELATIVE_TTL = 60 * 60 * 24 * 30
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def parse_address(address):
+    """
+    :param address: 'host:port' or 'host'
+    :return: tuple (host, port)
+    """
+    host, _, port = address.rpartition(':')
+    if not host:
+        return port, 11211
+    return host, int(port)
+
+
+class HashRing(object):
+    """
+    Consistent hash ring with virtual nodes
+    """
+    __slots__ = 'nodes', '_hashes', '_owners'
+
+    def __init__(self, nodes, replicas=100):
+        """
+        :param nodes: sequence of node names
+        :param replicas: virtual nodes per node
+        """
+        self.nodes = tuple(nodes)
+        if not self.nodes:
+            raise ValueError('HashRing needs at least one node')
+        points = sorted(
+            (self.hash('{}-{}'.format(node, i)), node)
+            for node in self.nodes
+            for i in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def hash(key):
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def node(self, key):
+        """
+        :param key: str
+        :return: node responsible for key
+        """
+        index = bisect.bisect(self._hashes, self.hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class Connection(object):
+    """
+    Socket to a memcached server with line buffering
+    """
+    __slots__ = 'address', 'socket', '_buffer'
+
+    def __init__(self, address, timeout):
+        self.address = address
+        self.socket = socket.create_connection(address, timeout)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = bytearray()
+
+    def send(self, data):
+        self.socket.sendall(data)
+
+    def _fill(self):
+        chunk = self.socket.recv(65536)
+        if not chunk:
+            raise ConnectionError('connection closed by {}:{}'.format(*self.address))
+        self._buffer += chunk
+
+    def readline(self):
+        while True:
+            index = self._buffer.find(b'\r\n')
+            if index >= 0:
+                line = bytes(self._buffer[:index])
+                del self._buffer[:index + 2]
+                return line
+            self._fill()
+
+    def read(self, length):
+        """
+        Read length bytes followed by a line break
+
+        :param length: number of bytes
+        :return: bytes
+        """
+        while len(self._buffer) < length + 2:
+            self._fill()
+        data = bytes(self._buffer[:length])
+        del self._buffer[:length + 2]
+        return data
+
+    def close(self):
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+
+class Pool(object):
+    """
+    Idle connections to one server
+    """
+    __slots__ = 'address', 'size', 'timeout', '_idle', '_lock'
+
+    def __init__(self, address, size, timeout):
+        self.address = address
+        self.size = size
+        self.timeout = timeout
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return Connection(self.address, self.timeout)
+
+    def release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            while self._idle:
+                self._idle.pop().close()
+
+
+@register_backend('memcached')
+class MemcachedBackend(Backend):
+    """
+    Cache stored on one or more memcached servers
+    """
+    __slots__ = 'ring', 'pools'
+
+    def __init__(self, servers=('localhost:11211', ), pool_size=4,
+                 timeout=1.0, replicas=100):
+        """
+        :param servers: sequence of 'host:port' strings
+        :param pool_size: idle connections kept per server
+        :param timeout: socket timeout in seconds
+        :param replicas: virtual nodes per server on the hash ring
+        """
+        if isinstance(servers, str):
+            servers = servers,
+        self.ring = HashRing(servers, replicas)
+        self.pools = {
+            server: Pool(parse_address(server), pool_size, timeout)
+            for server in servers
+        }
+
+    @staticmethod
+    def _key(key):
+        # memcached keys are limited to 250 bytes without whitespace
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _call(self, server, function, default):
+        pool = self.pools[server]
+        try:
+            connection = pool.acquire()
+        except OSError as error:
+            logging.getLogger(__name__).warning(
+                'memcached {} unreachable: {}'.format(server, error)
+            )
+            return default
+        try:
+            result = function(connection)
+        except (OSError, ProtocolError, ValueError) as error:
+            logging.getLogger(__name__).warning(
+                'memcached {} failed: {}'.format(server, error)
+            )
+            connection.close()
+            return default
+        pool.release(connection)
+        return result
+
+    @staticmethod
+    def _retrieve(connection, keys):
+        connection.send(b'get ' + b' '.join(k.encode() for k in keys) + b'\r\n')
+        values = {}
+        while True:
+            line = connection.readline()
+            if line == b'END':
+                return values
+            parts = line.split()
+            if len(parts) < 4 or parts[0] != b'VALUE':
+                raise ProtocolError(line)
+            values[parts[1].decode()] = connection.read(int(parts[3]))
+
+    def get(self, key):
+        key = self._key(key)
+        return self._call(
+            self.ring.node(key),
+            lambda connection: self._retrieve(connection, (key, )),
+            {}
+        ).get(key)
+
+    def get_many(self, keys):
+        by_server = collections.defaultdict(dict)
+        for key in keys:
+            hashed = self._key(key)
+            by_server[self.ring.node(hashed)][hashed] = key
+        result = {}
+        for server, hashed in by_server.items():
+            values = self._call(
+                server,
+                lambda connection: self._retrieve(connection, tuple(hashed)),
+                {}
+            )
+            for key, value in values.items():
+                result[hashed[key]] = value
+        return result
+
+    @staticmethod
+    def _command(connection, command, expected, data=None):
+        connection.send(
+            command + b'\r\n' if data is None else command + b'\r\n' + data + b'\r\n'
+        )
+        reply = connection.readline()
+        if reply not in expected:
+            raise ProtocolError(reply)
+        return reply
+
+    def set(self, key, value, ttl=None):
+        key = self._key(key)
+        if ttl is None:
+            exptime = 0
+        else:
+            exptime = min(max(int(math.ceil(ttl)), 1), MAX_RELATIVE_TTL)
+        return self._call(
+            self.ring.node(key),
+            lambda connection: self._command(
+                connection,
+                'set {} 0 {} {}'.format(key, exptime, len(value)).encode(),
+                (b'STORED', ),
+                value
+            ) == b'STORED',
+            False
+        )
+
+    def delete(self, key):
+        key = self._key(key)
+        self._call(
+            self.ring.node(key),
+            lambda connection: self._command(
+                connection,
+                'delete {}'.format(key).encode(),
+                (b'DELETED', b'NOT_FOUND')
+            ),
+            None
+        )
+
+    def clear(self):
+        for server in self.pools:
+            self._call(
+                server,
+                lambda connection: self._command(connection, b'flush_all', (b'OK', )),
+                None
+            )
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
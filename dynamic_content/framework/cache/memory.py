@@ -0,0 +1,61 @@
+"""In process least recently used cache backend"""
+import collections
+import threading
+import time
+
+from ._base import Backend, register_backend
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+@register_backend('memory')
+class MemoryBackend(Backend):
+    """
+    Entries of this process only, the least recently used
+     entries are evicted beyond max_entries
+    """
+    __slots__ = 'max_entries', 'clock', '_entries', '_lock'
+
+    def __init__(self, max_entries=4096, clock=time.time):
+        """
+        :param max_entries: maximum number of entries
+        :param clock: time source
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            self._entries[key] = expires, value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
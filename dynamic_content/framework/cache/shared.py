@@ -0,0 +1,163 @@
+"""
+Shared memory cache backend
+
+A fixed size hash table in a memory mapped file. Every process mapping
+ the same file (e.g. pre-forked workers) sees the same entries.
+
+The table has 'slots' slots of 'slot_size' bytes each, entries are
+ placed by the hash of their key and a few neighbouring slots. Values
+ not fitting into a slot are not stored, when all candidate slots are
+ taken the entry in the first one is replaced.
+
+Access is serialized by POSIX record locks on the file (readers share
+ the lock), which unlike flock() also exclude forked processes.
+"""
+import contextlib
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+from ._base import Backend, register_backend
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+MAGIC = b'dccache1'
+
+# magic, slots, slot_size
+_file_header = struct.Struct('<8sII')
+# key digest, expiry timestamp (0 for none), value length
+_slot_header = struct.Struct('<16sdI4x')
+
+_empty = bytes(16)
+
+PROBES = 4
+
+
+@register_backend('shared')
+class SharedMemoryBackend(Backend):
+    """
+    Fixed size cache table shared by all processes mapping path
+    """
+    __slots__ = 'path', 'slots', 'slot_size', 'clock', '_fd', '_map', '_lock'
+
+    def __init__(self, path, slots=4096, slot_size=4096, clock=time.time):
+        """
+        :param path: file backing the table, (re)initialized if its
+            layout does not match
+        :param slots: number of entries
+        :param slot_size: bytes per entry including a 32 byte header
+        :param clock: time source
+        """
+        if slot_size <= _slot_header.size:
+            raise ValueError('slot_size must exceed {}'.format(_slot_header.size))
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.clock = clock
+        self._lock = threading.Lock()
+        size = _file_header.size + slots * slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, _file_header.size, 0)
+            if (os.fstat(self._fd).st_size != size
+                    or header != _file_header.pack(MAGIC, slots, slot_size)):
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, _file_header.pack(MAGIC, slots, slot_size), 0)
+            self._map = mmap.mmap(self._fd, size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def capacity(self):
+        """
+        :return: maximum value size in bytes
+        """
+        return self.slot_size - _slot_header.size
+
+    @contextlib.contextmanager
+    def _locked(self, operation):
+        with self._lock:
+            fcntl.lockf(self._fd, operation)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, index):
+        return _file_header.size + index * self.slot_size
+
+    def _candidates(self, digest):
+        home = int.from_bytes(digest[:8], 'little') % self.slots
+        for i in range(min(PROBES, self.slots)):
+            yield self._offset((home + i) % self.slots)
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+    def _find(self, digest):
+        for offset in self._candidates(digest):
+            header = _slot_header.unpack_from(self._map, offset)
+            if header[0] == digest:
+                return offset, header
+        return None, None
+
+    def get(self, key):
+        digest = self._digest(key)
+        with self._locked(fcntl.LOCK_SH):
+            offset, header = self._find(digest)
+            if offset is None:
+                return None
+            _, expires, length = header
+            if expires and expires <= self.clock():
+                return None
+            start = offset + _slot_header.size
+            return self._map[start:start + length]
+
+    def set(self, key, value, ttl=None):
+        if len(value) > self.capacity:
+            return False
+        digest = self._digest(key)
+        expires = 0.0 if ttl is None else self.clock() + ttl
+        with self._locked(fcntl.LOCK_EX):
+            offset, _ = self._find(digest)
+            if offset is None:
+                now = self.clock()
+                for candidate in self._candidates(digest):
+                    other, other_expires, _ = _slot_header.unpack_from(
+                        self._map, candidate
+                    )
+                    if other == _empty or (other_expires and other_expires <= now):
+                        offset = candidate
+                        break
+                else:
+                    offset = next(self._candidates(digest))
+            start = offset + _slot_header.size
+            self._map[start:start + len(value)] = value
+            _slot_header.pack_into(self._map, offset, digest, expires, len(value))
+        return True
+
+    def delete(self, key):
+        digest = self._digest(key)
+        with self._locked(fcntl.LOCK_EX):
+            offset, _ = self._find(digest)
+            if offset is not None:
+                _slot_header.pack_into(self._map, offset, _empty, 0.0, 0)
+
+    def clear(self):
+        with self._locked(fcntl.LOCK_EX):
+            for index in range(self.slots):
+                _slot_header.pack_into(self._map, self._offset(index), _empty, 0.0, 0)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
@@ -0,0 +1,251 @@
+"""
+Memcached compatible stand-in server
+
+Implements the part of the memcached text protocol the memcached
+ backend and common clients use: get, gets, set, add, replace, append,
+ prepend, delete, touch, incr, decr, flush_all, version and quit.
+ Entries live in memory, there is no eviction besides expiry and
+ flush_all, hence for tests and single host development only.
+
+Run standalone with
+
+    python -m framework.cache.standin [--host localhost] [--port 11211]
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+VERSION = b'1.6.0-dynamic_content'
+
+# memcached interprets larger expiration times as unix timestamps
+MAX_RELATIVE_TTL = 60 * 60 * 24 * 30
+
+
+class Store(object):
+    """
+    Entries of the stand-in server
+    """
+    __slots__ = 'clock', '_entries', '_lock', '_cas'
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        # key -> [flags, expires, value, cas]
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._cas = 0
+
+    def expiry(self, exptime):
+        if exptime == 0:
+            return None
+        if exptime < 0:
+            return self.clock() - 1
+        if exptime > MAX_RELATIVE_TTL:
+            return exptime
+        return self.clock() + exptime
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, keys):
+        with self._lock:
+            return [(key, self._live(key)) for key in keys]
+
+    def store(self, command, key, flags, exptime, value):
+        """
+        :return: reply line
+        """
+        with self._lock:
+            entry = self._live(key)
+            if command == 'add' and entry is not None:
+                return b'NOT_STORED'
+            if command in ('replace', 'append', 'prepend') and entry is None:
+                return b'NOT_STORED'
+            self._cas += 1
+            if command == 'append':
+                entry[2] += value
+                entry[3] = self._cas
+            elif command == 'prepend':
+                entry[2] = value + entry[2]
+                entry[3] = self._cas
+            else:
+                self._entries[key] = [flags, self.expiry(exptime), value, self._cas]
+            return b'STORED'
+
+    def delete(self, key):
+        with self._lock:
+            if self._live(key) is None:
+                return b'NOT_FOUND'
+            del self._entries[key]
+            return b'DELETED'
+
+    def touch(self, key, exptime):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return b'NOT_FOUND'
+            entry[1] = self.expiry(exptime)
+            return b'TOUCHED'
+
+    def incr(self, key, delta):
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return b'NOT_FOUND'
+            try:
+                value = int(entry[2])
+            except ValueError:
+                return (
+                    b'CLIENT_ERROR cannot increment or decrement non-numeric value'
+                )
+            value = max(value + delta, 0) % 2 ** 64
+            self._cas += 1
+            entry[2] = str(value).encode()
+            entry[3] = self._cas
+            return entry[2]
+
+    def flush(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Handler(socketserver.StreamRequestHandler):
+    """
+    One client connection
+    """
+    storage_commands = frozenset({'set', 'add', 'replace', 'append', 'prepend'})
+
+    def reply(self, line):
+        self.wfile.write(line + b'\r\n')
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.split()
+            if not parts:
+                self.reply(b'ERROR')
+                continue
+            command = parts[0].decode('ascii', 'replace').lower()
+            noreply = parts[-1] == b'noreply'
+            if noreply:
+                parts = parts[:-1]
+            try:
+                result = self.dispatch(store, command, parts[1:])
+            except (ValueError, IndexError):
+                result = b'CLIENT_ERROR bad command line format\r\n'
+            if result is None:
+                return
+            if not noreply:
+                self.wfile.write(result)
+            self.wfile.flush()
+
+    def dispatch(self, store, command, args):
+        """
+        :return: bytes to send or None to close the connection
+        """
+        if command in ('get', 'gets'):
+            out = []
+            for key, entry in store.get([a.decode() for a in args]):
+                if entry is None:
+                    continue
+                flags, _, value, cas = entry
+                header = 'VALUE {} {} {}'.format(key, flags, len(value))
+                if command == 'gets':
+                    header += ' {}'.format(cas)
+                out.append(header.encode() + b'\r\n' + value + b'\r\n')
+            out.append(b'END\r\n')
+            return b''.join(out)
+        if command in self.storage_commands:
+            key, flags, exptime, length = (
+                args[0].decode(), int(args[1]), int(args[2]), int(args[3])
+            )
+            value = self.rfile.read(length + 2)
+            if len(value) != length + 2 or value[-2:] != b'\r\n':
+                return b'CLIENT_ERROR bad data chunk\r\n'
+            return store.store(command, key, flags, exptime, value[:-2]) + b'\r\n'
+        if command == 'delete':
+            return store.delete(args[0].decode()) + b'\r\n'
+        if command == 'touch':
+            return store.touch(args[0].decode(), int(args[1])) + b'\r\n'
+        if command in ('incr', 'decr'):
+            delta = int(args[1])
+            return store.incr(
+                args[0].decode(), delta if command == 'incr' else -delta
+            ) + b'\r\n'
+        if command == 'flush_all':
+            store.flush()
+            return b'OK\r\n'
+        if command == 'version':
+            return b'VERSION ' + VERSION + b'\r\n'
+        if command == 'quit':
+            return None
+        return b'ERROR\r\n'
+
+
+class Server(socketserver.ThreadingTCPServer):
+    """
+    Threaded stand-in server, port 0 picks a free port
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('localhost', 11211), store=None):
+        self.store = store if store is not None else Store()
+        super().__init__(address, Handler)
+
+    @property
+    def address(self):
+        """
+        :return: 'host:port' as used in the memcached backend settings
+        """
+        host, port = self.server_address[:2]
+        return '{}:{}'.format(host, port)
+
+    def start(self, poll_interval=0.1):
+        """
+        Serve in a daemon thread
+
+        :param poll_interval: seconds between checks for stop()
+        :return: the thread
+        """
+        thread = threading.Thread(
+            target=self.serve_forever,
+            args=(poll_interval, ),
+            name='memcached-standin',
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=11211)
+    args = parser.parse_args()
+    server = Server((args.host, args.port))
+    print('memcached stand-in listening on ' + server.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
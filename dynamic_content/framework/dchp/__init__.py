@@ -22,10 +22,13 @@ some special properties:
     varibles, functions, classes etc. are local to the html file, not the
      <?dchp ?> block, meaning functions etc. defined in one <?dchp ?>
      block are accessible in subsequest <?dchp ?> blocks.
+
+    regions wrapped in <dchpcache key="..."> elements and values passed
+     through cached(...) are reused across requests, see fragment
 """
 
 
-from . import parser, evaluator, formatter
+from . import parser, evaluator, formatter, fragment
 
 
 __author__ = 'Justus Adam'
@@ -1,5 +1,8 @@
 """Evaluate dhcp code blocks"""
-from . import parser
+import functools
+
+from . import parser, fragment
+from framework import instrumentation
 from framework.util.parser import elements
 
 
@@ -61,6 +64,35 @@ def find_code(dom_elements):
                 yield a
 
 
+def execute(element, context):
+    with instrumentation.span('dchp'):
+        element.executed = custom_exec(element.code, context)
+
+
+def evaluate_children(parent, context):
+    """
+    Run the code blocks below parent in document order
+
+    Cached fragments (see fragment) are replaced by their rendered content.
+
+    :param parent: html element
+    :param context: context variable
+    :return: None
+    """
+    children = parent.content()
+    for index, element in enumerate(children):
+        if isinstance(element, parser.DcHPElement):
+            execute(element, context)
+        elif isinstance(element, elements.Base):
+            if element.tag == fragment.TAG:
+                with instrumentation.span('dchp.fragment'):
+                    children[index] = fragment.render(
+                        element, context, evaluate_children
+                    )
+            else:
+                evaluate_children(element, context)
+
+
 def evaluate_dom(dom_root, context):
     """
     Take a dom root and a context and compile the contained code and run it
@@ -70,9 +102,11 @@ def evaluate_dom(dom_root, context):
     :return: dom_root with executed code
     """
     context['dom'] = context['window'] = dom_root
-    code = find_code((dom_root,))
-    for item in code:
-        item.executed = custom_exec(item.code, context)
+    context['cached'] = functools.partial(fragment.cached, context)
+    if isinstance(dom_root, parser.DcHPElement):
+        execute(dom_root, context)
+    else:
+        evaluate_children(dom_root, context)
     return dom_root
 
 
@@ -84,4 +118,6 @@ def evaluate_html(string, context):
     :param context: context for the evaluation
     :return: dom root element
     """
-    return evaluate_dom(parser.parse(string)[0], context)
\ No newline at end of file
+    with instrumentation.span('dchp.parse'):
+        dom_root = parser.parse(string)[0]
+    return evaluate_dom(dom_root, context)
\ No newline at end of file
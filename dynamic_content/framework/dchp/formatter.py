@@ -2,6 +2,7 @@
 import re
 import sys
 
+from framework import instrumentation
 from framework.http import response
 from ..machinery import component
 from . import evaluator
@@ -37,6 +38,7 @@ class TemplateFormatter(object):
             'redirect': self.redirect
         }
 
+    @instrumentation.timed('render')
     def __call__(self, view_name, dc_obj):
         c = ARG_REGEX.match(view_name) if view_name else None
 
@@ -0,0 +1,185 @@
+"""
+Fragment caching for DcHP templates
+
+A region of a template wrapped in a <dchpcache> element is rendered once
+ and reused from the 'fragment' namespace of the 'Cache' component
+ (see framework.cache) until its ttl expires:
+
+    <dchpcache key="'sidebar-' + theme" ttl="300" vary="group language">
+        ... html and <?dchp ?> blocks ...
+    </dchpcache>
+
+    key     python expression evaluated with the template globals
+    ttl     seconds, defaults to the 'fragment_cache_ttl' setting
+    vary    names of request properties the output depends on,
+             see vary_functions, separated by spaces or commas
+    tags    invalidation tags separated by spaces or commas
+
+The element itself is not part of the output. When the fragment is
+ reused the <?dchp ?> blocks inside are not executed, names they define
+ are hence not available to later blocks.
+
+Inside <?dchp ?> blocks cached(key, function, ttl, vary, tags) caches
+ the return value of function, usually a string to echo().
+"""
+import re
+
+from framework import cache as _cache
+from framework.includes import get_settings
+from framework.middleware import compression
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+TAG = 'dchpcache'
+
+_separator = re.compile(r'[\s,]+')
+
+
+def _client(context):
+    request = context.get('request')
+    return getattr(request, 'client', None) if request is not None else None
+
+
+def _group(context):
+    client = _client(context)
+    group = getattr(client, 'access_group', None) if client is not None else None
+    return getattr(group, 'oid', group)
+
+
+def _user(context):
+    client = _client(context)
+    user = getattr(client, 'user', None) if client is not None else None
+    return getattr(user, 'oid', user)
+
+
+def _language(context):
+    request = context.get('request')
+    if context.get('language') or request is None:
+        return context.get('language')
+    return compression.request_header(request, 'Accept-Language')
+
+
+def _path(context):
+    request = context.get('request')
+    return request.path if request is not None else None
+
+
+def _query(context):
+    request = context.get('request')
+    if request is None or not request.query:
+        return None
+    return tuple(sorted((k, tuple(v)) for k, v in request.query.items()))
+
+
+# vary option -> function(template globals) returning a hashable
+vary_functions = {
+    'group': _group,
+    'user': _user,
+    'language': _language,
+    'path': _path,
+    'query': _query
+}
+
+
+def register_vary(name):
+    """
+    Decorator adding a vary option
+
+    :param name: option name
+    :return: decorator
+    """
+    def inner(function):
+        vary_functions[name] = function
+        return function
+    return inner
+
+
+def split(value):
+    """
+    :param value: attribute value or iterable
+    :return: tuple of names
+    """
+    if value is None or value is False or value is True:
+        return ()
+    if isinstance(value, str):
+        return tuple(a for a in _separator.split(value) if a)
+    return tuple(value)
+
+
+def get_fragment_cache():
+    return _cache.get_cache().namespace('fragment')
+
+
+def fragment_key(context, key, vary):
+    """
+    Cache key of a fragment for the current request
+
+    :param context: template globals
+    :param key: user supplied key
+    :param vary: vary option names
+    :return: str
+    """
+    try:
+        values = tuple((name, vary_functions[name](context)) for name in vary)
+    except KeyError as error:
+        raise ValueError('Unknown fragment vary option {}'.format(error))
+    return _cache.make_key(key, values)
+
+
+def default_ttl():
+    return get_settings().get('fragment_cache_ttl', 60)
+
+
+def cached(context, key, function, ttl=None, vary=(), tags=()):
+    """
+    Return value of function, cached
+
+    :param context: template globals
+    :param key: hashable identifying the value
+    :param function: callable without arguments
+    :param ttl: seconds, defaults to the 'fragment_cache_ttl' setting
+    :param vary: vary option names, see vary_functions
+    :param tags: invalidation tags
+    :return: cached or computed value
+    """
+    ttl = default_ttl() if ttl is None else ttl
+    if not ttl:
+        return function()
+    fragments = get_fragment_cache()
+    full_key = fragment_key(context, key, split(vary))
+    value = fragments.get(full_key)
+    if value is None:
+        value = function()
+        fragments.set(full_key, value, ttl, split(tags))
+    return value
+
+
+def render(element, context, evaluate):
+    """
+    Rendered content of a <dchpcache> element
+
+    :param element: the element
+    :param context: template globals
+    :param evaluate: function(element, context) executing the
+        code blocks inside element
+    :return: str
+    """
+    params = element.value_params
+    if 'key' not in params:
+        raise SyntaxError('<{}> requires a key attribute'.format(TAG))
+    key = eval(params['key'], context)
+    ttl = float(params['ttl']) if params.get('ttl') else None
+
+    def compute():
+        evaluate(element, context)
+        return ''.join(
+            child if isinstance(child, str) else child.render()
+            for child in element.content()
+        )
+
+    return cached(
+        context, key, compute, ttl, params.get('vary'), params.get('tags')
+    )
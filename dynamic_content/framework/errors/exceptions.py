@@ -131,3 +131,27 @@ class IsNotLinked(LinkerException):
     """trying to unlink an unliked link"""
     def __init__(self, link):
         super().__init__('{} is not linked'.format(link))
+
+
+class RequestBodyTooLarge(DCException):
+    """The request body exceeds the configured size limit"""
+    def __init__(self, limit):
+        super().__init__(
+            'Request body exceeds the limit of {} bytes'.format(limit)
+        )
+        self.limit = limit
+
+
+class HashingQueueFull(DCException):
+    """All slots of the password hashing pool are taken"""
+    def __init__(self):
+        super().__init__('Password hashing queue is full')
+
+
+class HashingTimeout(DCException):
+    """A password hash was not computed within the 'hashing_timeout'"""
+    def __init__(self, timeout):
+        super().__init__(
+            'Password hashing took longer than {} seconds'.format(timeout)
+        )
+        self.timeout = timeout
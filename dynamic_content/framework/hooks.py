@@ -5,6 +5,7 @@ import logging
 
 from .machinery import component
 from .errors import exceptions
+from .util import module as _module
 
 __author__ = 'Justus Adam'
 __version__ = '0.1'
@@ -101,7 +102,7 @@ class ClassHook(Hook):
 
     @classmethod
     def blank_call_hooks_with(cls, executable, *args, **kwargs):
-        cls.manager().blank_call_hooks(cls.hook_name, executable, *args, **kwargs)
+        cls.manager().blank_call_hooks_with(cls.hook_name, executable, *args, **kwargs)
 
     @classmethod
     def return_call_hooks(cls, *args,**kwargs):
@@ -153,7 +154,7 @@ class InstanceHook(Hook):
         self.manager().blank_call_hooks(self.hook_name, *args, **kwargs)
 
     def blank_call_hooks_with(self, executable, *args, **kwargs):
-        self.manager().blank_call_hooks(self.hook_name, executable, *args, **kwargs)
+        self.manager().blank_call_hooks_with(self.hook_name, executable, *args, **kwargs)
 
     def return_call_hooks(self, *args,**kwargs):
         return self.manager().return_call_hooks(self.hook_name, *args, **kwargs)
@@ -286,6 +287,34 @@ class HookManager:
         container = self._hooks[hook]
         container.append(handler)
 
+    def remove_module(self, package):
+        """
+        Remove all hooks defined in package
+
+        Hook names initialized with a class from package are dropped
+         entirely so that the package can initialize them again when
+         it is imported anew.
+
+        :param package: dotted module name
+        :return: None
+        """
+        for name, container in tuple(self._hooks.items()):
+            if _module.defined_in(container.expected_class, package):
+                foreign = [
+                    h for h in container if not _module.defined_in(h, package)
+                ]
+                if foreign:
+                    logging.getLogger(__name__).warning(
+                        'Dropping hooks {} registered for {} of {}'.format(
+                            foreign, name, package
+                        )
+                    )
+                del self._hooks[name]
+            else:
+                container[:] = [
+                    h for h in container if not _module.defined_in(h, package)
+                ]
+
     def has_hook(self, hook):
         """
         Check whether a hook is present
@@ -6,7 +6,10 @@ import traceback
 import logging
 from http import server
 
-from framework import middleware, http
+from framework import middleware, http, instrumentation, metrics, startup
+from framework.backend import replicas
+from framework.middleware import pagecache
+from framework.http import coalesce, multipart
 from framework.errors import exceptions
 from framework.util import structures, catch_vardump
 from framework.machinery import component
@@ -33,6 +36,9 @@ class AppThread(threading.Thread):
         if self.loader:
             self.loader.load()
         self.load_formatter()
+        # stale cached pages are refreshed through this thread's pipeline
+        pagecache.get_page_cache().pipeline = self.process_request
+        startup.ready()
         self.run_server()
 
     def run_server(self):
@@ -52,16 +58,62 @@ class AppThread(threading.Thread):
         self.decorator = formatter
 
     @catch_vardump
-    @component.inject_method(pathmap='PathMap')
-    def process_request(self, request, pathmap):
+    def process_request(self, request):
         """
         Respond to a http.request.Request instance
 
+        Traces the request if instrumentation or metrics are enabled,
+         reads go to the primary database after writes
+         (see framework.backend.replicas).
+
+        :param request: the incoming and preprocessed request.
+        :return: http.response.Response object
+        """
+        coalesce.reset()
+        scope = replicas.Scope(
+            request, self.settings.get('replica_pin_seconds', 5)
+        )
+        with startup.first_request(request), scope:
+            trace = instrumentation.begin(request, self.settings)
+            if trace is None:
+                return scope.stamp(self.coalesced(request, None))
+            response = None
+            try:
+                response = self.coalesced(request, trace)
+            finally:
+                instrumentation.finish(trace, request, response, self.settings)
+            return scope.stamp(response)
+
+    def coalesced(self, request, trace):
+        """
+        Respond, sharing the response with identical concurrent requests
+         if request coalescing is enabled (see framework.http.coalesce)
+
+        :param request: the incoming and preprocessed request.
+        :param trace: instrumentation.Trace of the request or None
+        :return: http.response.Response object
+        """
+        if not self.settings.get('request_coalescing', False):
+            return self.respond(request, trace)
+        response, shared = coalesce.get_coalescer().process(
+            request, lambda: self.respond(request, trace)
+        )
+        if shared and self.settings.get('metrics', False):
+            metrics.cache_hit('request_coalescing')
+        return response
+
+    @component.inject_method(pathmap='PathMap')
+    def respond(self, request, trace, pathmap):
+        """
+        Run the request through middleware, controller and formatter
+
         :param request: the incoming and preprocessed request.
+        :param trace: instrumentation.Trace of the request or None
         :param pathmap: injected pathmap component
         :return: http.response.Response object
         """
-        res = middleware.Handler.return_call_hooks_with(
+        res = instrumentation.return_call_hooks_with(
+            trace, middleware.Handler, 'mw.request',
             lambda self, request: self.handle_request(request),
             request
         )
@@ -69,7 +121,10 @@ class AppThread(threading.Thread):
             return res
 
         try:
-            handler, args, kwargs = pathmap.resolve(request)
+            with instrumentation.span('resolve'):
+                handler, args, kwargs = pathmap.resolve(request)
+            if trace is not None:
+                trace.route = instrumentation.route_label(handler)
 
             dc_obj = structures.DynamicContent(
                 request=request,
@@ -80,7 +135,8 @@ class AppThread(threading.Thread):
                 handler_options=handler.options
             )
 
-            res = middleware.Handler.return_call_hooks_with(
+            res = instrumentation.return_call_hooks_with(
+                trace, middleware.Handler, 'mw.controller',
                 lambda self, dc_obj, handler, args, kwargs:
                 self.handle_controller(dc_obj, handler, args, kwargs),
                 dc_obj, handler, args, kwargs
@@ -88,15 +144,16 @@ class AppThread(threading.Thread):
             if res is not None:
                 return res
 
-            if 'no_context' not in handler.options or handler.options['no_context'] is True:
-                view = handler(*(dc_obj, ) + args, **kwargs)
-            elif 'no_context' in handler.options and handler.options['no_context'] is False:
-                view = handler(*args, **kwargs)
-            else:
-                raise TypeError(
-                    'Expected type {} for "no_context" option in handler'
-                    ', got {}'.format(bool, type(handler.options['no_context']))
-                )
+            with instrumentation.span('controller'):
+                if 'no_context' not in handler.options or handler.options['no_context'] is True:
+                    view = handler(*(dc_obj, ) + args, **kwargs)
+                elif 'no_context' in handler.options and handler.options['no_context'] is False:
+                    view = handler(*args, **kwargs)
+                else:
+                    raise TypeError(
+                        'Expected type {} for "no_context" option in handler'
+                        ', got {}'.format(bool, type(handler.options['no_context']))
+                    )
 
         except (exceptions.PathResolving,
                 exceptions.MethodHandlerNotFound) as e:
@@ -123,7 +180,8 @@ class AppThread(threading.Thread):
 
         # Allow view to directly return a response, mainly to handle errors
         if not isinstance(view, http.response.Response):
-            res = middleware.Handler.return_call_hooks_with(
+            res = instrumentation.return_call_hooks_with(
+                trace, middleware.Handler, 'mw.view',
                 lambda self, view, dc_obj: self.handle_view(view, dc_obj),
                 view, dc_obj
             )
@@ -134,7 +192,8 @@ class AppThread(threading.Thread):
         else:
             response = view
 
-        res = middleware.Handler.return_call_hooks_with(
+        res = instrumentation.return_call_hooks_with(
+            trace, middleware.Handler, 'mw.response',
             lambda self, request, response: self.handle_response(request, response),
             request, response
         )
@@ -159,16 +218,47 @@ class WGSI(AppThread):
         :param start_response: callback
         :return: response body
         """
-        request = self.wsgi_make_request(ssl_enabled, environ)
-        response = self.process_request(request)
+        try:
+            request = self.wsgi_make_request(ssl_enabled, environ)
+        except exceptions.RequestBodyTooLarge as error:
+            logging.getLogger(__name__).warning(error)
+            return self.wsgi_error(start_response, 413)
+        except ValueError as error:
+            logging.getLogger(__name__).warning(
+                'malformed request body: {}'.format(error)
+            )
+            return self.wsgi_error(start_response, 400)
+
+        try:
+            response = self.process_request(request)
+        finally:
+            request.close_files()
 
         start_response(
             '{} {}'.format(response.code,
                 server.BaseHTTPRequestHandler.responses[response.code][0]),
             list(response.headers.to_tuple())
         )
+        if self.settings.get('metrics', False):
+            metrics.record_response(response)
         return [response.body if response.body else ''.encode('utf-8')]
 
+    @staticmethod
+    def wsgi_error(start_response, code):
+        """
+        Respond with a bare error status
+
+        :param start_response: WSGI callback
+        :param code: http status code
+        :return: response body
+        """
+        start_response(
+            '{} {}'.format(code,
+                server.BaseHTTPRequestHandler.responses[code][0]),
+            [('Connection', 'close')]
+        )
+        return [b'']
+
     @staticmethod
     def wsgi_make_request(ssl_enabled, environ):
         """
@@ -189,9 +279,14 @@ class WGSI(AppThread):
             'HTTP_ACCEPT_LANGUAGE'
             }
         method = environ['REQUEST_METHOD'].lower()
+        form = files = None
         if method == 'post':
-            payload = environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'])).decode()
-            query = payload + environ['QUERY_STRING']
+            form, files, payload = multipart.parse_body(
+                environ['wsgi.input'],
+                environ.get('CONTENT_TYPE', ''),
+                environ.get('CONTENT_LENGTH', 0)
+            )
+            query = environ['QUERY_STRING']
         elif method == 'get':
             payload = None
             query = environ['QUERY_STRING']
@@ -206,7 +301,9 @@ class WGSI(AppThread):
             method=method,
             query_string=query,
             ssl_enabled=ssl_enabled,
-            payload=payload
+            payload=payload,
+            form=form,
+            files=files
         )
 
     def run_server(self):
@@ -239,8 +336,8 @@ class WGSI(AppThread):
 
 class HTTP(AppThread):
     """Plain HTTP server thread"""
-    def __init__(self, ssl_enabled, name='HTTP-Server'):
-        super().__init__(ssl_enabled, name)
+    def __init__(self, ssl_enabled, loader=None, name='HTTP-Server'):
+        super().__init__(ssl_enabled, name, loader)
 
     def http_callback(self, request):
         """
@@ -0,0 +1,233 @@
+"""
+Request coalescing (single-flight)
+
+Identical GET requests of anonymous clients arriving while the first of
+ them is still being processed wait for that computation and share its
+ response instead of running middleware, controller and template
+ rendering again. This keeps a traffic spike on a freshly published (and
+ therefore uncached) page from multiplying the database load.
+
+Requests are identical if host, path, query, scheme and the headers
+ the response may vary on (Accept-Encoding, Accept-Language) are equal.
+ Requests sending cookies are never coalesced, neither are responses
+ setting cookies or marked private shared (see mark_private()).
+ The page cache (framework.middleware.pagecache) follows the same
+ rules. A waiting request computes its own response if
+ the first one fails or takes longer than 'coalescing_timeout' seconds.
+
+Enabled with the 'request_coalescing' setting.
+"""
+import threading
+
+from framework.includes import SettingsDict
+from framework.machinery import component
+from framework.middleware import compression
+from . import response as _response
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+vary_headers = 'Accept-Encoding', 'Accept-Language'
+
+
+class _Call(object):
+    __slots__ = 'done', 'result', 'failed'
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight(object):
+    """
+    Deduplicate concurrent calls with the same key
+    """
+    __slots__ = '_calls', '_lock'
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self):
+        """
+        :return: number of keys currently being computed
+        """
+        return len(self._calls)
+
+    def do(self, key, function, timeout=None, share=None):
+        """
+        Call function unless a call for key is already running,
+         in which case its result is awaited and returned
+
+        If the running call raises, does not finish within timeout or
+         its result may not be shared function is called directly.
+
+        :param key: hashable
+        :param function: callable without arguments
+        :param timeout: seconds to wait for a running call, None waits forever
+        :param share: called with the result before waiting calls are
+            released, returns the value handed to them or None if the
+            result may not be shared
+        :return: tuple (result, shared)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                result = function()
+                call.result = result if share is None else share(result)
+                call.failed = call.result is None
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return result, False
+
+        if not call.done.wait(timeout) or call.failed:
+            return function(), False
+        return call.result, True
+
+
+class _Local(threading.local):
+    private = False
+
+
+_local = _Local()
+
+
+def mark_private():
+    """
+    Mark the response to the current request as meant for this client
+     only, for instance because it contains a single use csrf token.
+     It will neither be shared with other requests nor cached.
+
+    :return: None
+    """
+    _local.private = True
+
+
+def reset():
+    """
+    Forget the private mark of the current thread,
+     done at the start of every request
+
+    :return: None
+    """
+    _local.private = False
+
+
+def request_key(request):
+    """
+    Key identifying requests that may share a response
+
+    :param request: http.Request
+    :return: hashable or None if the request may not be coalesced
+    """
+    if (request.method != 'get'
+            or compression.request_header(request, 'Cookie') is not None):
+        return None
+    query = request.query or {}
+    return (
+        request.ssl_enabled,
+        request.host,
+        request.path,
+        tuple(sorted((k, tuple(v)) for k, v in query.items())),
+        tuple(compression.request_header(request, name) for name in vary_headers)
+    )
+
+
+def shareable(response):
+    """
+    Whether a response may be handed to other clients
+
+    Must be called on the thread that produced response.
+
+    :param response: http.response.Response
+    :return: bool
+    """
+    return (
+        not _local.private
+        and isinstance(response, _response.Response)
+        and not response.cookies
+        and 'Set-Cookie' not in response.headers
+    )
+
+
+def copy_response(response):
+    """
+    Shallow copy of a response, the servers add headers while sending
+
+    :param response: http.response.Response
+    :return: http.response.Response
+    """
+    return _response.Response(
+        body=response.body,
+        code=response.code,
+        headers=response.headers
+    )
+
+
+def snapshot(response):
+    """
+    Copy of a shareable response taken before it is sent
+
+    :param response: http.response.Response
+    :return: http.response.Response or None
+    """
+    return copy_response(response) if shareable(response) else None
+
+
+@component.Component('RequestCoalescer')
+class Coalescer(object):
+    """
+    Single-flight group for requests shared by all server threads
+    """
+    __slots__ = 'flight', 'timeout'
+
+    def __init__(self):
+        self.flight = SingleFlight()
+        self.timeout = None
+
+    @component.inject_method(SettingsDict)
+    def configure(self, settings):
+        self.timeout = settings.get('coalescing_timeout', 10)
+
+    def process(self, request, function):
+        """
+        Run function for request, coalesced with identical requests
+
+        :param request: http.Request
+        :param function: callable without arguments returning the response
+        :return: tuple (response, shared)
+        """
+        key = request_key(request)
+        if key is None:
+            return function(), False
+        if self.timeout is None:
+            self.configure()
+        result, shared = self.flight.do(key, function, self.timeout, snapshot)
+        if shared:
+            # every waiting request gets its own copy of the snapshot
+            result = copy_response(result)
+        return result, shared
+
+
+@component.inject('RequestCoalescer')
+def get_coalescer(coalescer):
+    """
+    Convenience method to obtain the request coalescer
+
+    :param coalescer: injected coalescer component
+    :return: Coalescer
+    """
+    return coalescer
@@ -0,0 +1,358 @@
+"""
+Incremental parsing of request bodies.
+
+multipart/form-data bodies are parsed chunk by chunk, file parts are
+ streamed into tempfile.SpooledTemporaryFile objects and exposed as
+ Upload instances, which keeps the memory footprint of large uploads
+ constant.
+"""
+import re
+import shutil
+import tempfile
+from urllib import parse
+
+from framework.errors import exceptions
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+CHUNK_SIZE = 64 * 1024
+
+MAX_HEADER_SIZE = 16 * 1024
+
+_default_charset = 'utf-8'
+
+_option_regex = re.compile(
+    r';\s*([\w!#$%&\'*+.^`|~-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)'
+)
+
+
+def parse_options_header(value):
+    """
+    Split a header value like 'form-data; name="file"' into the
+     main value and a dict of its parameters
+
+    :param value: header value string
+    :return: (value, dict of options)
+    """
+    if not value:
+        return '', {}
+    main, _, rest = value.partition(';')
+    options = {}
+    for key, val in _option_regex.findall(';' + rest):
+        val = val.strip()
+        if len(val) >= 2 and val[0] == val[-1] == '"':
+            val = val[1:-1].replace('\\\\', '\\').replace('\\"', '"')
+        options[key.lower()] = val
+    return main.strip().lower(), options
+
+
+class Upload(object):
+    """
+    A file uploaded as part of a multipart/form-data request body.
+
+    The content lives in a SpooledTemporaryFile which only moves to
+     disk once it grows larger than the configured spool size.
+    """
+    __slots__ = 'name', 'filename', 'content_type', 'headers', 'file', 'size'
+
+    def __init__(self, name, filename, content_type, headers, file, size=0):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.headers = headers
+        self.file = file
+        self.size = size
+
+    def read(self, size=-1):
+        """
+        Read from the uploaded content
+
+        :param size: number of bytes to read, -1 reads everything
+        :return: bytes
+        """
+        return self.file.read(size)
+
+    def seek(self, offset, whence=0):
+        return self.file.seek(offset, whence)
+
+    def save(self, destination, chunk_size=CHUNK_SIZE):
+        """
+        Copy the uploaded content to a file path or writable file object
+
+        :param destination: path or binary file object
+        :param chunk_size: size of the copy buffer
+        :return: None
+        """
+        self.file.seek(0)
+        if hasattr(destination, 'write'):
+            shutil.copyfileobj(self.file, destination, chunk_size)
+        else:
+            with open(str(destination), mode='wb') as target:
+                shutil.copyfileobj(self.file, target, chunk_size)
+
+    def close(self):
+        self.file.close()
+
+    def __repr__(self):
+        return '<Upload {} filename={!r} size={}>'.format(
+            self.name, self.filename, self.size
+        )
+
+
+class MultipartParser(object):
+    """
+    Push based multipart/form-data parser.
+
+    Feed the raw body in chunks of arbitrary size with feed()
+     and call close() once the body has been consumed.
+
+    Parsed form fields are collected in .form ({name: [values]}),
+     uploads in .files ({name: [Upload]}).
+    """
+    __slots__ = (
+        'form', 'files', 'charset', 'spool_size', 'max_field_size',
+        '_delimiter', '_buffer', '_state', '_part', '_field',
+        '_field_size'
+    )
+
+    _PREAMBLE, _DELIMITER, _HEADERS, _BODY, _DONE = range(5)
+
+    def __init__(
+            self,
+            boundary,
+            charset=_default_charset,
+            spool_size=1024 * 1024,
+            max_field_size=1024 * 1024
+    ):
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin-1')
+        if not boundary:
+            raise ValueError('multipart boundary must not be empty')
+        self.form = {}
+        self.files = {}
+        self.charset = charset
+        self.spool_size = spool_size
+        self.max_field_size = max_field_size
+        # the leading CRLF belongs to the delimiter, the first boundary
+        # is matched without it, hence the buffer starts out with one
+        self._delimiter = b'\r\n--' + boundary
+        self._buffer = bytearray(b'\r\n')
+        self._state = self._PREAMBLE
+        self._part = None
+        self._field = None
+        self._field_size = 0
+
+    def feed(self, chunk):
+        """
+        Consume the next chunk of the body
+
+        :param chunk: bytes
+        :return: None
+        """
+        if self._state == self._DONE:
+            return
+        self._buffer += chunk
+        while self._step():
+            pass
+
+    def close(self):
+        """
+        Signal the end of the body
+
+        :return: (form, files)
+        """
+        if self._state != self._DONE:
+            self.discard()
+            raise ValueError('Incomplete multipart body')
+        return self.form, self.files
+
+    def discard(self):
+        """
+        Release all uploads created so far
+
+        :return: None
+        """
+        if self._part is not None:
+            self._part.close()
+            self._part = None
+        for uploads in self.files.values():
+            for upload in uploads:
+                upload.close()
+        self.files = {}
+
+    def _step(self):
+        """
+        Advance the state machine as far as the buffer allows
+
+        :return: True if progress was made and another step may follow
+        """
+        buffer = self._buffer
+        if self._state == self._PREAMBLE:
+            index = buffer.find(self._delimiter)
+            if index == -1:
+                # keep only enough to match a delimiter split across chunks
+                del buffer[:-len(self._delimiter)]
+                return False
+            del buffer[:index + len(self._delimiter)]
+            self._state = self._DELIMITER
+            return True
+
+        elif self._state == self._DELIMITER:
+            if len(buffer) < 2:
+                return False
+            if buffer[:2] == b'--':
+                self._state = self._DONE
+                del buffer[:]
+                return False
+            # transport padding may follow the boundary before the line break
+            index = buffer.find(b'\r\n')
+            if index == -1:
+                if len(buffer) > MAX_HEADER_SIZE:
+                    raise ValueError('Malformed multipart boundary')
+                return False
+            if buffer[:index].strip(b' \t'):
+                raise ValueError('Malformed multipart boundary')
+            del buffer[:index + 2]
+            self._state = self._HEADERS
+            return True
+
+        elif self._state == self._HEADERS:
+            index = buffer.find(b'\r\n\r\n')
+            if index == -1:
+                if len(buffer) > MAX_HEADER_SIZE:
+                    raise ValueError('multipart part headers too large')
+                return False
+            self._start_part(bytes(buffer[:index]))
+            del buffer[:index + 4]
+            self._state = self._BODY
+            return True
+
+        elif self._state == self._BODY:
+            index = buffer.find(self._delimiter)
+            if index == -1:
+                safe = len(buffer) - len(self._delimiter) + 1
+                if safe > 0:
+                    self._write(buffer[:safe])
+                    del buffer[:safe]
+                return False
+            self._write(buffer[:index])
+            self._finish_part()
+            del buffer[:index + len(self._delimiter)]
+            self._state = self._DELIMITER
+            return True
+
+        return False
+
+    def _start_part(self, raw_headers):
+        headers = {}
+        for line in raw_headers.decode(self.charset, 'replace').split('\r\n'):
+            if not line:
+                continue
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()] = value.strip()
+        disposition, options = parse_options_header(
+            headers.get('content-disposition', '')
+        )
+        if disposition != 'form-data' or 'name' not in options:
+            raise ValueError('multipart part without form-data name')
+        name = options['name']
+        if 'filename' in options:
+            self._part = Upload(
+                name=name,
+                filename=options['filename'],
+                content_type=headers.get(
+                    'content-type', 'application/octet-stream'
+                ),
+                headers=headers,
+                file=tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+            )
+            self._field = None
+        else:
+            self._part = None
+            self._field = (name, parse_options_header(
+                headers.get('content-type', '')
+            )[1].get('charset', self.charset), [])
+            self._field_size = 0
+
+    def _write(self, data):
+        if not data:
+            return
+        if self._part is not None:
+            self._part.file.write(data)
+            self._part.size += len(data)
+        elif self._field is not None:
+            self._field_size += len(data)
+            if self._field_size > self.max_field_size:
+                raise exceptions.RequestBodyTooLarge(self.max_field_size)
+            self._field[2].append(bytes(data))
+
+    def _finish_part(self):
+        if self._part is not None:
+            self._part.file.seek(0)
+            self.files.setdefault(self._part.name, []).append(self._part)
+            self._part = None
+        elif self._field is not None:
+            name, charset, data = self._field
+            self.form.setdefault(name, []).append(
+                b''.join(data).decode(charset, 'replace')
+            )
+            self._field = None
+
+
+def _read_chunks(stream, length, chunk_size=CHUNK_SIZE):
+    while length > 0:
+        chunk = stream.read(min(chunk_size, length))
+        if not chunk:
+            break
+        length -= len(chunk)
+        yield chunk
+
+
+@component.inject(SettingsDict)
+def parse_body(settings, stream, content_type, content_length):
+    """
+    Read and parse a request body from stream
+
+    multipart/form-data is parsed incrementally, any other body
+     is treated as url encoded form data which is read into memory.
+
+    :param settings: injected settings
+    :param stream: readable binary stream positioned at the body
+    :param content_type: value of the Content-Type header
+    :param content_length: value of the Content-Length header
+    :return: (form dict, files dict, raw payload string or None)
+    """
+    content_length = int(content_length) if content_length else 0
+    mimetype, options = parse_options_header(content_type)
+
+    if mimetype == 'multipart/form-data':
+        limit = settings.get('max_request_body_size')
+        if limit is not None and content_length > limit:
+            raise exceptions.RequestBodyTooLarge(limit)
+        parser = MultipartParser(
+            options.get('boundary', ''),
+            charset=options.get('charset', _default_charset),
+            spool_size=settings.get('upload_spool_size', 1024 * 1024),
+            max_field_size=settings.get('max_form_memory_size', 1024 * 1024)
+        )
+        try:
+            for chunk in _read_chunks(stream, content_length):
+                parser.feed(chunk)
+            form, files = parser.close()
+        except Exception:
+            parser.discard()
+            raise
+        return form, files, None
+
+    limit = settings.get('max_form_memory_size')
+    if limit is not None and content_length > limit:
+        raise exceptions.RequestBodyTooLarge(limit)
+    payload = stream.read(content_length).decode(
+        options.get('charset', _default_charset), 'replace'
+    )
+    return parse.parse_qs(payload), {}, payload
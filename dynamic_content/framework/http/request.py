@@ -20,10 +20,12 @@ class Request(object):
         'ssl_enabled',
         'host',
         'port',
-        'payload'
+        'payload',
+        'files',
+        'trace'
     )
 
-    def __init__(self, host, port, path:str, method, query, headers, ssl_enabled, payload):
+    def __init__(self, host, port, path:str, method, query, headers, ssl_enabled, payload, files=None):
         self.host = host
         self.port = port
         headers = h_mod.Header.auto_construct(headers) if headers is not None else None
@@ -41,6 +43,9 @@ class Request(object):
         self.client = None
         self.ssl_enabled = ssl_enabled
         self.payload = payload
+        self.files = files if files is not None else {}
+        # framework.instrumentation.Trace if instrumentation is enabled
+        self.trace = None
 
     def parent_page(self):
         """
@@ -53,6 +58,16 @@ class Request(object):
         else:
             return parent[0]
 
+    def close_files(self):
+        """
+        Release the temporary files backing uploads of this request
+
+        :return: None
+        """
+        for uploads in self.files.values():
+            for upload in uploads:
+                upload.close()
+
     @classmethod
     def from_path_and_post(
             cls,
@@ -62,7 +77,9 @@ class Request(object):
             headers,
             ssl_enabled: bool,
             query_string=None,
-            payload=None
+            payload=None,
+            form=None,
+            files=None
         ):
         """
         Construct a new Request object from alternative input
@@ -73,6 +90,9 @@ class Request(object):
         :param headers: request headers
         :param ssl_enabled: boolean to indicate http or https
         :param query_string: ?query=values&so_on
+        :param payload: raw request body
+        :param form: already parsed form values from the request body
+        :param files: multipart.Upload objects from the request body
         :return: Request() instance modelling the request
         """
         host = host.rsplit(':', 1)
@@ -82,5 +102,9 @@ class Request(object):
         query = parse.parse_qs(parsed.query)
         if query_string:
             query.update(parse.parse_qs(query_string))
+        if form:
+            query.update(form)
         path = parsed.path
-        return cls(host, port, path, method, query, headers, ssl_enabled, payload)
+        return cls(
+            host, port, path, method, query, headers, ssl_enabled, payload, files
+        )
@@ -15,7 +15,9 @@ from urllib.error import HTTPError
 import collections
 import logging
 
-from framework.http import Request
+from framework import metrics
+from framework.http import Request, multipart
+from framework.errors import exceptions
 from framework.machinery import component
 
 
@@ -50,13 +52,34 @@ class RequestHandler(server.BaseHTTPRequestHandler):
 
         :return:
         """
-        post_query = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        try:
+            form, files, payload = multipart.parse_body(
+                self.rfile,
+                self.headers.get('Content-Type', ''),
+                self.headers.get('Content-Length', 0)
+            )
+        except exceptions.RequestBodyTooLarge as error:
+            logging.getLogger(__name__).warning(error)
+            self.close_connection = True
+            self.send_error(413, *self.responses[413])
+            return 0
+        except ValueError as error:
+            logging.getLogger(__name__).warning(
+                'malformed request body: {}'.format(error)
+            )
+            self.close_connection = True
+            self.send_error(400, *self.responses[400])
+            return 0
 
         request = Request.from_path_and_post(
             self.headers['Host'],
-            self.path, 'post', self.headers, self.ssl_enabled, post_query)
+            self.path, 'post', dict(self.headers), self.ssl_enabled,
+            payload=payload, form=form, files=files)
         request.ssl_enabled = self.ssl_enabled
-        return self.do_any(request)
+        try:
+            return self.do_any(request)
+        finally:
+            request.close_files()
 
     def do_GET(self):
         """
@@ -68,7 +91,7 @@ class RequestHandler(server.BaseHTTPRequestHandler):
             self.headers['Host'],
             self.path,
             'get',
-            self.headers,
+            dict(self.headers),
             self.ssl_enabled
             )
         return self.do_any(request)
@@ -80,6 +103,8 @@ class RequestHandler(server.BaseHTTPRequestHandler):
         :param request:
         :return:
         """
+        # same key as in the WSGI environ, overwrites client supplied values
+        request.headers['REMOTE_ADDR'] = self.client_address[0]
         try:
             response = self.error_wrapper(self.callback)(request)
         except HTTPError as error:
@@ -229,6 +254,8 @@ class RequestHandler(server.BaseHTTPRequestHandler):
                 shutil.copyfileobj(stream, self.wfile)
             finally:
                 stream.close()
+        if settings.get('metrics', False):
+            metrics.record_response(response)
 
     def log_message(self, format, *args):
         """
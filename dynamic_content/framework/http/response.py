@@ -21,6 +21,7 @@ HttpResponseCodes = (collections.namedtuple('ResponseCodeContainer', (
     'Conflict', 'Gone', 'LengthRequired', 'PreconditionFailed',
     'RequestEntityTooLarge', 'RequestURITooLong', 'UnsupportedMediaType',
     'RequestedRangeNotSatisfiable', 'ExpectationFailed', 'ImATeapot',
+    'TooManyRequests',
     'InternalServerError', 'NotImplemented', 'BadGateway', 'ServiceUnavailable',
     'GatewayTimeout', 'HTTPVersionNotSupported')
 )(
@@ -59,6 +60,7 @@ HttpResponseCodes = (collections.namedtuple('ResponseCodeContainer', (
     RequestedRangeNotSatisfiable=416,
     ExpectationFailed=417,
     ImATeapot=418,
+    TooManyRequests=429,
     InternalServerError=500,
     NotImplemented=501,
     BadGateway=502,
@@ -19,6 +19,12 @@ default_settings = {
     'hashing_rounds': 100000,
     'hash_length': 64,
     'salt_length': 16,
+    # password hashes are computed in a process pool (framework.util.hashing)
+    # 0 processes hashes on the request thread, logins beyond
+    # processes + queue limit are answered with 503
+    'hashing_processes': 2,
+    'hashing_queue_limit': 16,
+    'hashing_timeout': 30,
 
     'logging_level': 'debug',
 
@@ -30,6 +36,9 @@ default_settings = {
 
     # 0:MULTI_TABLE, 1:TREE
     'pathmap_type': 0,
+    # file (relative to the project directory) caching which symbols
+    # the module scanner found links for, see framework.machinery.manifest
+    'scanner_manifest': None,
     'middleware': [
         'framework.middleware.alias.Middleware',
         'dycm.file.PathHandler',
@@ -38,6 +47,51 @@ default_settings = {
     ],
 
 
+    # request body limits in bytes, larger requests are answered with 413
+    # multipart bodies are streamed, file parts are kept in memory
+    # up to upload_spool_size and moved to a temporary file afterwards
+    'max_request_body_size': 64 * 1024 * 1024,
+    'max_form_memory_size': 1024 * 1024,
+    'upload_spool_size': 1024 * 1024,
+
+    # used by framework.middleware.compression
+    'compression_min_size': 1024,
+    'compression_level': 6,
+    # directories (next to the file_directories) compressed
+    # ahead of time by the 'precompress' mode
+    'precompress_directories': ['dycm/theming/themes'],
+
+    # timing spans for each request, see framework.instrumentation
+    # server_timing additionally exports them in a Server-Timing header
+    'instrumentation': False,
+    'server_timing': False,
+    # collect request metrics for the /metrics endpoint (dycm.metrics)
+    'metrics': False,
+    # per request query log with N+1 detection, see framework.backend.querylog
+    # framework.middleware.debug.Toolbar shows it on html pages
+    'query_accounting': False,
+    'n_plus_one_threshold': 3,
+
+    # identical concurrent GET requests without cookies share one
+    # response, see framework.http.coalesce
+    'request_coalescing': False,
+    'coalescing_timeout': 10,
+    # used by framework.middleware.pagecache, pages are fresh for
+    # page_cache_ttl seconds and served stale while being refreshed
+    # for another page_cache_stale seconds
+    'page_cache_ttl': 60,
+    'page_cache_stale': 300,
+
+    # default ttl of <dchpcache> fragments, see framework.dchp.fragment
+    'fragment_cache_ttl': 60,
+    # backend of the framework.cache.Cache component, types:
+    # memory (max_entries), shared (path, slots, slot_size), disk (directory),
+    # memcached (servers, pool_size, timeout), see framework.cache.standin
+    'cache': {
+        'type': 'memory',
+        'max_entries': 4096
+    },
+
     'anti_csrf': True,
     'default_headers': {
         'Content-Type': 'text/html; charset=utf-8',
@@ -48,6 +102,10 @@ default_settings = {
         'name': ':memory:',
         'type': 'SQlite'
     },
+    # with a 'replicas' list in 'database' reads go to the replicas,
+    # see framework.backend.replicas
+    'replica_retry_interval': 5,
+    'replica_pin_seconds': 5,
 
     # 0:WSGI, 1:PLAIN
     'server_type': 0,
@@ -0,0 +1,449 @@
+"""
+Request instrumentation
+
+Records timing spans for the phases of the request pipeline (every
+ middleware phase and each individual middleware, path resolution,
+ the controller, template rendering, DcHP blocks and database queries).
+
+The spans of a request are collected in a Trace which is attached to
+ the request (request.trace). Once the response is ready the trace is
+ handed to all registered Collector hooks and, if the 'server_timing'
+ setting is enabled, exported in a Server-Timing response header.
+ The RouteStatistics collector aggregates durations into per-route
+ histograms.
+
+Instrumentation is switched on with the 'instrumentation' setting
+ (or implicitly by other settings in tracing_settings, like 'metrics').
+ While it is switched off no trace exists and span() returns a shared
+ no-op context manager, so instrumented code pays a single
+ thread local lookup.
+"""
+import bisect
+import collections
+import functools
+import threading
+import time
+
+from framework import hooks
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+# upper bounds in seconds
+default_buckets = (
+    .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0
+)
+
+clock = time.perf_counter
+
+# any of these settings enables tracing of requests
+tracing_settings = ['instrumentation', 'metrics']
+
+
+class _Local(threading.local):
+    trace = None
+
+
+_local = _Local()
+
+
+class Span(object):
+    """
+    A timed section of a trace. Use as context manager.
+    """
+    __slots__ = 'name', 'start', 'end', 'depth', '_trace'
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.start = self.end = None
+        self.depth = 0
+        self._trace = trace
+
+    @property
+    def duration(self):
+        """
+        :return: duration in seconds, None if the span is still open
+        """
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def __enter__(self):
+        trace = self._trace
+        self.depth = trace.depth
+        trace.depth += 1
+        trace.spans.append(self)
+        self.start = clock()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end = clock()
+        self._trace.depth -= 1
+        self._trace = None
+        return False
+
+    def __repr__(self):
+        return '<Span {} {}>'.format(self.name, self.duration)
+
+
+class _NullSpan(object):
+    """Stand-in for Span while instrumentation is disabled"""
+    __slots__ = ()
+
+    name = start = end = duration = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+null_span = _NullSpan()
+
+
+class Trace(object):
+    """
+    All spans recorded for a single request
+    """
+    __slots__ = 'spans', 'start', 'end', 'route', 'depth'
+
+    def __init__(self):
+        self.spans = []
+        self.route = None
+        self.depth = 0
+        self.start = clock()
+        self.end = None
+
+    def span(self, name):
+        """
+        Open a new span, to be used as context manager
+
+        :param name: span name
+        :return: Span
+        """
+        return Span(name, self)
+
+    def finish(self):
+        if self.end is None:
+            self.end = clock()
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else clock()) - self.start
+
+    def totals(self):
+        """
+        Sum the durations of spans with equal names
+
+        :return: OrderedDict {name: (seconds, count)} in order of first occurrence
+        """
+        totals = collections.OrderedDict()
+        for span in self.spans:
+            if span.end is None:
+                continue
+            duration, count = totals.get(span.name, (0.0, 0))
+            totals[span.name] = duration + span.end - span.start, count + 1
+        return totals
+
+    def server_timing(self):
+        """
+        Format the trace as value of a Server-Timing header
+
+        :return: header value string
+        """
+        parts = ['total;dur={:.3f}'.format(self.duration * 1000)]
+        for name, (duration, count) in self.totals().items():
+            if count > 1:
+                parts.append('{};dur={:.3f};desc="{}x"'.format(
+                    name, duration * 1000, count
+                ))
+            else:
+                parts.append('{};dur={:.3f}'.format(name, duration * 1000))
+        return ', '.join(parts)
+
+
+def current():
+    """
+    The trace of the request handled by the current thread
+
+    :return: Trace or None
+    """
+    return _local.trace
+
+
+def span(name):
+    """
+    Time a section of code in the current trace
+
+    :param name: span name
+    :return: context manager
+    """
+    trace = _local.trace
+    if trace is None:
+        return null_span
+    return Span(name, trace)
+
+
+def timed(name):
+    """
+    Decorator recording a span for each call of the decorated function
+
+    :param name: span name
+    :return: wrapper function
+    """
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            trace = _local.trace
+            if trace is None:
+                return func(*args, **kwargs)
+            with Span(name, trace):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def begin(request, settings):
+    """
+    Start tracing a request if any of the tracing_settings is enabled
+
+    :param request: http.Request
+    :param settings: settings dict
+    :return: Trace or None
+    """
+    if not any(settings.get(a, False) for a in tracing_settings):
+        return None
+    trace = request.trace = _local.trace = Trace()
+    Collector.blank_call_hooks_with(
+        lambda self, request, trace: self.trace_started(request, trace),
+        request, trace
+    )
+    return trace
+
+
+def discard():
+    """
+    Stop tracing in the current thread without reporting
+
+    :return: None
+    """
+    _local.trace = None
+
+
+def finish(trace, request, response, settings):
+    """
+    Stop tracing, report the trace to the collectors and
+     optionally add the Server-Timing header
+
+    :param trace: Trace returned by begin()
+    :param request:
+    :param response: http.response.Response or None if processing failed
+    :param settings: settings dict
+    :return: None
+    """
+    _local.trace = None
+    trace.finish()
+    Collector.blank_call_hooks_with(
+        lambda self, request, response, trace:
+        self.trace_finished(request, response, trace),
+        request, response, trace
+    )
+    if response is not None and settings.get('server_timing', False):
+        response.headers['Server-Timing'] = trace.server_timing()
+
+
+def hook_label(hook):
+    """
+    Short name of a hook for span names
+
+    :param hook: hook instance
+    :return: string like 'alias.Middleware'
+    """
+    cls = type(hook)
+    return cls.__module__.rsplit('.', 1)[-1] + '.' + cls.__name__
+
+
+def route_label(handler):
+    """
+    Name under which requests handled by a controller are aggregated
+
+    :param handler: ControlFunction
+    :return: string
+    """
+    function = getattr(handler, 'function', handler)
+    return '{}.{}'.format(
+        getattr(function, '__module__', '?'),
+        getattr(function, '__qualname__', repr(function))
+    )
+
+
+def return_call_hooks_with(trace, hook, phase, executable, *args, **kwargs):
+    """
+    Instrumented version of hook.return_call_hooks_with()
+
+    Records a span for the phase and a nested span for each hook.
+     A hook ending the phase early becomes the route of the trace
+     unless a route was set before.
+
+    :param trace: Trace or None for an untraced call
+    :param hook: ClassHook subclass
+    :param phase: span name of the phase
+    :param executable: executable to call on each hook
+    :param args: args to call with
+    :param kwargs: kwargs to call with
+    :return: first result that is not None
+    """
+    if trace is None:
+        return hook.return_call_hooks_with(executable, *args, **kwargs)
+    with trace.span(phase):
+        for h in hook.get_hooks():
+            with trace.span(phase + '.' + hook_label(h)):
+                res = executable(h, *args, **kwargs)
+            if res is not None:
+                if trace.route is None:
+                    trace.route = hook_label(h)
+                return res
+    return None
+
+
+class Collector(hooks.ClassHook):
+    """
+    Hook receiving every finished trace
+    """
+    __slots__ = ()
+
+    hook_name = 'instrumentation'
+
+    def trace_started(self, request, trace):
+        """
+        Method to overwrite when hooking the start of a request
+
+        :param request:
+        :param trace:
+        :return: None
+        """
+        pass
+
+    def trace_finished(self, request, response, trace):
+        """
+        Method to overwrite to process a trace
+
+        :param request:
+        :param response: response or None if processing failed
+        :param trace:
+        :return: None
+        """
+        pass
+
+
+Collector.init_hook()
+
+
+class Histogram(object):
+    """
+    Thread safe histogram of durations with fixed bucket bounds
+    """
+    __slots__ = 'buckets', 'counts', 'count', 'sum', '_lock'
+
+    def __init__(self, buckets=default_buckets):
+        self.buckets = tuple(sorted(buckets))
+        # the last slot counts observations above the largest bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def cumulative(self):
+        """
+        Cumulative bucket counts
+
+        :return: list of (upper bound, count), the last bound is float('inf')
+        """
+        with self._lock:
+            counts = list(self.counts)
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'), ), counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """
+        Estimate a quantile as the upper bound of the bucket containing it
+
+        :param q: 0 <= q <= 1
+        :return: seconds or None if nothing was observed
+        """
+        cumulative = self.cumulative()
+        total = cumulative[-1][1]
+        if not total:
+            return None
+        rank = q * total
+        for bound, count in cumulative:
+            if count >= rank:
+                return bound
+        return cumulative[-1][0]
+
+
+class RouteStatistics(Collector):
+    """
+    Aggregates request and span durations into histograms per route
+
+    histograms maps (route, span name) to a Histogram,
+     the duration of the whole request is stored under span name 'total'.
+    """
+    __slots__ = 'histograms', 'buckets', '_lock'
+
+    def __init__(self, priority=0, buckets=default_buckets):
+        super().__init__(priority)
+        self.histograms = {}
+        self.buckets = buckets
+        self._lock = threading.Lock()
+
+    def histogram(self, route, name):
+        """
+        Get or create the histogram for a route and span name
+
+        :param route:
+        :param name:
+        :return: Histogram
+        """
+        key = route, name
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(
+                    key, Histogram(self.buckets)
+                )
+        return histogram
+
+    def trace_finished(self, request, response, trace):
+        route = trace.route or 'unresolved'
+        self.histogram(route, 'total').observe(trace.duration)
+        for name, (duration, count) in trace.totals().items():
+            self.histogram(route, name).observe(duration)
+
+    def routes(self):
+        """
+        :return: sorted list of all routes seen so far
+        """
+        return sorted({route for route, name in tuple(self.histograms)})
+
+    def clear(self):
+        with self._lock:
+            self.histograms = {}
+
+
+route_statistics = RouteStatistics()
+route_statistics.register_instance()
@@ -128,6 +128,27 @@ Component = component = _decorator
 del _decorator
 
 
+def release_module(package):
+    """
+    Unregister all components that are instances of classes from package
+
+    Wrappers registered by name are kept and only emptied, since
+     other modules hold references to them through inject(),
+     and refilled when the package registers its components again.
+
+    :param package: dotted module name
+    :return: None
+    """
+    from framework.util import module
+
+    for key, wrapper in tuple(dict.items(component_container)):
+        if isinstance(key, type) and module.defined_in(key, package):
+            dict.__delitem__(component_container, key)
+        elif (wrapper.content is not None
+                and module.defined_in(type(wrapper.content), package)):
+            wrapper.content = None
+
+
 def register(name, obj):
     """
     Register component in container
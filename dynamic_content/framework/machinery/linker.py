@@ -144,4 +144,14 @@ class Linker:
             'Unlinking module {}'.format(module)
         )
         for link in self[module]:
-            link.unlink()
\ No newline at end of file
+            link.unlink()
+
+    def remove(self, module):
+        """
+        Unlink all links in module and forget them
+
+        :param module:
+        :return: None
+        """
+        self.unlink(module)
+        del self._inner_dict[module]
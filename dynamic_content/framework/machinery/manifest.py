@@ -0,0 +1,208 @@
+"""
+Manifest of the symbols the module scanner found links for
+
+A cold scan calls every scanner hook on every public symbol of every
+ module. The manifest records which symbols actually produced links
+ (and which symbols are scanner hooks themselves) together with the
+ modification time, size and hash of every source file of the scanned
+ modules. On a warm start with unchanged sources the scanner only
+ hands the recorded symbols to the hooks.
+
+Since any module may contribute scanner hooks that match symbols of any
+ other module the manifest is only used if all scanned modules match.
+ Modules may also export symbols depending on settings, hence the
+ manifest is keyed by a digest of the settings as well.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+FORMAT_VERSION = 1
+
+
+def settings_key(settings):
+    """
+    Digest of the settings the scan ran with
+
+    :param settings: settings dict
+    :return: hex digest
+    """
+    return hashlib.sha1(
+        json.dumps(settings, sort_keys=True, default=repr).encode('utf-8')
+    ).hexdigest()
+
+
+def module_files(module):
+    """
+    Source files of a module, all .py files below the directory of packages
+
+    :param module: module object
+    :return: sorted tuple of path strings
+    """
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return ()
+    path = pathlib.Path(path)
+    if path.name == '__init__.py':
+        return tuple(sorted(str(p) for p in path.parent.rglob('*.py')))
+    return str(path),
+
+
+def file_hash(path):
+    """
+    :param path: file path
+    :return: hex sha1 digest of the file content
+    """
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def fingerprint(module, previous=None):
+    """
+    Modification time, size and hash of each source file of module
+
+    Hashes are reused from previous for files whose
+     modification time and size did not change.
+
+    :param module: module object
+    :param previous: fingerprint dict of an earlier run or None
+    :return: dict {path: [mtime_ns, size, hash]}
+    """
+    previous = previous or {}
+    result = {}
+    for path in module_files(module):
+        stat = os.stat(path)
+        old = previous.get(path)
+        if old is not None and old[0] == stat.st_mtime_ns and old[1] == stat.st_size:
+            result[path] = old
+        else:
+            result[path] = [stat.st_mtime_ns, stat.st_size, file_hash(path)]
+    return result
+
+
+def unchanged(module, recorded):
+    """
+    Compare the source files of module with a recorded fingerprint
+
+    Files with changed modification time or size are hashed, content
+     identical to the recorded one (e.g. a fresh checkout) counts as
+     unchanged.
+
+    :param module: module object
+    :param recorded: fingerprint dict from the manifest
+    :return: bool
+    """
+    files = module_files(module)
+    if set(files) != set(recorded):
+        return False
+    for path in files:
+        mtime, size, digest = recorded[path]
+        stat = os.stat(path)
+        if stat.st_mtime_ns == mtime and stat.st_size == size:
+            continue
+        if stat.st_size != size or file_hash(path) != digest:
+            return False
+    return True
+
+
+class Manifest(object):
+    """
+    Symbols producing links and scanner hooks per scanned module
+    """
+    __slots__ = 'path', 'key', 'entries', 'modules'
+
+    def __init__(self, path, key=None, entries=None, modules=()):
+        self.path = path
+        self.key = key
+        self.entries = entries if entries is not None else {}
+        self.modules = list(modules)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a manifest, missing or unreadable files yield an empty one
+
+        :param path: file path
+        :return: Manifest
+        """
+        try:
+            with open(str(path)) as file:
+                data = json.load(file)
+            if data.get('version') != FORMAT_VERSION:
+                raise ValueError('unknown manifest version')
+            return cls(path, data['key'], data['entries'], data['modules'])
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError, KeyError) as error:
+            logging.getLogger(__name__).warning(
+                'Ignoring scanner manifest {}: {}'.format(path, error)
+            )
+            return cls(path)
+
+    def save(self):
+        """
+        Write the manifest atomically
+
+        :return: None
+        """
+        path = str(self.path)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as file:
+            json.dump(
+                {
+                    'version': FORMAT_VERSION,
+                    'key': self.key,
+                    'modules': self.modules,
+                    'entries': self.entries
+                },
+                file,
+                indent=1,
+                sort_keys=True
+            )
+        os.replace(tmp, path)
+
+    def matches(self, key, modules):
+        """
+        Whether the manifest is valid for these modules
+
+        :param key: settings_key() of the current settings
+        :param modules: sequence of (name, module object)
+        :return: bool
+        """
+        if key != self.key or [name for name, _ in modules] != self.modules:
+            return False
+        return all(
+            unchanged(module, self.entries[name]['files'])
+            for name, module in modules
+        )
+
+    def scanner_hooks(self, name):
+        return self.entries[name]['scanner_hooks']
+
+    def symbols(self, name):
+        return self.entries[name]['symbols']
+
+    def record(self, name, module, scanner_hooks, symbols):
+        """
+        Store the scan result of a module
+
+        :param name: module name as used by the scanner
+        :param module: module object
+        :param scanner_hooks: names of scanner hook instances
+        :param symbols: names of symbols that produced links, in scan order
+        :return: None
+        """
+        if name not in self.modules:
+            self.modules.append(name)
+        old = self.entries.get(name, {})
+        self.entries[name] = {
+            'files': fingerprint(module, old.get('files')),
+            'scanner_hooks': list(scanner_hooks),
+            'symbols': list(symbols)
+        }
@@ -5,8 +5,9 @@ import inspect
 import logging
 import pathlib
 
-from framework import hooks, includes
-from framework.machinery import linker, component
+from framework import hooks, includes, startup
+from framework.util import module as _module
+from framework.machinery import linker, component, manifest as _manifest
 
 __author__ = 'Justus Adam'
 __version__ = '0.1.2'
@@ -194,6 +195,24 @@ class __MultiHookBase(ScannerHook):
         """
         raise NotImplementedError
 
+    @classmethod
+    def remove_module(cls, package):
+        """
+        Remove internal hooks whose executable or selector
+         was defined in package
+
+        :param package: dotted module name
+        :return: None
+        """
+        for selector, containers in tuple(cls.internal_hooks.items()):
+            if isinstance(selector, type) and _module.defined_in(selector, package):
+                del cls.internal_hooks[selector]
+                continue
+            containers[:] = [
+                c for c in containers
+                if not _module.defined_in(c.executable, package)
+            ]
+
 
 @hooks.register()
 class NameHook(__MultiHookBase):
@@ -330,6 +349,39 @@ class MatchingSubtypeHook(__MultiHookBase):
         return isinstance(selector, type)
 
 
+def _timed_call_hooks(module_name, var_name, var):
+    """
+    ScannerHook.yield_call_hooks() accounting the time of each hook type
+     in the startup profile
+
+    :param module_name: name of the topmost parent module
+    :param var_name: symbol name
+    :param var: symbol
+    :return: yielding tuples of links
+    """
+    for hook in ScannerHook.get_hooks():
+        start = startup.clock()
+        res = hook(module_name, var_name, var)
+        # hooks are generators, the work is done while iterating
+        res = tuple(res) if inspect.isgenerator(res) else res
+        startup.accumulate(type(hook).__name__, 'scanner', startup.clock() - start)
+        if res is not None:
+            yield res
+
+
+def remove_module(package):
+    """
+    Remove all internal scanner hooks defined in package
+
+    :param package: dotted module name
+    :return: None
+    """
+    for hook_class in (
+            NameHook, CaseInsensitiveNameHook,
+            MatchingTypeHook, MatchingSubtypeHook):
+        hook_class.remove_module(package)
+
+
 class Scanner:
     """
     Scanner object to find important functions in hooks
@@ -372,19 +424,53 @@ class Scanner:
             (framework,) + modules_from_settings + apps
         )
 
-        self.scan(modules)
+        manifest = key = None
+        if settings.get('scanner_manifest'):
+            manifest = _manifest.Manifest.load(
+                pathlib.Path(settings.get('project_dir', '.'))
+                / settings['scanner_manifest']
+            )
+            key = _manifest.settings_key(settings)
+
+        self.scan(modules, manifest, key)
 
-    def scan(self, modules):
+    def scan(self, modules, manifest=None, key=None):
         """
         Scan these modules for interesting objects
-        :param modules:
-        :return:
+
+        If a manifest matching the modules is given only the symbols
+         recorded in it are handed to the scanner hooks, otherwise
+         all modules are scanned and the manifest is rewritten.
+
+        :param modules: sequence of (name, module object)
+        :param manifest: manifest.Manifest or None
+        :param key: manifest.settings_key() of the current settings
+        :return: None
         """
+        warm = manifest is not None and manifest.matches(key, modules)
+        if manifest is not None:
+            logging.getLogger(__name__).info(
+                'Scanner manifest {} {}'.format(
+                    manifest.path, 'valid' if warm else 'outdated'
+                )
+            )
+            if not warm:
+                manifest = _manifest.Manifest(manifest.path, key)
+
+        found_hooks = {}
         for name, module in modules:
             # we go through all the modules first and find all scanner hooks
             # so we can ensure all of them are present
             # at the start of the actual scan later
-            for hook in self.find_scanner_hooks(module):
+            if warm:
+                found = tuple(
+                    (var_name, getattr(module, var_name))
+                    for var_name in manifest.scanner_hooks(name)
+                )
+            else:
+                found = tuple(self.find_scanner_hooks(module))
+            found_hooks[name] = [var_name for var_name, _ in found]
+            for var_name, hook in found:
                 logging.getLogger(__name__).debug(
                     'Found scanner hook {}'.format(hook)
                 )
@@ -401,13 +487,28 @@ class Scanner:
         for name, module in modules:
             # now we go through each module
             # calling the hooks we discovered earlier
+            if warm:
+                symbols = self.iter_symbols_once(module, manifest.symbols(name))
+            else:
+                symbols = self.iter_module_once(module)
+            producing = []
             self.linker.init_module(
                 name,
-                (link for link in self.find_any(name, module))
+                (link for link in self.find_links(name, symbols, producing))
             )
             logging.getLogger(__name__).debug(
                 'Links found for module {}: {}'.format(name, self.linker[name])
             )
+            if manifest is not None and not warm:
+                manifest.record(name, module, found_hooks[name], producing)
+
+        if manifest is not None and not warm:
+            try:
+                manifest.save()
+            except OSError as error:
+                logging.getLogger(__name__).warning(
+                    'Could not write scanner manifest: {}'.format(error)
+                )
 
     def find_any(self, module_name,  module):
         """
@@ -417,22 +518,43 @@ class Scanner:
         :param submodule: the module in question
         :return:
         """
-        for var_name, var in self.iter_module_once(module):
-            for links in ScannerHook.yield_call_hooks(module_name, var_name, var):
+        return self.find_links(module_name, self.iter_module_once(module))
+
+    @staticmethod
+    def find_links(module_name, symbols, producing=None):
+        """
+        Call the hooks on each symbol
+
+        :param module_name: name of the topmost parent module
+        :param symbols: iterable of (symbol name, symbol)
+        :param producing: list to append names of symbols yielding links to
+        :return: yielding links
+        """
+        call_hooks = (
+            ScannerHook.yield_call_hooks
+            if startup.active() is None
+            else _timed_call_hooks
+        )
+        for var_name, var in symbols:
+            produced = False
+            for links in call_hooks(module_name, var_name, var):
                 for link in links:
                     if link is not None:
+                        produced = True
                         yield link
+            if produced and producing is not None:
+                producing.append(var_name)
 
     def find_scanner_hooks(self, module):
         """
-        Finds instances of ScannerHook and registers them
+        Finds instances of ScannerHook
 
         :param module: module object
-        :return:
+        :return: yielding (symbol name, hook)
         """
         for var_name, var in self.iter_module(module):
             if isinstance(var, ScannerHook):
-                yield var
+                yield var_name, var
 
     def __contains__(self, item):
         return item in self.get_tracker(item)
@@ -478,6 +600,20 @@ class Scanner:
                 self.add(var)
                 yield var_name, var
 
+    def iter_symbols_once(self, module, names):
+        """
+        Like iter_module_once() but only for the given symbol names
+
+        :param module: module object
+        :param names: iterable of symbol names
+        :return: yielding symbols/symbol names
+        """
+        for var_name in names:
+            var = getattr(module, var_name)
+            if var not in self:
+                self.add(var)
+                yield var_name, var
+
     @staticmethod
     def iter_module(module):
         """
@@ -0,0 +1,477 @@
+"""
+Metrics registry with Prometheus text exposition
+
+Counters, gauges and histograms are kept in the 'MetricsRegistry'
+ component and rendered in the Prometheus text format
+ (version 0.0.4) by Registry.render().
+
+With the 'metrics' setting enabled every request is traced
+ (see framework.instrumentation), the RequestMetrics collector turns
+ the finished traces into request counts by route and status, latency
+ histograms and database queries per request. Sent response bytes are
+ recorded by the servers, caches report hits and misses through
+ cache_hit() / cache_stale() / cache_miss() or register_lru_cache().
+"""
+import threading
+
+from framework import instrumentation
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+query_buckets = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+_inf = float('inf')
+
+
+def _format_value(value):
+    if value == _inf:
+        return '+Inf'
+    if value == -_inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = tuple(zip(names, values)) + tuple(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(name, _escape(value)) for name, value in pairs
+    ) + '}'
+
+
+class _Value(object):
+    """Thread safe number"""
+    __slots__ = 'value', '_lock'
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _FunctionValue(object):
+    """Value computed on collection"""
+    __slots__ = 'function',
+
+    def __init__(self, function):
+        self.function = function
+
+    def get(self):
+        return self.function()
+
+
+class Metric(object):
+    """
+    Abstract base class for a metric family with labels
+
+    Children for a combination of label values are obtained
+     with labels(), a metric without labels can be used directly.
+    """
+    __slots__ = 'name', 'documentation', 'labelnames', '_children', '_lock'
+
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        Get the child for a combination of label values
+
+        :param values: one value per label name
+        :return: child object
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                'Expected {} label values for {}, got {}'.format(
+                    len(self.labelnames), self.name, len(values)
+                )
+            )
+        values = tuple(str(a) for a in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def set_function(self, function, *values):
+        """
+        Compute the value of a child by calling function on each collection
+
+        :param function: callable without arguments
+        :param values: label values
+        :return: None
+        """
+        with self._lock:
+            self._children[tuple(str(a) for a in values)] = _FunctionValue(
+                function
+            )
+
+    def _unlabeled(self):
+        if self.labelnames:
+            raise ValueError('Metric {} requires labels'.format(self.name))
+        return self.labels()
+
+    def samples(self):
+        """
+        Current samples of this metric
+
+        :return: generator of (suffix, labels string, value)
+        """
+        for values, child in sorted(tuple(self._children.items())):
+            yield '', _format_labels(self.labelnames, values), child.get()
+
+    def render(self):
+        """
+        Render in Prometheus text format
+
+        :return: list of lines
+        """
+        lines = [
+            '# HELP {} {}'.format(
+                self.name,
+                self.documentation.replace('\\', '\\\\').replace('\n', '\\n')
+            ),
+            '# TYPE {} {}'.format(self.name, self.type_name)
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append('{}{}{} {}'.format(
+                self.name, suffix, labels, _format_value(value)
+            ))
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+    __slots__ = ()
+
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._unlabeled().inc(amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    __slots__ = ()
+
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._unlabeled().inc(amount)
+
+    def dec(self, amount=1):
+        self._unlabeled().dec(amount)
+
+    def set(self, value):
+        self._unlabeled().set(value)
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets"""
+    __slots__ = 'buckets',
+
+    type_name = 'histogram'
+
+    def __init__(
+            self,
+            name,
+            documentation,
+            labelnames=(),
+            buckets=instrumentation.default_buckets
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return instrumentation.Histogram(self.buckets)
+
+    def observe(self, value):
+        self._unlabeled().observe(value)
+
+    def samples(self):
+        for values, child in sorted(tuple(self._children.items())):
+            for bound, count in child.cumulative():
+                yield '_bucket', _format_labels(
+                    self.labelnames, values, (('le', _format_value(bound)), )
+                ), count
+            labels = _format_labels(self.labelnames, values)
+            yield '_sum', labels, child.sum
+            yield '_count', labels, child.count
+
+
+@component.Component('MetricsRegistry')
+class Registry(object):
+    """
+    Collection of all metrics of the application
+    """
+    __slots__ = '_metrics', '_lock'
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Add a metric, names have to be unique
+
+        :param metric: Metric instance
+        :return: metric
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(
+                    'Metric {} is already registered'.format(metric.name)
+                )
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name):
+        return self._metrics[name]
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, *args, **kwargs)
+        if not isinstance(metric, cls):
+            raise TypeError(
+                'Metric {} is a {}, not a {}'.format(name, type(metric), cls)
+            )
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """
+        Get or create a counter
+
+        :param name: metric name
+        :param documentation: help text
+        :param labelnames: names of the labels
+        :return: Counter
+        """
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        """
+        Get or create a gauge
+
+        :param name: metric name
+        :param documentation: help text
+        :param labelnames: names of the labels
+        :return: Gauge
+        """
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+            self,
+            name,
+            documentation,
+            labelnames=(),
+            buckets=instrumentation.default_buckets
+    ):
+        """
+        Get or create a histogram
+
+        :param name: metric name
+        :param documentation: help text
+        :param labelnames: names of the labels
+        :param buckets: upper bounds of the buckets
+        :return: Histogram
+        """
+        return self._get_or_create(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self):
+        """
+        All metrics in Prometheus text format
+
+        :return: string
+        """
+        lines = []
+        for name in sorted(tuple(self._metrics)):
+            lines.extend(self._metrics[name].render())
+        return '\n'.join(lines) + '\n'
+
+
+@component.inject(Registry)
+def get_registry(registry):
+    """
+    Convenience method to obtain the metrics registry
+
+    :param registry: injected registry component
+    :return: Registry
+    """
+    return registry
+
+
+_registry = get_registry()
+
+requests_total = _registry.counter(
+    'dc_http_requests_total',
+    'Processed requests by route, method and status code.',
+    ('route', 'method', 'code')
+)
+request_duration = _registry.histogram(
+    'dc_http_request_duration_seconds',
+    'Time spent in process_request by route.',
+    ('route', )
+)
+requests_in_progress = _registry.gauge(
+    'dc_http_requests_in_progress',
+    'Requests currently being processed.'
+)
+response_bytes = _registry.counter(
+    'dc_http_response_bytes_total',
+    'Body bytes sent to clients.'
+)
+db_queries = _registry.histogram(
+    'dc_db_queries_per_request',
+    'Database queries executed per request by route.',
+    ('route', ),
+    buckets=query_buckets
+)
+db_duration = _registry.histogram(
+    'dc_db_query_duration_seconds_per_request',
+    'Time spent in database queries per request by route.',
+    ('route', )
+)
+cache_requests = _registry.counter(
+    'dc_cache_requests_total',
+    'Cache lookups by cache and result (hit, stale or miss).',
+    ('cache', 'result')
+)
+_registry.gauge(
+    'dc_threads_active',
+    'Alive threads, including server worker threads.'
+).set_function(threading.active_count)
+
+
+def cache_hit(cache):
+    """
+    Record a successful lookup in a cache
+
+    :param cache: cache name
+    :return: None
+    """
+    cache_requests.labels(cache, 'hit').inc()
+
+
+def cache_miss(cache):
+    """
+    Record a failed lookup in a cache
+
+    :param cache: cache name
+    :return: None
+    """
+    cache_requests.labels(cache, 'miss').inc()
+
+
+def cache_stale(cache):
+    """
+    Record a lookup served from an expired entry being refreshed
+
+    :param cache: cache name
+    :return: None
+    """
+    cache_requests.labels(cache, 'stale').inc()
+
+
+def register_lru_cache(cache, function):
+    """
+    Report the statistics of a functools.lru_cache wrapped function
+
+    :param cache: cache name
+    :param function: lru_cache wrapped function
+    :return: function
+    """
+    cache_requests.set_function(
+        lambda: function.cache_info().hits, cache, 'hit'
+    )
+    cache_requests.set_function(
+        lambda: function.cache_info().misses, cache, 'miss'
+    )
+    return function
+
+
+def record_response(response, size=None):
+    """
+    Record a response sent by a server
+
+    :param response: http.response.Response
+    :param size: bytes sent, defaults to the body length
+    :return: None
+    """
+    if size is None:
+        size = len(response.body) if response.body else 0
+    response_bytes.inc(size)
+
+
+class RequestMetrics(instrumentation.Collector):
+    """
+    Turns request traces into request metrics
+    """
+    __slots__ = ()
+
+    def trace_started(self, request, trace):
+        requests_in_progress.inc()
+
+    def trace_finished(self, request, response, trace):
+        requests_in_progress.dec()
+        route = trace.route or 'unresolved'
+        requests_total.labels(
+            route, request.method, getattr(response, 'code', 500)
+        ).inc()
+        request_duration.labels(route).observe(trace.duration)
+        duration, count = trace.totals().get('db', (0.0, 0))
+        db_queries.labels(route).observe(count)
+        db_duration.labels(route).observe(duration)
+
+
+RequestMetrics.register_class()
@@ -0,0 +1,265 @@
+"""
+Response compression
+
+Negotiates Accept-Encoding and gzips text responses above a size threshold.
+
+Static files can be compressed ahead of time with precompress_directory()
+ (the 'precompress' mode of the application does this for all configured
+ directories), the file handlers then serve the .gz siblings directly.
+"""
+import gzip
+import logging
+import os
+import pathlib
+
+from framework.includes import SettingsDict
+from framework.machinery import component
+from . import Handler
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+_compressible_types = frozenset({
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'application/xhtml+xml',
+    'image/svg+xml'
+})
+
+_compressible_extensions = frozenset({
+    '.html', '.htm', '.css', '.js', '.json', '.xml', '.svg', '.txt'
+})
+
+
+def request_header(request, name):
+    """
+    Value of a request header, regardless of whether the request
+     was constructed by the plain or the WSGI server
+
+    :param request: http.Request
+    :param name: header name as sent by the client, e.g. 'Accept-Encoding'
+    :return: header value or None
+    """
+    for key in (name, 'HTTP_' + name.upper().replace('-', '_')):
+        if key in request.headers:
+            return request.headers[key].value
+    return None
+
+
+def accepted_encodings(request):
+    """
+    Parse the Accept-Encoding header of the request
+
+    :param request:
+    :return: dict {coding: qvalue}
+    """
+    value = request_header(request, 'Accept-Encoding')
+    if not value:
+        return {}
+    codings = {}
+    for item in value.split(','):
+        coding, *params = item.strip().split(';')
+        q = 1.0
+        for param in params:
+            key, _, val = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            codings[coding.strip().lower()] = q
+    return codings
+
+
+def accepts_encoding(request, encoding='gzip'):
+    """
+    Whether the client declared it accepts the encoding
+
+    :param request:
+    :param encoding:
+    :return: bool
+    """
+    codings = accepted_encodings(request)
+    return codings.get(encoding, codings.get('*', 0)) > 0
+
+
+def is_compressible(content_type):
+    """
+    Decide whether a content type benefits from compression
+
+    :param content_type: Content-Type header value
+    :return: bool
+    """
+    if not content_type:
+        return False
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype.startswith('text/') or mimetype in _compressible_types
+
+
+def add_vary(headers, field='Accept-Encoding'):
+    """
+    Add field to the Vary header of a response
+
+    :param headers: response HeaderMap
+    :param field:
+    :return: None
+    """
+    if 'Vary' in headers:
+        current = headers['Vary'].value
+        if field.lower() not in (a.strip().lower() for a in current.split(',')):
+            headers['Vary'] = current + ', ' + field
+    else:
+        headers['Vary'] = field
+
+
+def precompressed_sibling(filepath):
+    """
+    The precompressed sibling of filepath, regardless of the client
+
+    A sibling is only used if it is at least as new as the original.
+     Responses for a file with a sibling depend on Accept-Encoding,
+     whichever variant they contain.
+
+    :param filepath: pathlib.Path of the requested file
+    :return: pathlib.Path of the .gz file or None
+    """
+    variant = filepath.with_name(filepath.name + '.gz')
+    try:
+        if variant.stat().st_mtime < filepath.stat().st_mtime:
+            return None
+    except OSError:
+        return None
+    return variant
+
+
+def precompress_file(path, level=9, min_size=0):
+    """
+    Write a .gz sibling for path if it is missing or outdated
+
+    :param path: file to compress
+    :param level: gzip compression level
+    :param min_size: files smaller than this are skipped
+    :return: path of the written file or None
+    """
+    path = pathlib.Path(path)
+    target = path.with_name(path.name + '.gz')
+    stat = path.stat()
+    if stat.st_size < min_size:
+        return None
+    if target.exists() and target.stat().st_mtime >= stat.st_mtime:
+        return None
+    with path.open('rb') as source:
+        data = gzip.compress(source.read(), level)
+    if len(data) >= stat.st_size:
+        return None
+    with target.open('wb') as file:
+        file.write(data)
+    os.utime(str(target), (stat.st_atime, stat.st_mtime))
+    return target
+
+
+def precompress_directory(
+        directory,
+        level=9,
+        min_size=0,
+        extensions=_compressible_extensions
+):
+    """
+    Recursively precompress all files with matching extensions
+
+    :param directory: root directory
+    :param level: gzip compression level
+    :param min_size: files smaller than this are skipped
+    :param extensions: file extensions to compress
+    :return: generator of written paths
+    """
+    for root, dirs, files in os.walk(str(directory)):
+        for name in files:
+            path = pathlib.Path(root) / name
+            if path.suffix.lower() not in extensions:
+                continue
+            written = precompress_file(path, level, min_size)
+            if written is not None:
+                yield written
+
+
+@component.inject(SettingsDict)
+def precompress_from_settings(settings):
+    """
+    Precompress all file directories and additional
+     directories named in the settings
+
+    :param settings: injected settings
+    :return: number of files written
+    """
+    directories = []
+    for dirs in settings.get('file_directories', {}).values():
+        directories.extend((dirs, ) if isinstance(dirs, str) else dirs)
+    directories.extend(settings.get('precompress_directories', ()))
+
+    count = 0
+    for directory in directories:
+        if not directory.startswith('/'):
+            directory = settings['dc_basedir'] + '/' + directory
+        if not os.path.isdir(directory):
+            logging.getLogger(__name__).warning(
+                'skipping missing directory {}'.format(directory)
+            )
+            continue
+        for path in precompress_directory(
+                directory,
+                level=settings.get('compression_level', 6),
+                min_size=settings.get('compression_min_size', 1024)
+        ):
+            logging.getLogger(__name__).info('compressed {}'.format(path))
+            count += 1
+    return count
+
+
+class Compression(Handler):
+    """
+    Compress text responses with gzip if the client supports it
+    """
+    __slots__ = ()
+
+    @component.inject_method(SettingsDict)
+    def handle_response(self, settings, request, response_obj):
+        """
+        Compress the body in place
+
+        :param settings: injected settings
+        :param request:
+        :param response_obj:
+        :return: None
+        """
+        headers = response_obj.headers
+        if (response_obj.code != 200
+                or not isinstance(response_obj.body, (bytes, bytearray))):
+            return None
+        if 'Content-Encoding' in headers:
+            # precompressed file or compressed by the controller
+            return None
+        if 'Content-Type' in headers:
+            content_type = headers['Content-Type'].value
+        else:
+            content_type = settings['default_headers'].get('Content-Type')
+        if not is_compressible(content_type):
+            return None
+        if len(response_obj.body) < settings.get('compression_min_size', 1024):
+            return None
+
+        add_vary(headers)
+        if not accepts_encoding(request, 'gzip'):
+            return None
+
+        response_obj.body = gzip.compress(
+            response_obj.body, settings.get('compression_level', 6)
+        )
+        headers['Content-Encoding'] = 'gzip'
+        if 'Content-Length' in headers:
+            headers['Content-Length'] = str(len(response_obj.body))
+        return None
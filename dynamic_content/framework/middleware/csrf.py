@@ -1,13 +1,14 @@
 """Cross Site Request Forgery prevention code"""
 
 import binascii
+import itertools
 import os
 from framework import includes
 
 from framework.backend import orm
 from . import register, Handler
 from framework.util import html
-from framework.http import RequestMethods, response
+from framework.http import RequestMethods, response, coalesce
 from framework.machinery import component
 
 
@@ -96,8 +97,12 @@ def new():
     """
     Create a new token and store it
 
+    Tokens are single use, the page containing it may therefore
+     not be shared with other clients.
+
     :return: form id, token as string
     """
+    coalesce.mark_private()
     fid = binascii.hexlify(gen_token()).decode()
     token = gen_token()
     ARToken.create(form_id=fid, token=token)
@@ -108,12 +113,14 @@ class SecureForm(html.FormElement):
     """
     Special Form element with a csrf token
     """
-    def render_content(self):
+    __slots__ = ()
+
+    def iter_children(self):
         """
         Renders content and a token
         :return:
         """
-        return super().render_content() + str(self.render_token())
+        return itertools.chain(super().iter_children(), (self.render_token(), ))
 
     @staticmethod
     def render_token():
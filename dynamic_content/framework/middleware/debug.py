@@ -0,0 +1,87 @@
+"""Development helpers that add debug information to responses"""
+import html as _html
+
+from framework.backend import querylog
+from framework.util import html
+from . import Handler
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+def query_section(log):
+    """
+    Render a query log as html
+
+    :param log: querylog.QueryLog
+    :return: html element
+    """
+    suspects = {shape for shape, queries in log.suspects()}
+    rows = [('count', 'total ms', 'query', 'call sites')]
+    for shape, queries in log.by_shape().items():
+        sites = sorted({q.site for q in queries if q.site})
+        rows.append((
+            str(len(queries)),
+            '{:.3f}'.format(sum(q.duration for q in queries) * 1000),
+            html.ContainerElement(
+                _html.escape(shape),
+                html_type='code',
+                classes={'n-plus-one'} if shape in suspects else None
+            ),
+            _html.escape(', '.join(sites))
+        ))
+    return html.ContainerElement(
+        html.ContainerElement(
+            '{} queries in {:.3f}ms, {} N+1 suspect(s)'.format(
+                log.count, log.duration * 1000, len(suspects)
+            ),
+            html_type='h4'
+        ),
+        html.TableElement(*rows, table_head=True),
+        html_type='section',
+        classes={'dc-debug-queries'}
+    )
+
+
+class Toolbar(Handler):
+    """
+    Append a debug toolbar to html pages.
+
+    Currently shows the query log of the request (requires the
+     'query_accounting' setting). Has to be placed before
+     compression middleware in the middleware list.
+    """
+    __slots__ = ()
+
+    def handle_response(self, request, response_obj):
+        """
+        Insert the toolbar before the closing body tag
+
+        :param request:
+        :param response_obj:
+        :return: None
+        """
+        log = querylog.current()
+        headers = response_obj.headers
+        if (log is None
+                or response_obj.code != 200
+                or not isinstance(response_obj.body, (bytes, bytearray))
+                or 'Content-Encoding' in headers):
+            return None
+        if ('Content-Type' in headers
+                and not headers['Content-Type'].value.startswith('text/html')):
+            return None
+
+        toolbar = html.render(html.ContainerElement(
+            query_section(log),
+            element_id='dc-debug-toolbar'
+        )).encode('utf-8')
+        body = response_obj.body
+        index = body.rfind(b'</body>')
+        if index == -1:
+            index = len(body)
+        response_obj.body = body[:index] + toolbar + body[index:]
+        if 'Content-Length' in headers:
+            headers['Content-Length'] = str(len(response_obj.body))
+        return None
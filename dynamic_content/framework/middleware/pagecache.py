@@ -1,13 +1,127 @@
 """
 Cache pages for reuse later
+
+Caches the responses to GET requests of anonymous clients, the same
+ requests framework.http.coalesce considers identical. Responses
+ setting cookies or marked private (e.g. pages with a csrf protected
+ form, see framework.http.coalesce.mark_private) are not cached. Pages are fresh
+ for 'page_cache_ttl' seconds and served stale for another
+ 'page_cache_stale' seconds while a background worker runs the request
+ through the pipeline again to refresh the entry.
+
+Enable by adding 'framework.middleware.pagecache.Middleware' to the
+ 'middleware' setting, after all middleware modifying responses
+ (e.g. compression) since cached responses are returned as they were
+ when stored.
+
+Pages are stored in the 'page' namespace of the 'Cache' component
+ (see framework.cache), hence shared by all processes using a shared
+ cache backend.
 """
-from framework import middleware
+import functools
+
+from framework import middleware, http
+from framework.http import coalesce
+from framework.includes import SettingsDict
+from framework.machinery import component
+from framework.util import stale
 
 
 __author__ = 'Justus Adam'
 __version__ = '0.1'
 
 
+@component.Component('PageCache')
+class PageCache(object):
+    """
+    Cached responses and the worker refreshing them
+    """
+    __slots__ = 'cache', 'refresher', 'pipeline'
+
+    def __init__(self):
+        self.cache = None
+        self.refresher = stale.Refresher('PageCache-Refresh')
+        # set by the server threads, function processing a request
+        self.pipeline = None
+
+    @component.inject_method(SettingsDict)
+    def configure(self, settings):
+        self.cache = stale.StaleCache(
+            'page',
+            settings.get('page_cache_ttl', 60),
+            settings.get('page_cache_stale', 300)
+        )
+
+    def lookup(self, request):
+        """
+        Cached response for request
+
+        :param request: http.Request
+        :return: http.response.Response or None
+        """
+        key = coalesce.request_key(request)
+        if key is None:
+            return None
+        if self.cache is None:
+            self.configure()
+        response, state = self.cache.lookup(key)
+        if state is stale.MISS:
+            return None
+        if state is stale.STALE and self.pipeline is not None:
+            self.refresher.submit(
+                key, functools.partial(self.pipeline, copy_request(request))
+            )
+        return response
+
+    def store(self, request, response):
+        """
+        Cache response if it may be shared
+
+        :param request: http.Request
+        :param response: http.response.Response
+        :return: None
+        """
+        key = coalesce.request_key(request)
+        if key is None or response.code != http.response.HttpResponseCodes.OK:
+            return
+        snapshot = coalesce.snapshot(response)
+        if snapshot is None:
+            return
+        if self.cache is None:
+            self.configure()
+        self.cache.store(key, snapshot)
+
+
+@component.inject(PageCache)
+def get_page_cache(cache):
+    """
+    Convenience method to obtain the page cache
+
+    :param cache: injected page cache component
+    :return: PageCache
+    """
+    return cache
+
+
+def copy_request(request):
+    """
+    Request equal to request to be processed independently
+
+    :param request: http.Request
+    :return: http.Request
+    """
+    return http.Request(
+        request.host,
+        request.port,
+        request.path,
+        request.method,
+        request.query,
+        {key: header.value for key, header in request.headers.items()},
+        request.ssl_enabled,
+        None
+    )
+
+
 class Middleware(middleware.Handler):
     """
     Middleware checking for a cached copy of the page
@@ -19,13 +133,17 @@ class Middleware(middleware.Handler):
         :param response_obj:
         :return:
         """
-        pass
+        get_page_cache().store(request, response_obj)
 
     def handle_request(self, request):
         """
         Return cached response if available
 
+        Refreshing requests always run through the pipeline.
+
         :param request:
         :return:
         """
-        pass
\ No newline at end of file
+        if stale.refreshing():
+            return None
+        return get_page_cache().lookup(request)
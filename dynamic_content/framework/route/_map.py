@@ -6,7 +6,7 @@ import logging
 from framework import http
 from framework.errors import exceptions
 from ..machinery import component
-from framework.util import structures
+from framework.util import structures, module
 from framework.includes import get_settings
 
 
@@ -122,6 +122,56 @@ def handler_from_container(container, method, headers):
         return None
 
 
+def _remove_from_container(container, predicate):
+    """
+    Remove handlers matching predicate from a HandlerContainer
+
+    :param container: HandlerContainer
+    :param predicate: callable taking a handler
+    :return: True if the container is empty afterwards
+    """
+    for method in HandlerContainer.__slots__:
+        current = getattr(container, method)
+        if current is None:
+            continue
+        if isinstance(current, (tuple, list)):
+            remaining = [handler for handler in current if not predicate(handler)]
+            if len(remaining) == 1:
+                remaining = remaining[0]
+            setattr(container, method, remaining or None)
+        elif predicate(current):
+            setattr(container, method, None)
+    return all(
+        getattr(container, method) is None
+        for method in HandlerContainer.__slots__
+    )
+
+
+def _remove_from_segment(segment, predicate):
+    """
+    Recursively remove handlers matching predicate and prune
+     segments and containers left empty
+
+    :param segment: Segment
+    :param predicate: callable taking a handler
+    :return: True if the segment is empty afterwards
+    """
+    if (segment.handler is not None
+            and _remove_from_container(segment.handler, predicate)):
+        segment.handler = None
+    if (segment.wildcard is not None
+            and _remove_from_container(segment.wildcard, predicate)):
+        segment.wildcard = None
+    for key, value in tuple(segment.items()):
+        if isinstance(value, Segment):
+            empty = _remove_from_segment(value, predicate)
+        else:
+            empty = _remove_from_container(value, predicate)
+        if empty:
+            del segment[key]
+    return not segment and segment.handler is None and segment.wildcard is None
+
+
 class PathMap(Segment):
     """Abstract Baseclass for path mappers"""
     __slots__ = '_controller_classes',
@@ -173,6 +223,34 @@ class PathMap(Segment):
         """
         raise NotImplementedError
 
+    def remove_handlers(self, predicate):
+        """
+        Unregister all handlers for which predicate returns True
+
+        Works for all path map types since they share the Segment
+         structure. Lookups running concurrently either see the
+         handler or resolve the path as not found.
+
+        :param predicate: callable taking a handler
+        :return: None
+        """
+        _remove_from_segment(self, predicate)
+
+    def remove_module(self, package:str):
+        """
+        Unregister all handlers and controller classes defined in package
+
+        :param package: dotted module name
+        :return: None
+        """
+        self.remove_handlers(
+            lambda handler: module.defined_in(handler.function, package)
+        )
+        self._controller_classes[:] = [
+            instance for instance in self._controller_classes
+            if not module.defined_in(instance, package)
+        ]
+
     # @decorators.catch(exception=(exceptions.ControllerError, PermissionError), return_value='error', log_error=True, print_error=True)
     def resolve(self, request):
         """
@@ -188,7 +188,7 @@ class RouteLink(linker.SimpleLink):
     __slots__ = ()
 
     def unlink_action(self):
-        raise NotImplementedError
+        get_cm().remove_handlers(lambda handler: handler is self.variable)
 
     def link_action(self):
         for i in self.variable.value:
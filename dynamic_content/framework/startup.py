@@ -0,0 +1,393 @@
+"""
+Startup profiling
+
+Started with the --profile-startup command line flag. Records a
+ timeline of the application boot: the time spent importing each module,
+ loading middleware, running the module scanner (per scanner hook
+ type), database setup, lazily loaded components and the handling of
+ the first request.
+
+A report sorted by time is printed to stderr once the servers are ready and
+ completed after the first request. Optionally the timeline is written
+ as Chrome trace event JSON, which can be opened with chrome://tracing
+ or https://ui.perfetto.dev.
+
+While profiling is off span() returns a shared no-op context manager.
+"""
+import collections
+import functools
+import importlib.abc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+clock = time.perf_counter
+
+
+class Event(object):
+    """
+    A timed section of the startup. Use as context manager.
+    """
+    __slots__ = 'name', 'category', 'start', 'duration', 'own', 'thread', '_timeline'
+
+    def __init__(self, name, category, timeline):
+        self.name = name
+        self.category = category
+        self.start = self.duration = None
+        # duration without nested events
+        self.own = None
+        self.thread = threading.get_ident()
+        self._timeline = timeline
+
+    def __enter__(self):
+        self._timeline._stack().append([self, 0.0])
+        self.start = clock()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = clock() - self.start
+        stack = self._timeline._stack()
+        _, nested = stack.pop()
+        self.own = self.duration - nested
+        if stack:
+            stack[-1][1] += self.duration
+        self._timeline.add(self)
+        return False
+
+
+class _NullEvent(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+null_event = _NullEvent()
+
+
+class _Local(threading.local):
+    stack = None
+
+
+class Timeline(object):
+    """
+    Collection of the events recorded during startup
+    """
+    __slots__ = 'origin', 'events', 'totals', '_lock', '_local'
+
+    def __init__(self):
+        self.origin = clock()
+        self.events = []
+        # (category, name) -> [seconds, count] for events too
+        # frequent to be recorded individually
+        self.totals = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._local = _Local()
+
+    def _stack(self):
+        stack = self._local.stack
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, category):
+        return Event(name, category, self)
+
+    def add(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def accumulate(self, name, category, duration):
+        """
+        Add to the total of a frequent event
+
+        :param name: event name
+        :param category: event category
+        :param duration: seconds
+        :return: None
+        """
+        with self._lock:
+            total = self.totals.setdefault((category, name), [0.0, 0])
+            total[0] += duration
+            total[1] += 1
+
+    def summary(self):
+        """
+        Time per category and name, sorted by time
+
+        Imports are counted with their own time (without nested imports),
+         everything else with the full duration.
+
+        :return: list of (category, name, seconds, count)
+        """
+        result = collections.OrderedDict()
+        for event in self.events:
+            if event.duration is None:
+                continue
+            entry = result.setdefault((event.category, event.name), [0.0, 0])
+            entry[0] += event.own if event.category == 'import' else event.duration
+            entry[1] += 1
+        for key, (seconds, count) in self.totals.items():
+            entry = result.setdefault(key, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+        return sorted(
+            (
+                (category, name, seconds, count)
+                for (category, name), (seconds, count) in result.items()
+            ),
+            key=lambda a: a[2],
+            reverse=True
+        )
+
+    def report(self, limit=30):
+        """
+        Human readable report
+
+        :param limit: number of individual entries listed
+        :return: str
+        """
+        summary = self.summary()
+        categories = collections.OrderedDict()
+        for category, name, seconds, count in summary:
+            categories[category] = categories.get(category, 0.0) + seconds
+
+        lines = ['Startup profile, {:.1f}ms since profiling started'.format(
+            (clock() - self.origin) * 1000
+        )]
+        lines.append('{:<10} {:>10}'.format('category', 'ms'))
+        for category, seconds in sorted(
+                categories.items(), key=lambda a: a[1], reverse=True):
+            lines.append('{:<10} {:>10.1f}'.format(category, seconds * 1000))
+        lines.append('')
+        lines.append('{:<10} {:<50} {:>10} {:>6}'.format(
+            'category', 'name', 'ms', 'count'
+        ))
+        for category, name, seconds, count in summary[:limit]:
+            lines.append('{:<10} {:<50} {:>10.2f} {:>6}'.format(
+                category, name[-50:], seconds * 1000, count
+            ))
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """
+        The timeline in the Chrome trace event format
+
+        :return: dict
+        """
+        pid = os.getpid()
+        events = [
+            {
+                'name': event.name,
+                'cat': event.category,
+                'ph': 'X',
+                'ts': (event.start - self.origin) * 1e6,
+                'dur': event.duration * 1e6,
+                'pid': pid,
+                'tid': event.thread
+            }
+            for event in self.events
+            if event.duration is not None
+        ]
+        events.extend(
+            {
+                'name': category + ':' + name,
+                'ph': 'C',
+                'ts': 0,
+                'pid': pid,
+                'args': {'ms': seconds * 1000, 'count': count}
+            }
+            for (category, name), (seconds, count) in self.totals.items()
+        )
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(str(path), 'w') as file:
+            json.dump(self.chrome_trace(), file)
+
+
+class _TimedLoader(object):
+    """
+    Loader proxy recording the execution time of a module
+    """
+    __slots__ = '_loader',
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with span(module.__name__, 'import'):
+            self._loader.exec_module(module)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder wrapping the loaders found by the other finders
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader)
+            return spec
+        return None
+
+
+class _State(object):
+    timeline = None
+    import_timer = None
+    trace_file = None
+    reported = False
+
+
+_state = _State()
+
+
+def enable(trace_file=None):
+    """
+    Start profiling
+
+    :param trace_file: path to write the Chrome trace to or None
+    :return: Timeline
+    """
+    _state.timeline = Timeline()
+    _state.trace_file = trace_file
+    _state.reported = False
+    _state.import_timer = ImportTimer()
+    sys.meta_path.insert(0, _state.import_timer)
+    return _state.timeline
+
+
+def disable():
+    """
+    Stop profiling
+
+    :return: the Timeline or None
+    """
+    timeline = _state.timeline
+    if _state.import_timer in sys.meta_path:
+        sys.meta_path.remove(_state.import_timer)
+    _state.timeline = _state.import_timer = None
+    return timeline
+
+
+def active():
+    """
+    :return: the current Timeline or None
+    """
+    return _state.timeline
+
+
+def span(name, category):
+    """
+    Record a section of the startup
+
+    :param name: section name
+    :param category: e.g. 'boot', 'db', 'import'
+    :return: context manager
+    """
+    timeline = _state.timeline
+    if timeline is None:
+        return null_event
+    return timeline.span(name, category)
+
+
+def timed(name, category):
+    """
+    Decorator recording every call of the function as startup section
+
+    :param name: section name
+    :param category: section category
+    :return: decorator
+    """
+    def inner(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return inner
+
+
+def accumulate(name, category, duration):
+    timeline = _state.timeline
+    if timeline is not None:
+        timeline.accumulate(name, category, duration)
+
+
+def _publish():
+    timeline = _state.timeline
+    print(timeline.report(), file=sys.stderr)
+    if _state.trace_file:
+        timeline.write_chrome_trace(_state.trace_file)
+        logging.getLogger(__name__).info(
+            'Startup trace written to {}'.format(_state.trace_file)
+        )
+
+
+def ready():
+    """
+    Servers are about to accept requests, report the boot timeline
+
+    Further server threads becoming ready do not report again.
+
+    :return: None
+    """
+    if _state.timeline is None or _state.reported:
+        return
+    _state.reported = True
+    _publish()
+
+
+def first_request(request):
+    """
+    Time the handling of the first request if profiling
+
+    Profiling stops once the first request has been answered.
+
+    :param request: http.Request
+    :return: context manager
+    """
+    timeline = _state.timeline
+    if timeline is None:
+        return null_event
+    return _FirstRequest(timeline.span(request.path, 'warmup'))
+
+
+class _FirstRequest(object):
+    __slots__ = 'event',
+
+    def __init__(self, event):
+        self.event = event
+
+    def __enter__(self):
+        return self.event.__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.event.__exit__(exc_type, exc_val, exc_tb)
+        if _state.timeline is not None:
+            _publish()
+            disable()
+        return False
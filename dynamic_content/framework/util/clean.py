@@ -5,7 +5,7 @@ import functools
 import re
 
 __author__ = 'Justus Adam'
-__version__ = '0.1'
+__version__ = '0.2'
 
 
 severities = {
@@ -17,13 +17,165 @@ severities = {
 escapers = {'code', 'pre'}
 
 
+_quote_or_end = re.compile('[>"\']')
+
+
+class Sanitizer(object):
+    """
+    Removes opening and closing tags of a fixed set of tag names.
+
+    All tag names are compiled into a single pattern, so the text is
+     cleaned in one pass. The end of a tag is found by a scan that
+     skips quoted attribute values, '>' inside attributes therefore
+     does not end the tag.
+
+    Tag names starting with '?' denote processing instructions
+     (like '?dchp'), they are removed up to the closing '?>'.
+    """
+    __slots__ = 'tags', '_start', '_max_start_length'
+
+    def __init__(self, forbidden_tags):
+        self.tags = tuple(forbidden_tags)
+        names = '|'.join(
+            re.escape(tag) for tag in sorted(self.tags, key=len, reverse=True)
+        )
+        self._start = re.compile(
+            '</?(' + names + ')(?![\\w:-])', flags=re.I
+        ) if names else None
+        # '</' + name + one character of lookahead
+        self._max_start_length = max(map(len, self.tags), default=0) + 3
+
+    @staticmethod
+    def _tag_end(text, tag, pos, final=True):
+        """
+        Find the index after the end of the tag starting before pos
+
+        :param text: text to search
+        :param tag: matched tag name
+        :param pos: index after the tag name
+        :param final: whether text is the end of the input
+        :return: index or -1 if the tag does not end within text
+        """
+        if tag.startswith('?'):
+            end = text.find('?>', pos)
+            return -1 if end == -1 else end + 2
+        while True:
+            match = _quote_or_end.search(text, pos)
+            if match is None:
+                return -1
+            char = match.group()
+            if char == '>':
+                return match.end()
+            closing = text.find(char, match.end())
+            if closing == -1:
+                if not final:
+                    return -1
+                # unbalanced quote, the first '>' ends the tag
+                end = text.find('>', match.end())
+                return -1 if end == -1 else end + 1
+            pos = closing + 1
+
+    def _clean(self, text, final):
+        """
+        Clean text as far as possible
+
+        :param text: input text
+        :param final: whether text is the end of the input
+        :return: (cleaned output, unprocessed rest)
+        """
+        if self._start is None:
+            return text, ''
+        out = []
+        pos = 0
+        search = self._start.search
+        while True:
+            match = search(text, pos)
+            if match is None:
+                break
+            end = self._tag_end(text, match.group(1), match.end(), final)
+            if end == -1:
+                if not final:
+                    out.append(text[pos:match.start()])
+                    return ''.join(out), text[match.start():]
+                # an unterminated tag swallows the rest of the text
+                end = len(text)
+            out.append(text[pos:match.start()])
+            pos = end
+        if final:
+            out.append(text[pos:])
+            return ''.join(out), ''
+        # the tail may hold the beginning of a tag split across chunks
+        lt = text.rfind('<', pos)
+        if lt != -1 and len(text) - lt <= self._max_start_length:
+            out.append(text[pos:lt])
+            return ''.join(out), text[lt:]
+        out.append(text[pos:])
+        return ''.join(out), ''
+
+    def clean(self, text):
+        """
+        Remove all forbidden tags from text
+
+        :param text: input string
+        :return: cleaned string
+        """
+        return self._clean(text, True)[0]
+
+    def stream(self, chunks):
+        """
+        Clean text arriving in chunks, yielding cleaned pieces.
+
+        Only an unterminated tag (or a tag name split across chunks)
+         is held back in memory.
+
+        :param chunks: iterable of strings
+        :return: generator of strings
+        """
+        rest = ''
+        for chunk in chunks:
+            out, rest = self._clean(rest + chunk, False)
+            if out:
+                yield out
+        out, _ = self._clean(rest, True)
+        if out:
+            yield out
+
+
+def forbidden_for_level(severity_level):
+    """
+    All tags forbidden at a severity level
+
+    :param severity_level:
+    :return: tuple of tag names
+    """
+    return tuple(itertools.chain(
+        *tuple(severities[a] for a in range(severity_level + 1))
+    ))
+
+
+_sanitizers = {
+    level: Sanitizer(forbidden_for_level(level)) for level in severities
+}
+
+
 def remove_dangerous_tags(text, severity_level=1):
-    forbidden = tuple(itertools.chain(*tuple(severities[a] for a in range(severity_level + 1))))
-    return clean_text(text, forbidden)
+    return _sanitizers[severity_level].clean(text)
+
 
+def stream_remove_dangerous_tags(chunks, severity_level=1):
+    """
+    Streaming variant of remove_dangerous_tags for large bodies
+
+    :param chunks: iterable of strings
+    :param severity_level:
+    :return: generator of cleaned strings
+    """
+    return _sanitizers[severity_level].stream(chunks)
 
-_regex_provider = functools.partial(re.compile, flags=re.S)
 
+@functools.lru_cache(maxsize=64)
+def _sanitizer(forbidden_tags):
+    return Sanitizer(forbidden_tags)
 
 
 def clean_text(text, forbidden_tags):
@@ -33,9 +185,4 @@ def clean_text(text, forbidden_tags):
     :param forbidden_tags: tags to remove
     :return: cleaned text
     """
-    for tag in forbidden_tags:
-        regex2 = _regex_provider('<' + tag + '.*?>')
-        regex3 = _regex_provider('</' + tag + '.*?>')
-        text = re.sub(regex2, '', text)
-        text = re.sub(regex3, '', text)
-    return text
+    return _sanitizer(tuple(forbidden_tags)).clean(text)
@@ -10,7 +10,7 @@ __version__ = '0.2'
 
 
 loaders = {
-    'yaml': yaml.load,
+    'yaml': yaml.safe_load,
     'json': json.load
 }
 
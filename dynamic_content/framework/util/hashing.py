@@ -0,0 +1,147 @@
+"""
+Password hashing off the request threads
+
+PBKDF2 with the configured number of rounds costs tens of milliseconds
+ of CPU time per call. Run on the request threads a burst of logins
+ occupies every thread, hence hashes are computed in a small process
+ pool. The number of jobs waiting for a worker is bounded, once the
+ queue is full HashingQueueFull is raised instead of queueing more work,
+ a hash taking longer than 'hashing_timeout' seconds raises
+ HashingTimeout.
+
+Always uses the OpenSSL backed hashlib.pbkdf2_hmac of the standard library.
+"""
+import concurrent.futures
+import hashlib
+import logging
+import multiprocessing
+import threading
+
+from framework.errors import exceptions
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+def pbkdf2(algorithm, password, salt, rounds, length):
+    """
+    Executed in the worker processes
+
+    :param algorithm: hash name, e.g. 'sha256'
+    :param password: bytes
+    :param salt: bytes
+    :param rounds: number of iterations
+    :param length: length of the derived key
+    :return: bytes
+    """
+    return hashlib.pbkdf2_hmac(algorithm, password, salt, rounds, length)
+
+
+@component.Component('HashingPool')
+class HashingPool(object):
+    """
+    Bounded process pool for password hashing
+
+    Started lazily on first use from the 'hashing_processes',
+     'hashing_queue_limit' and 'hashing_timeout' settings. With
+     'hashing_processes' set to 0 hashes are computed on the calling thread.
+    """
+    __slots__ = '_executor', '_slots', '_lock', '_started', 'timeout'
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._started = False
+        self.timeout = None
+
+    @component.inject_method(SettingsDict)
+    def start(self, settings):
+        """
+        Create the process pool unless already running
+
+        :param settings: injected settings
+        :return: None
+        """
+        with self._lock:
+            if self._started:
+                return
+            processes = settings.get('hashing_processes', 0)
+            if processes:
+                # forked workers would inherit the locks held by other
+                #  threads, e.g. the stdin lock of the application thread
+                #  waiting in input(), and deadlock
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=processes,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                # jobs being executed plus jobs waiting
+                self._slots = threading.BoundedSemaphore(
+                    processes + settings.get('hashing_queue_limit', 0)
+                )
+                self.timeout = settings.get('hashing_timeout')
+                logging.getLogger(__name__).debug(
+                    'started hashing pool with {} processes'.format(processes)
+                )
+            self._started = True
+
+    def shutdown(self, wait=True):
+        """
+        Stop the worker processes, the pool restarts on next use
+
+        :param wait: wait for running jobs
+        :return: None
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+            self._executor = self._slots = None
+            self._started = False
+
+    def pbkdf2(self, algorithm, password, salt, rounds, length):
+        """
+        Compute a PBKDF2 hash in the pool
+
+        :param algorithm: hash name
+        :param password: bytes
+        :param salt: bytes
+        :param rounds: number of iterations
+        :param length: length of the derived key
+        :return: bytes
+        :raises exceptions.HashingQueueFull: if no slot is available
+        :raises exceptions.HashingTimeout: if the hash took too long
+        """
+        if not self._started:
+            self.start()
+        executor, slots = self._executor, self._slots
+        if executor is None:
+            return pbkdf2(algorithm, password, salt, rounds, length)
+        if not slots.acquire(blocking=False):
+            raise exceptions.HashingQueueFull()
+        try:
+            future = executor.submit(
+                pbkdf2, algorithm, password, salt, rounds, length
+            )
+        except BaseException:
+            slots.release()
+            raise
+        # release once the job is done, even if the caller timed out
+        future.add_done_callback(lambda f: slots.release())
+        try:
+            return future.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            raise exceptions.HashingTimeout(self.timeout)
+
+
+@component.inject('HashingPool')
+def get_pool(pool):
+    """
+    Convenience method to obtain the hashing pool
+
+    :param pool: injected pool component
+    :return: HashingPool
+    """
+    return pool
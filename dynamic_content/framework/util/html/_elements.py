@@ -1,7 +1,14 @@
 """
 Framework for rendering HTML elements *incomplete*
+
+Elements are rendered by walking the element tree iteratively and
+ appending all pieces to a single output list which is joined once,
+ instead of concatenating the str() of every nested element.
 """
 
+import collections.abc
+import copy as _copy
+import itertools
 import re
 import functools
 
@@ -9,16 +16,102 @@ from . import transform
 
 
 __author__ = 'Justus Adam'
-__version__ = '0.2'
+__version__ = '0.3'
+
+
+def render(element):
+    """
+    Render an element (or any other object) to a string
+
+    :param element: element tree root
+    :return: html formatted string
+    """
+    return ''.join(_walk([], iter((element, ))))
+
+
+def render_into(out, element):
+    """
+    Append the rendered pieces of element to the list out
+
+    :param out: list to append to
+    :param element: element tree root
+    :return: out
+    """
+    return _walk(out, iter((element, )))
+
+
+def _walk(out, iterator):
+    """
+    Iterative depth first traversal of an element tree
+
+    Elements overriding render() or render_content() with custom
+     string building are delegated to, everything else is written
+     piecewise into out.
+
+    :param out: output list
+    :param iterator: iterator over the nodes to render
+    :return: out
+    """
+    write = out.append
+    stack = []
+    closing = None
+    while True:
+        for node in iterator:
+            if isinstance(node, str):
+                write(node)
+                continue
+            if not isinstance(node, BaseElement):
+                write(str(node))
+                continue
+            cls = type(node)
+            if cls.render is not _default_render:
+                write(node.render())
+                continue
+            write(node.open_tag())
+            if not isinstance(node, ContainerElement):
+                continue
+            if cls.render_content is not _default_render_content:
+                write(node.render_content())
+                write(node.close_tag())
+                continue
+            stack.append((iterator, closing))
+            iterator, closing = iter(node.iter_children()), node.close_tag()
+            break
+        else:
+            if closing is not None:
+                write(closing)
+            if not stack:
+                return out
+            iterator, closing = stack.pop()
+
+
+class _FrozenParams(dict):
+    """
+    Read only attribute dict of a frozen element
+
+    Unlike types.MappingProxyType it can be pickled (cached regions
+     and forms contain frozen elements).
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(
+            'the attributes of a frozen element cannot be changed, '
+            'use copy()'
+        )
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return type(self), (dict(self), )
 
 
 class BaseElement:
     """
     Base element for html abstracting elements that can be rendered to string
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ('_value_params', '_params', 'html_type')
+    __slots__ = ('_value_params', '_params', 'html_type', '_head')
 
     def __init__(self, html_type, additional: dict=None):
         self.html_type = html_type
@@ -27,6 +120,7 @@ class BaseElement:
         else:
             self._value_params = {}
         self._params = set()
+        self._head = None
 
     @property
     def params(self):
@@ -46,6 +140,53 @@ class BaseElement:
         """
         return self._value_params
 
+    @property
+    def frozen(self):
+        """
+        Whether the attributes of this element have been frozen
+
+        :return: bool
+        """
+        return self._head is not None
+
+    def freeze(self):
+        """
+        Make the attributes of this element immutable and cache the
+         rendered opening tag.
+
+        Use for elements that are rendered often and never change,
+         like module level buttons and scripts.
+         Changing the attributes afterwards raises a TypeError,
+         use copy() to obtain a mutable version.
+
+        :return: self
+        """
+        if self._head is None:
+            self._value_params = _FrozenParams({
+                k: frozenset(v) if isinstance(v, set) else v
+                for k, v in self._value_params.items()
+            })
+            self._params = frozenset(self._params)
+            self._head = transform.html_head(
+                self.html_type, self._value_params, self._params
+            )
+        return self
+
+    def copy(self):
+        """
+        Shallow copy of this element with mutable attributes
+
+        :return: new element
+        """
+        new = _copy.copy(self)
+        new._value_params = {
+            k: set(v) if isinstance(v, frozenset) else v
+            for k, v in self._value_params.items()
+        }
+        new._params = set(self._params)
+        new._head = None
+        return new
+
     def __add__(self, other):
         return str(self) + str(other)
 
@@ -55,19 +196,29 @@ class BaseElement:
 
         :return: str
         """
-        return transform.to_html_head(
+        if self._head is not None:
+            return self._head
+        return transform.html_head(
             self.html_type,
             self._value_params,
             self._params
         )
 
+    def open_tag(self):
+        """
+        Render the opening tag
+
+        :return: str
+        """
+        return '<' + self.render_head() + '>'
+
     def render(self):
         """
         Return a html representation of this object
 
         :return: html formatted string
         """
-        return '<{}>'.format(self.render_head())
+        return render(self)
 
     def __str__(self):
         return self.render()
@@ -81,13 +232,14 @@ class BaseElement:
         return self.render()
 
 
+_default_render = BaseElement.render
+
+
 class BaseClassIdElement(BaseElement):
     """
     Html base element with classes and id's
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -139,13 +291,13 @@ class BaseClassIdElement(BaseElement):
         self._value_params['id'] = val
 
 
-class ContainerElement(list, BaseClassIdElement):
+class ContainerElement(BaseClassIdElement):
     """
     Html base element with other content within
+
+    Behaves like a list of its content.
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = '_content',
 
     _list_replacement = None
 
@@ -157,7 +309,7 @@ class ContainerElement(list, BaseClassIdElement):
             element_id: str=None,
             additional: dict=None
         ):
-        super().__init__(content)
+        self._content = list(content)
         BaseClassIdElement.__init__(
             self,
             html_type,
@@ -166,6 +318,73 @@ class ContainerElement(list, BaseClassIdElement):
             additional
         )
 
+    # ----------------------
+    # list interface
+    # ----------------------
+
+    def __len__(self):
+        return len(self._content)
+
+    def __iter__(self):
+        return iter(self._content)
+
+    def __reversed__(self):
+        return reversed(self._content)
+
+    def __contains__(self, item):
+        return item in self._content
+
+    def __getitem__(self, item):
+        return self._content[item]
+
+    def __setitem__(self, key, value):
+        self._content[key] = value
+
+    def __delitem__(self, key):
+        del self._content[key]
+
+    def __iadd__(self, other):
+        self._content.extend(other)
+        return self
+
+    def append(self, item):
+        self._content.append(item)
+
+    def extend(self, iterable):
+        self._content.extend(iterable)
+
+    def insert(self, index, item):
+        self._content.insert(index, item)
+
+    def pop(self, index=-1):
+        return self._content.pop(index)
+
+    def remove(self, item):
+        self._content.remove(item)
+
+    def index(self, item, *args):
+        return self._content.index(item, *args)
+
+    def count(self, item):
+        return self._content.count(item)
+
+    def clear(self):
+        self._content.clear()
+
+    def copy(self):
+        """
+        Shallow copy of this element with mutable attributes and content
+
+        :return: new element
+        """
+        new = super().copy()
+        new._content = list(self._content)
+        return new
+
+    # ----------------------
+    # end list interface
+    # ----------------------
+
     @property
     def content(self):
         """
@@ -201,25 +420,32 @@ class ContainerElement(list, BaseClassIdElement):
         else:
             return value
 
-    def render_content(self):
+    def iter_children(self):
         """
-        Render the content within
+        The children as they should be rendered.
 
-        :return: string
+        Overwrite this (rather than render_content) in subclasses
+         to alter the rendered content.
+
+        :return: iterable
         """
-        return ''.join(str(a) for a in self)
+        return self._content
 
-    def render(self):
+    def close_tag(self):
         """
-        Overwrites parent method to render a closing tag and the content
+        Render the closing tag
 
-        :return: html formatted string
+        :return: str
         """
-        return '<{}>{}</{}>'.format(
-            self.render_head(),
-            self.render_content(),
-            self.html_type
-        )
+        return '</' + self.html_type + '>'
+
+    def render_content(self):
+        """
+        Render the content within
+
+        :return: string
+        """
+        return ''.join(_walk([], iter(self.iter_children())))
 
     def iter_content(self):
         """
@@ -239,10 +465,15 @@ class ContainerElement(list, BaseClassIdElement):
         Generator for the tags and the content
         :return:
         """
-        yield '<{}>'.format(self.render_head())
+        yield self.open_tag()
         for a in self.iter_content():
             yield a
-        yield '</{}>'.format(self.html_type)
+        yield self.close_tag()
+
+
+_default_render_content = ContainerElement.render_content
+
+collections.abc.MutableSequence.register(ContainerElement)
 
 
 Div = functools.partial(ContainerElement, html_type='div')
@@ -254,12 +485,10 @@ class AbstractList(ContainerElement):
     """
     Element containing other objects with special rendering requirements
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     _subtypes = 'li',
-    _regex = re.compile('<(\w+)')
+    _regex = re.compile(r'<(\w+)')
 
     def subtype_wrapper(self, *args, **kwargs):
         """
@@ -271,13 +500,13 @@ class AbstractList(ContainerElement):
         """
         return ContainerElement(*args, html_type=self._subtypes[0], **kwargs)
 
-    def render_content(self):
+    def iter_children(self):
         """
         Override parent method to ensure the correct type of all contents within
 
-        :return: html formatted string
+        :return: iterable
         """
-        return ''.join(str(self.ensure_subtype(a)) for a in self)
+        return map(self.ensure_subtype, self._content)
 
     def ensure_subtype(self, value):
         """
@@ -307,9 +536,7 @@ class A(ContainerElement):
     """
     html <a> element
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -333,13 +560,7 @@ class HTMLPage(ContainerElement):
     """
     html <html> element
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = '_stylesheets', '_metatags', '_scripts'
-
-    _stylesheets = None
-    _metatags = None
-    _scripts = None
+    __slots__ = '_stylesheets', '_metatags', '_scripts'
 
     def __init__(
             self,
@@ -360,6 +581,7 @@ class HTMLPage(ContainerElement):
             element_id=element_id,
             additional=additional
         )
+        self._stylesheets = self._metatags = self._scripts = None
         self.stylesheets = stylesheets
         self.metatags = metatags
         self.scripts = scripts
@@ -454,9 +676,7 @@ class LinkElement(BaseElement):
     """
     Html link element
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -473,9 +693,7 @@ class LinkElement(BaseElement):
 
 class Stylesheet(BaseElement):
     """Html <link rel="stylesheet"> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -494,9 +712,7 @@ class Stylesheet(BaseElement):
 
 class Script(ContainerElement):
     """Html <script> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -516,9 +732,7 @@ class Script(ContainerElement):
 
 class List(AbstractList):
     """html <ul> or <ol> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = 'item_classes', 'item_additionals'
+    __slots__ = 'item_classes', 'item_additionals'
 
     _subtypes = 'li',
 
@@ -551,6 +765,10 @@ class List(AbstractList):
         """
         value = super().ensure_subtype(value)
 
+        if isinstance(value, BaseElement) and value.frozen and (
+                self.item_classes is not None
+                or self.item_additionals is not None):
+            value = value.copy()
         if self.item_classes is not None:
             value.classes = (
                 self.item_classes
@@ -569,9 +787,7 @@ Ul = functools.partial(List, list_type='ul')
 
 class Select(AbstractList):
     """html <select> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = 'selected',
+    __slots__ = 'selected',
 
     _subtypes = 'option',
 
@@ -615,9 +831,7 @@ class Select(AbstractList):
 
 class Option(ContainerElement):
     """html <option> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = 'selected',
+    __slots__ = 'selected',
 
     def __init__(
             self,
@@ -643,9 +857,7 @@ class Option(ContainerElement):
 
 class TableElement(ContainerElement):
     """html <table> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = 'table_head',
+    __slots__ = 'table_head',
 
     def __init__(
             self,
@@ -664,27 +876,19 @@ class TableElement(ContainerElement):
             additional=additional
         )
 
-    def render_content(self):
+    def iter_children(self):
         """
         Override parent to account for th elements
 
-        :return: string
+        :return: generator
         """
-        def compile_c():
-            """
-            Iter self, ensuring subtype
-
-            :return: generator
-            """
-            if self.table_head:
-                yield self.ensure_th(self[0])
-                iterable = self[1:]
-            else:
-                iterable = self
-            for row in iterable:
-                yield self.ensure_tr(row)
-
-        return ''.join(str(a) for a in compile_c())
+        if self.table_head:
+            yield self.ensure_th(self[0])
+            iterable = self[1:]
+        else:
+            iterable = self._content
+        for row in iterable:
+            yield self.ensure_tr(row)
 
     @staticmethod
     def ensure_tr(row):
@@ -709,10 +913,10 @@ class TableElement(ContainerElement):
         :return: TableHead()
         """
         if isinstance(row, ContainerElement) and row.html_type == 'th':
-            return str(row)
+            return row
         elif isinstance(row, (list, tuple)):
-            return str(TableHead(*row))
-        return str(TableHead(row))
+            return TableHead(*row)
+        return TableHead(row)
 
 
 Table = TableElement
@@ -722,9 +926,7 @@ class AbstractTableRow(AbstractList):
     """
     Abstract base class for table rows
     """
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     _subtypes = 'td',
 
@@ -754,9 +956,7 @@ Td = TableData = functools.partial(ContainerElement, html_type='td')
 
 class Input(BaseClassIdElement):
     """html <input> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -782,20 +982,18 @@ class Input(BaseClassIdElement):
         if required:
             self._params.add('required')
 
-    def render(self):
+    def open_tag(self):
         """
         Render with closed tag
 
         :return: string
         """
-        return '<{} />'.format(self.render_head())
+        return '<' + self.render_head() + ' />'
 
 
 class TextInput(Input):
     """html <input type="text"> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -823,9 +1021,7 @@ class TextInput(Input):
 
 class AbstractCheckable(Input):
     """html input with 'checked' attribute"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -859,9 +1055,7 @@ Checkbox = functools.partial(AbstractCheckable, input_type='checkbox')
 
 class Textarea(ContainerElement):
     """html <textarea> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -891,9 +1085,7 @@ class Textarea(ContainerElement):
 
 class Label(ContainerElement):
     """html <label> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = ()
+    __slots__ = ()
 
     def __init__(
             self,
@@ -920,9 +1112,7 @@ SubmitButton = lambda *args, value='Submit', **kwargs: Input(
 
 class FormElement(ContainerElement):
     """html <form> element"""
-    # I tried to make the memory fingerprint smaller with this
-    # however this does not work with multiple inheritance
-    # __slots__ = 'submit',
+    __slots__ = 'submit',
 
     def __init__(
         self,
@@ -932,7 +1122,7 @@ class FormElement(ContainerElement):
         element_id: str=None,
         method='post',
         charset='UTF-8',
-        submit=SubmitButton(),
+        submit=SubmitButton().freeze(),
         target: str=None,
         additional: dict=None
     ):
@@ -949,13 +1139,13 @@ class FormElement(ContainerElement):
         self._value_params['action'] = action
         self.submit = submit
 
-    def render_content(self):
+    def iter_children(self):
         """
         Override parent to add submit element
 
-        :return: string
+        :return: iterable
         """
-        return super().render_content() + str(self.submit)
+        return itertools.chain(super().iter_children(), (self.submit, ))
 
 
 # HACK 'defaultdict' esque hack to provide all elements to the parser
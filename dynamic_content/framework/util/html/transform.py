@@ -24,6 +24,34 @@ def to_html_head(*items):
     return ' '.join(b for b in (_to_html_head(a) for a in items) if b != '')
 
 
+def html_head(html_type, value_params, params):
+    """
+    Fast path of to_html_head for the (html_type, value_params, params)
+     triple every element renders
+
+    :param html_type: tag name
+    :param value_params: dict of attributes
+    :param params: iterable of value-less attributes
+    :return: str
+    """
+    escape = _html.escape
+    parts = [escape(html_type)] if html_type else []
+    for k, v in value_params.items():
+        if not v:
+            continue
+        if isinstance(v, str):
+            v = escape(v)
+        elif hasattr(v, '__iter__') and not isinstance(v, dict):
+            v = ' '.join(escape(a if isinstance(a, str) else str(a)) for a in v if a)
+        else:
+            v = _to_html_head(v)
+        parts.append(escape(k) + '="' + v + '"')
+    for a in params:
+        if a:
+            parts.append(escape(a if isinstance(a, str) else str(a)))
+    return ' '.join(parts)
+
+
 def _to_html_head(item):
     if item is None:
         return None
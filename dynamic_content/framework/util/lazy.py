@@ -5,6 +5,8 @@ delaying intantiation or initialization
 
 import functools
 
+from framework import startup
+
 __author__ = 'Justus Adam'
 
 
@@ -27,7 +29,8 @@ def ensure_loaded(loadable):
         :return: loadable(instance, *args, **kwargs)
         """
         if not instance.loaded:
-            instance.load()
+            with startup.span(type(instance).__name__ + '.load', 'lazy'):
+                instance.load()
             instance.loaded = True
         return loadable(instance, *args, **kwargs)
 
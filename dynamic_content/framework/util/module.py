@@ -5,4 +5,26 @@ __author__ = 'Justus Adam'
 
 def import_by_path(path:str):
     path = path[:-3] if path.endswith('.py') else path
-    return importlib.import_module(path.replace('/', '.'))
\ No newline at end of file
+    return importlib.import_module(path.replace('/', '.'))
+
+def in_package(module_name, package:str):
+    """
+    Whether module_name is package or one of its submodules
+
+    :param module_name: dotted module name
+    :param package: dotted package name
+    :return: bool
+    """
+    return (module_name is not None
+            and (module_name == package or module_name.startswith(package + '.')))
+
+
+def defined_in(obj, package:str):
+    """
+    Whether obj (a function, class or instance) was defined in package
+
+    :param obj: any object
+    :param package: dotted package name
+    :return: bool
+    """
+    return in_package(getattr(obj, '__module__', None), package)
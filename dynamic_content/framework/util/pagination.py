@@ -0,0 +1,216 @@
+"""
+Keyset (cursor) pagination for controllers
+
+Instead of skipping rows with an offset, which costs the database the
+ skipped rows on every deep page, a page continues after (or before)
+ the sort key of the last (first) row of the page seen before. With an
+ index on the sort fields every page is as cheap as the first one.
+
+    page = pagination.keyset(
+        Page.select(), (Page.date_created, Page.oid), 10, get
+    )
+    for row in page:
+        ...
+    page.next_url('/node')
+
+The sort fields must identify a row, end them with the primary key.
+ Cursors are opaque url safe strings, passed as 'after' or 'before'
+ query parameters.
+"""
+import base64
+import datetime
+import functools
+import json
+import logging
+import operator
+from urllib import parse
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+AFTER = 'after'
+BEFORE = 'before'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return ['T', value.isoformat()]
+    if isinstance(value, datetime.date):
+        return ['D', value.isoformat()]
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, list):
+        kind, text = value
+        if kind == 'T':
+            return datetime.datetime.strptime(
+                text, '%Y-%m-%dT%H:%M:%S.%f' if '.' in text else '%Y-%m-%dT%H:%M:%S'
+            )
+        if kind == 'D':
+            return datetime.datetime.strptime(text, '%Y-%m-%d').date()
+        raise InvalidCursor(kind)
+    return value
+
+
+def encode_cursor(values):
+    """
+    :param values: sequence of sort key values
+    :return: url safe str
+    """
+    data = json.dumps([_encode_value(a) for a in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    :param cursor: str from encode_cursor
+    :return: list of sort key values
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data.decode())
+        if not isinstance(values, list):
+            raise InvalidCursor(cursor)
+        return [_decode_value(a) for a in values]
+    except (ValueError, TypeError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+class KeysetPage(object):
+    """
+    One page of a query, iterated lazily
+
+    next_cursor and prev_cursor are known once the page was iterated.
+    """
+    __slots__ = (
+        'query', 'fields', 'size', 'cursor', 'backwards', 'descending',
+        'next_cursor', 'prev_cursor'
+    )
+
+    def __init__(self, query, fields, size, cursor=None, backwards=False,
+                 descending=True):
+        """
+        :param query: peewee select query, without order and limit
+        :param fields: model fields forming the sort key
+        :param size: rows per page
+        :param cursor: sort key values (decoded) to continue from
+        :param backwards: whether the page ends before cursor
+            instead of starting after it
+        :param descending: sort order of the listing
+        """
+        if cursor is not None and len(cursor) != len(fields):
+            raise InvalidCursor(cursor)
+        self.query = query
+        self.fields = tuple(fields)
+        self.size = size
+        self.cursor = cursor
+        self.backwards = backwards
+        self.descending = descending
+        self.next_cursor = None
+        self.prev_cursor = None
+
+    def _condition(self, reverse):
+        """
+        Rows behind cursor in the (possibly reversed) sort order
+        """
+        compare = operator.lt if self.descending != reverse else operator.gt
+        alternatives = []
+        for i, field in enumerate(self.fields):
+            parts = [
+                self.fields[j] == self.cursor[j] for j in range(i)
+            ] + [compare(field, self.cursor[i])]
+            alternatives.append(functools.reduce(operator.and_, parts))
+        return functools.reduce(operator.or_, alternatives)
+
+    def _select(self, reverse):
+        query = self.query
+        if self.cursor is not None:
+            query = query.where(self._condition(reverse))
+        ascending = self.descending == reverse
+        return query.order_by(
+            *(a.asc() if ascending else a.desc() for a in self.fields)
+        ).limit(self.size + 1)
+
+    def key(self, row):
+        """
+        :param row: model instance
+        :return: cursor of row
+        """
+        return encode_cursor([getattr(row, a.name) for a in self.fields])
+
+    def __iter__(self):
+        if self.backwards:
+            rows = list(self._select(True))
+            more = len(rows) > self.size
+            rows = rows[:self.size][::-1]
+            if rows:
+                self.prev_cursor = self.key(rows[0]) if more else None
+                self.next_cursor = self.key(rows[-1])
+            for row in rows:
+                yield row
+            return
+
+        last = None
+        for count, row in enumerate(self._select(False).iterator()):
+            if count == self.size:
+                self.next_cursor = self.key(last)
+                break
+            if count == 0 and self.cursor is not None:
+                self.prev_cursor = self.key(row)
+            last = row
+            yield row
+
+    def _url(self, path, name, cursor):
+        if cursor is None:
+            return None
+        return '{}?{}'.format(path, parse.urlencode({name: cursor}))
+
+    def next_url(self, path):
+        """
+        :param path: path of the listing
+        :return: url of the following page or None
+        """
+        return self._url(path, AFTER, self.next_cursor)
+
+    def prev_url(self, path):
+        """
+        :param path: path of the listing
+        :return: url of the preceding page or None
+        """
+        return self._url(path, BEFORE, self.prev_cursor)
+
+
+def keyset(query, fields, size, get=None, descending=True):
+    """
+    Page of query as requested by the query parameters of a request
+
+    Invalid cursors are logged and yield the first page.
+
+    :param query: peewee select query, without order and limit
+    :param fields: model fields forming the sort key
+    :param size: rows per page
+    :param get: parsed query string of the request
+    :param descending: sort order of the listing
+    :return: KeysetPage
+    """
+    get = get or {}
+    for name, backwards in ((AFTER, False), (BEFORE, True)):
+        if name in get:
+            try:
+                cursor = decode_cursor(get[name][0])
+                return KeysetPage(
+                    query, fields, size, cursor, backwards, descending
+                )
+            except InvalidCursor as error:
+                logging.getLogger(__name__).warning(
+                    'invalid pagination cursor {}'.format(error)
+                )
+                break
+    return KeysetPage(query, fields, size, descending=descending)
@@ -0,0 +1,205 @@
+"""
+Caching with a stale window (stale-while-revalidate)
+
+Entries are fresh for 'ttl' seconds and stale for another 'stale'
+ seconds. Stale entries are still served, while a single background
+ worker (the Refresher) computes the replacement, so a hot entry
+ expiring does not make the next request pay for the recomputation.
+ Only entries past the stale window are recomputed by the caller.
+
+Entries are stored in a namespace of the 'Cache' component
+ (see framework.cache), values are hence copies and must be picklable.
+"""
+import logging
+import queue
+import threading
+import time
+
+from framework import metrics, cache as _cache
+
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+FRESH = 'fresh'
+STALE = 'stale'
+MISS = 'miss'
+
+
+class StaleCache(object):
+    """
+    Cache with a stale window on top of a framework.cache.Cache
+
+    Entries are kept by the cache for ttl + stale seconds.
+    """
+    __slots__ = 'name', 'ttl', 'stale', 'cache', 'clock', 'strict'
+
+    def __init__(self, name, ttl, stale, cache=None, clock=time.time,
+                 strict=False):
+        """
+        :param name: cache name reported to the metrics, namespace in
+            the 'Cache' component unless cache is given
+        :param ttl: seconds an entry is fresh
+        :param stale: seconds an entry is served stale after that
+        :param cache: framework.cache.Cache storing the entries
+        :param clock: time source
+        :param strict: raise if a value cannot be pickled instead of
+            logging it, see framework.cache.Cache.set
+        """
+        self.name = name
+        self.ttl = ttl
+        self.stale = stale
+        self.cache = (
+            cache if cache is not None
+            else _cache.get_cache().namespace(name, record=False)
+        )
+        self.clock = clock
+        self.strict = strict
+
+    def lookup(self, key):
+        """
+        :param key: hashable
+        :return: tuple (value, state), state is one of FRESH, STALE, MISS
+        """
+        entry = self.cache.get(_cache.make_key(key))
+        now = self.clock()
+        if entry is None or entry[2] <= now:
+            metrics.cache_miss(self.name)
+            return None, MISS
+        value, fresh_until, _ = entry
+        if fresh_until > now:
+            metrics.cache_hit(self.name)
+            return value, FRESH
+        metrics.cache_stale(self.name)
+        return value, STALE
+
+    def store(self, key, value, ttl=None, stale=None, tags=()):
+        """
+        :param key: hashable
+        :param value: any picklable object
+        :param ttl: overrides the default ttl
+        :param stale: overrides the default stale window
+        :param tags: invalidation tags, see framework.cache.Cache
+        :return: None
+        """
+        ttl = self.ttl if ttl is None else ttl
+        stale = self.stale if stale is None else stale
+        now = self.clock()
+        self.cache.set(
+            _cache.make_key(key),
+            (value, now + ttl, now + ttl + stale),
+            ttl + stale,
+            tags,
+            self.strict
+        )
+
+    def delete(self, key):
+        self.cache.delete(_cache.make_key(key))
+
+
+class _Local(threading.local):
+    refreshing = False
+
+
+_local = _Local()
+
+
+def refreshing():
+    """
+    Whether the current thread is recomputing a stale entry
+
+    :return: bool
+    """
+    return _local.refreshing
+
+
+class Refresher(object):
+    """
+    Background worker running refresh functions one at a time
+
+    A key is only queued once until its refresh ran. When the queue is
+     full refreshes are dropped, the entry stays stale and the next
+     request for it tries again.
+    """
+    __slots__ = 'name', '_queue', '_pending', '_lock', '_thread'
+
+    def __init__(self, name, queue_size=64):
+        """
+        :param name: name of the worker thread
+        :param queue_size: maximum number of waiting refreshes
+        """
+        self.name = name
+        self._queue = queue.Queue(queue_size)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, key, function):
+        """
+        Schedule function to refresh key
+
+        :param key: hashable
+        :param function: callable without arguments
+        :return: whether the refresh was scheduled
+        """
+        with self._lock:
+            if key in self._pending:
+                return False
+            try:
+                self._queue.put_nowait((key, function))
+            except queue.Full:
+                return False
+            self._pending.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+        return True
+
+    def _run(self):
+        _local.refreshing = True
+        while True:
+            key, function = self._queue.get()
+            try:
+                function()
+            except Exception as error:
+                logging.getLogger(__name__).error(
+                    'Refreshing {} failed: {}'.format(key, error)
+                )
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._queue.task_done()
+
+    def join(self):
+        """
+        Wait until all scheduled refreshes ran
+
+        :return: None
+        """
+        self._queue.join()
+
+
+def fetch(cache, refresher, key, compute):
+    """
+    Value for key from cache, computed by compute if missing
+
+    Stale values are returned right away and refreshed in the background.
+
+    :param cache: StaleCache
+    :param refresher: Refresher
+    :param key: hashable
+    :param compute: callable without arguments returning the value
+    :return: value
+    """
+    value, state = cache.lookup(key)
+    if state is FRESH:
+        return value
+    if state is STALE:
+        refresher.submit(key, lambda: cache.store(key, compute()))
+        return value
+    value = compute()
+    cache.store(key, value)
+    return value
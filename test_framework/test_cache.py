@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+
+from framework import cache, http
+
+__author__ = 'Justus Adam'
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class BackendTests(object):
+    def make_backend(self, clock):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.clock = Clock()
+        self.backend = self.make_backend(self.clock)
+        self.cache = cache.Cache(self.backend)
+
+    def tearDown(self):
+        self.backend.close()
+        self.directory.cleanup()
+
+    def test_get_set_delete(self):
+        self.assertIsNone(self.backend.get('a'))
+        self.assertTrue(self.backend.set('a', b'value'))
+        self.assertEqual(self.backend.get('a'), b'value')
+        self.assertTrue(self.backend.set('a', b'other'))
+        self.assertEqual(self.backend.get('a'), b'other')
+        self.backend.delete('a')
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_ttl(self):
+        self.backend.set('a', b'value', 10)
+        self.backend.set('b', b'value')
+        self.clock.now += 9
+        self.assertEqual(self.backend.get('a'), b'value')
+        self.clock.now += 1
+        self.assertIsNone(self.backend.get('a'))
+        self.assertEqual(self.backend.get('b'), b'value')
+
+    def test_clear(self):
+        self.backend.set('a', b'1')
+        self.backend.set('b', b'2')
+        self.backend.clear()
+        self.assertEqual(self.backend.get_many(('a', 'b')), {})
+
+    def test_cache(self):
+        self.cache.set('list', [1, 2])
+        value = self.cache.get('list')
+        self.assertEqual(value, [1, 2])
+        value.append(3)
+        self.assertEqual(self.cache.get('list'), [1, 2])
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+        self.assertEqual(self.cache.get_many(('list', 'missing')), {'list': [1, 2]})
+
+    def test_namespaces(self):
+        pages = self.cache.namespace('page')
+        regions = self.cache.namespace('region')
+        pages.set('a', 1)
+        regions.set('a', 2)
+        self.assertEqual((pages.get('a'), regions.get('a')), (1, 2))
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_tags(self):
+        pages = self.cache.namespace('page')
+        self.cache.set('a', 1, tags=('node:1', ))
+        pages.set('a', 2, tags=('node:1', 'node:2'))
+        self.cache.set('b', 3, tags=('node:2', ))
+        self.cache.invalidate('node:1')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNone(pages.get('a'))
+        self.assertEqual(self.cache.get('b'), 3)
+
+    def test_response(self):
+        self.cache.set('page', http.response.Response(b'body', headers={'X-A': '1'}))
+        response = self.cache.get('page')
+        self.assertEqual(response.body, b'body')
+        self.assertEqual(response.headers['X-A'].value, '1')
+
+
+class TestMemoryBackend(BackendTests, unittest.TestCase):
+    def make_backend(self, clock):
+        return cache.MemoryBackend(max_entries=3, clock=clock)
+
+    def test_eviction(self):
+        for key in 'abc':
+            self.backend.set(key, b'1')
+        self.backend.get('a')
+        self.backend.set('d', b'1')
+        self.assertIsNone(self.backend.get('b'))
+        self.assertEqual(self.backend.get('a'), b'1')
+
+
+class TestSharedMemoryBackend(BackendTests, unittest.TestCase):
+    def make_backend(self, clock):
+        return cache.SharedMemoryBackend(
+            os.path.join(self.directory.name, 'cache'),
+            slots=64, slot_size=512, clock=clock
+        )
+
+    def test_shared(self):
+        other = cache.SharedMemoryBackend(
+            self.backend.path, slots=64, slot_size=512, clock=self.clock
+        )
+        try:
+            self.backend.set('a', b'value')
+            self.assertEqual(other.get('a'), b'value')
+            other.delete('a')
+            self.assertIsNone(self.backend.get('a'))
+        finally:
+            other.close()
+
+    def test_too_large(self):
+        self.assertFalse(self.backend.set('a', bytes(self.backend.capacity + 1)))
+        self.assertTrue(self.backend.set('a', bytes(self.backend.capacity)))
+
+    def test_layout_change(self):
+        self.backend.set('a', b'value')
+        other = cache.SharedMemoryBackend(
+            self.backend.path, slots=32, slot_size=512, clock=self.clock
+        )
+        try:
+            self.assertIsNone(other.get('a'))
+        finally:
+            other.close()
+
+
+class TestDiskBackend(BackendTests, unittest.TestCase):
+    def make_backend(self, clock):
+        return cache.DiskBackend(self.directory.name, clock=clock)
+
+
+class TestCreateBackend(unittest.TestCase):
+    def test_create(self):
+        backend = cache.create_backend.__wrapped__(
+            {}, {'type': 'memory', 'max_entries': 2}
+        )
+        self.assertIsInstance(backend, cache.MemoryBackend)
+        self.assertEqual(backend.max_entries, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
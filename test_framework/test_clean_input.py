@@ -47,3 +47,40 @@ class TestCleanInput(unittest.TestCase):
         self.assertNotIn('<body>', text2)
         self.assertNotIn('<html>', text2)
         self.assertNotIn('</html>', text2)
+
+    def test_quoted_gt(self):
+        text = clean.remove_dangerous_tags(
+            '<p>a</p><script src="x>y" data-a=\'>\'>alert(1)</script><p>b</p>', 0
+        )
+        self.assertEqual(text, '<p>a</p>alert(1)<p>b</p>')
+
+    def test_case_and_prefix(self):
+        text = clean.remove_dangerous_tags(
+            '<SCRIPT>x</Script><header>h</header><head>', 1
+        )
+        self.assertEqual(text, 'x<header>h</header>')
+
+    def test_dchp(self):
+        text = clean.remove_dangerous_tags(
+            '<div>a</div><?dchp if a > b: echo(a) ?>c', 2
+        )
+        self.assertEqual(text, 'ac')
+
+    def test_unterminated(self):
+        self.assertEqual(clean.remove_dangerous_tags('a<script src="x', 0), 'a')
+
+    def test_clean_text(self):
+        self.assertEqual(
+            clean.clean_text('<b>bold</b><i>it</i>', ('b', )), 'bold<i>it</i>'
+        )
+
+    def test_stream(self):
+        text = s1 + '<script src="x>y">z</script>' * 3 + '<?dchp a > b ?>'
+        for level in range(3):
+            expected = clean.remove_dangerous_tags(text, level)
+            for size in (1, 2, 3, 7, 64):
+                chunks = (text[i:i + size] for i in range(0, len(text), size))
+                self.assertEqual(
+                    ''.join(clean.stream_remove_dangerous_tags(chunks, level)),
+                    expected
+                )
@@ -0,0 +1,139 @@
+import threading
+import time
+import unittest
+
+from framework import http
+from framework.http import coalesce
+
+__author__ = 'Justus Adam'
+
+
+def make_request(path='/page', headers=None, method='get'):
+    return http.Request('localhost', 8080, path, method, {}, headers, False, None)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.flight = coalesce.SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def slow(self):
+        self.calls += 1
+        self.release.wait(5)
+        return self.calls
+
+    def start_leader(self, results, **kwargs):
+        leader = threading.Thread(
+            target=lambda: results.append(self.flight.do('key', self.slow, **kwargs))
+        )
+        leader.start()
+        while not self.flight.in_flight():
+            pass
+        return leader
+
+    def test_shared(self):
+        results = []
+        leader = self.start_leader(results)
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(self.flight.do('key', self.slow))
+            )
+            for _ in range(3)
+        ]
+        for follower in followers:
+            follower.start()
+        # let the followers reach the wait
+        time.sleep(0.2)
+        self.release.set()
+        for thread in [leader] + followers:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(results), [(1, False)] + [(1, True)] * 3)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    def test_timeout(self):
+        results = []
+        leader = self.start_leader(results)
+        self.assertEqual(
+            self.flight.do('key', lambda: 'own', timeout=0.01), ('own', False)
+        )
+        self.release.set()
+        leader.join()
+
+    def test_not_shareable(self):
+        results = []
+        leader = self.start_leader(results, share=lambda result: None)
+        follower = threading.Thread(
+            target=lambda: results.append(self.flight.do('key', lambda: 'own'))
+        )
+        follower.start()
+        self.release.set()
+        leader.join()
+        follower.join()
+        self.assertIn(('own', False), results)
+
+    def test_error(self):
+        def fail():
+            self.release.wait(5)
+            raise ValueError
+
+        errors = []
+
+        def run():
+            try:
+                self.flight.do('key', fail)
+            except ValueError:
+                errors.append(True)
+
+        leader = threading.Thread(target=run)
+        leader.start()
+        while not self.flight.in_flight():
+            pass
+        results = []
+        follower = threading.Thread(
+            target=lambda: results.append(self.flight.do('key', lambda: 'own'))
+        )
+        follower.start()
+        self.release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(errors, [True])
+        self.assertEqual(results, [('own', False)])
+
+
+class TestRequests(unittest.TestCase):
+    def test_request_key(self):
+        self.assertEqual(
+            coalesce.request_key(make_request()),
+            coalesce.request_key(make_request())
+        )
+        self.assertNotEqual(
+            coalesce.request_key(make_request()),
+            coalesce.request_key(make_request('/other'))
+        )
+        self.assertNotEqual(
+            coalesce.request_key(make_request()),
+            coalesce.request_key(
+                make_request(headers={'Accept-Encoding': 'gzip'})
+            )
+        )
+        self.assertIsNone(
+            coalesce.request_key(make_request(headers={'Cookie': 'SESS=a'}))
+        )
+        self.assertIsNone(coalesce.request_key(make_request(method='post')))
+
+    def test_snapshot(self):
+        response = http.response.Response(b'body', headers={'X-Test': '1'})
+        copy = coalesce.snapshot(response)
+        self.assertIsNot(copy, response)
+        self.assertEqual(copy.body, b'body')
+        copy.headers['Content-Length'] = '4'
+        self.assertNotIn('Content-Length', response.headers)
+        self.assertIsNone(coalesce.snapshot(
+            http.response.Response(b'body', cookies={'SESS': 'token'})
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import gzip
+import os
+import pathlib
+import tempfile
+import unittest
+
+from framework.http import request, response
+from framework.middleware import compression
+
+__author__ = 'Justus Adam'
+
+
+def make_request(headers):
+    return request.Request.from_path_and_post(
+        'localhost', '/page', 'get', headers, False
+    )
+
+
+class TestNegotiation(unittest.TestCase):
+    def test_accepted(self):
+        for headers, result in (
+            ({'Accept-Encoding': 'gzip, deflate'}, True),
+            ({'HTTP_ACCEPT_ENCODING': 'deflate, gzip;q=0.5'}, True),
+            ({'Accept-Encoding': 'gzip;q=0, deflate'}, False),
+            ({'Accept-Encoding': '*'}, True),
+            ({'Accept-Encoding': 'identity'}, False),
+            ({}, False)
+        ):
+            self.assertEqual(
+                compression.accepts_encoding(make_request(headers)), result
+            )
+
+
+class TestMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.handler = compression.Compression()
+        self.body = ('<p>some text</p>' * 200).encode()
+
+    def test_compress(self):
+        resp = response.Response(
+            self.body, headers={'Content-Type': 'text/html; charset=utf-8'}
+        )
+        self.handler.handle_response(
+            make_request({'Accept-Encoding': 'gzip'}), resp
+        )
+        self.assertEqual(resp.headers['Content-Encoding'].value, 'gzip')
+        self.assertEqual(resp.headers['Vary'].value, 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(resp.body), self.body)
+
+    def test_not_accepted(self):
+        resp = response.Response(self.body)
+        self.handler.handle_response(make_request({}), resp)
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(resp.headers['Vary'].value, 'Accept-Encoding')
+        self.assertEqual(resp.body, self.body)
+
+    def test_small_and_binary(self):
+        for resp in (
+            response.Response(b'<p>small</p>'),
+            response.Response(self.body, headers={'Content-Type': 'image/png'})
+        ):
+            self.handler.handle_response(
+                make_request({'Accept-Encoding': 'gzip'}), resp
+            )
+            self.assertNotIn('Content-Encoding', resp.headers)
+            self.assertNotIn('Vary', resp.headers)
+
+
+class TestPrecompress(unittest.TestCase):
+    def test_precompress_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'style.css'
+            with path.open('w') as file:
+                file.write('body { margin: 0; }\n' * 200)
+            with (pathlib.Path(directory) / 'image.png').open('wb') as file:
+                file.write(os.urandom(2048))
+
+            written = list(compression.precompress_directory(directory))
+            self.assertEqual(written, [path.with_name('style.css.gz')])
+            self.assertEqual(list(compression.precompress_directory(directory)), [])
+
+            self.assertEqual(
+                compression.precompressed_sibling(path), written[0]
+            )
+            self.assertIsNone(compression.precompressed_sibling(
+                pathlib.Path(directory) / 'image.png'
+            ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from framework import cache, http
+from framework.dchp import evaluator, fragment
+
+__author__ = 'Justus Adam'
+
+
+TEMPLATE = (
+    '<div><p>before</p>'
+    '<dchpcache key="\'fragment-\' + name" ttl="60" vary="{}">'
+    '<span><?dchp counter.append(1); print(len(counter)) ?></span>'
+    '</dchpcache></div>'
+)
+
+
+class Client(object):
+    def __init__(self, group):
+        self.access_group = group
+
+
+def render(template, counter, name='test', **context):
+    return str(evaluator.evaluate_html(
+        template, dict(context, counter=counter, name=name)
+    ))
+
+
+class TestFragment(unittest.TestCase):
+    def setUp(self):
+        cache.get_cache().clear()
+        self.counter = []
+
+    def test_cached(self):
+        template = TEMPLATE.format('')
+        first = render(template, self.counter)
+        self.assertEqual(first, '<div><p>before</p><span>1</span></div>')
+        self.assertEqual(render(template, self.counter), first)
+        self.assertEqual(len(self.counter), 1)
+        render(template, self.counter, name='other')
+        self.assertEqual(len(self.counter), 2)
+
+    def test_vary(self):
+        template = TEMPLATE.format('group')
+        request = http.Request('localhost', 8080, '/', 'get', {}, None, False, None)
+        for group in (1, 2, 1):
+            request.client = Client(group)
+            render(template, self.counter, request=request)
+        self.assertEqual(len(self.counter), 2)
+
+    def test_tags(self):
+        template = TEMPLATE.format('').replace('ttl=', 'tags="menus" ttl=')
+        render(template, self.counter)
+        cache.get_cache().namespace('fragment').invalidate('menus')
+        render(template, self.counter)
+        self.assertEqual(len(self.counter), 2)
+
+    def test_cached_function(self):
+        template = (
+            '<div><?dchp print(cached("value", lambda: str(len(counter) + 1)))'
+            ' ?></div>'
+        )
+        self.assertEqual(render(template, self.counter), '<div>1</div>')
+        self.counter.append(1)
+        self.assertEqual(render(template, self.counter), '<div>1</div>')
+
+    def test_unknown_vary(self):
+        self.assertRaises(
+            ValueError, render, TEMPLATE.format('weather'), self.counter
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
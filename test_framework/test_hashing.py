@@ -0,0 +1,66 @@
+import hashlib
+import threading
+import unittest
+
+from framework.errors import exceptions
+from framework.util import hashing
+
+__author__ = 'Justus Adam'
+
+
+ARGS = 'sha256', b'password', b'salt', 1000, 32
+
+
+def start(pool, **settings):
+    hashing.HashingPool.start.__wrapped__(pool, settings)
+
+
+class TestHashingPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = hashing.HashingPool()
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_inline(self):
+        start(self.pool, hashing_processes=0)
+        self.assertEqual(self.pool.pbkdf2(*ARGS), hashlib.pbkdf2_hmac(*ARGS))
+
+    def test_processes(self):
+        start(self.pool, hashing_processes=2, hashing_queue_limit=2)
+        self.assertEqual(self.pool.pbkdf2(*ARGS), hashlib.pbkdf2_hmac(*ARGS))
+
+    def test_queue_full(self):
+        start(self.pool, hashing_processes=1, hashing_queue_limit=0)
+        # hold the only slot
+        self.pool._slots.acquire()
+        self.assertRaises(exceptions.HashingQueueFull, self.pool.pbkdf2, *ARGS)
+        self.pool._slots.release()
+        self.assertEqual(self.pool.pbkdf2(*ARGS), hashlib.pbkdf2_hmac(*ARGS))
+
+    def test_timeout(self):
+        start(self.pool, hashing_processes=1, hashing_timeout=0)
+        self.assertRaises(
+            exceptions.HashingTimeout,
+            self.pool.pbkdf2, 'sha256', b'password', b'salt', 100000, 32
+        )
+
+    def test_slots_released(self):
+        start(self.pool, hashing_processes=1, hashing_queue_limit=1)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.pool.pbkdf2(*ARGS)))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [hashlib.pbkdf2_hmac(*ARGS)] * 2)
+        for _ in range(2):
+            # released by a done callback of the executor thread
+            self.assertTrue(self.pool._slots.acquire(timeout=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 """tests for stuff located in framework.utl.html"""
+import pickle
 import unittest
 from framework.util import html
 from framework.util.html import transform
@@ -207,6 +208,78 @@ class TestElementsRendering(unittest.TestCase):
         self.assertEqual(str(table), rendered)
 
 
+class TestRenderingEngine(unittest.TestCase):
+    def test_deep_tree(self):
+        depth = 5000
+        root = leaf = html.Div()
+        for _ in range(depth):
+            new = html.Div()
+            leaf.append(new)
+            leaf = new
+        leaf.append('leaf')
+        rendered = html.render(root)
+        self.assertEqual(rendered, '<div>' * (depth + 1) + 'leaf' + '</div>' * (depth + 1))
+
+    def test_legacy_render_content(self):
+        class Legacy(html.ContainerElement):
+            def render_content(self):
+                return 'custom'
+
+        element = html.Div(Legacy('ignored', html_type='p'), 'after')
+        self.assertEqual(str(element), '<div><p>custom</p>after</div>')
+
+    def test_list_interface(self):
+        element = html.Div('a', 'b')
+        element.append('c')
+        element += ['d']
+        element.insert(0, 'z')
+        self.assertEqual(len(element), 5)
+        self.assertEqual(element[0], 'z')
+        self.assertEqual(list(element[1:3]), ['a', 'b'])
+        self.assertIn('d', element)
+        self.assertEqual(str(element), '<div>zabcd</div>')
+
+    def test_slots(self):
+        for element in (html.Div(), html.A('a'), html.Input(), html.List()):
+            self.assertFalse(hasattr(element, '__dict__'))
+
+    def test_freeze(self):
+        element = html.A('link', href='/target', classes={'button'})
+        rendered = str(element)
+        self.assertIs(element.freeze(), element)
+        self.assertTrue(element.frozen)
+        self.assertEqual(str(element), rendered)
+        self.assertRaises(TypeError, setattr, element, 'classes', {'other'})
+        self.assertIsInstance(element.classes, frozenset)
+
+        listed = str(html.List(element, item_classes={'item'}))
+        self.assertEqual(listed, '<ul><li class="item">{}</li></ul>'.format(rendered))
+
+        copy = element.copy()
+        self.assertFalse(copy.frozen)
+        copy.classes = {'other'}
+        self.assertEqual(str(copy), '<a class="other" href="/target">link</a>')
+        self.assertEqual(str(element), rendered)
+
+    def test_pickle_frozen(self):
+        form = html.FormElement(
+            html.Input(name='username', required=True).freeze(),
+            html.A('link', href='/target', classes={'button'}).freeze(),
+            action='/login'
+        ).freeze()
+        rendered = str(form)
+
+        loaded = pickle.loads(pickle.dumps(form))
+        self.assertTrue(loaded.frozen)
+        self.assertTrue(loaded.submit.frozen)
+        self.assertEqual(str(loaded), rendered)
+        self.assertRaises(TypeError, setattr, loaded, 'classes', {'other'})
+        self.assertRaises(
+            TypeError, loaded.value_params.update, {'action': '/other'}
+        )
+        self.assertEqual(str(loaded.copy()), rendered)
+
+
 class TestTransform(unittest.TestCase):
     def test_to_html_head(self):
         for elements, result in (
@@ -221,3 +294,13 @@ class TestTransform(unittest.TestCase):
             rendered = transform.to_html_head(*elements)
 
             self.assertEqual(rendered, result)
+
+    def test_html_head(self):
+        for args in (
+            ('a', {'href': '/"x"', 'class': {'c1'}, 'id': None}, set()),
+            ('input', {'rows': 0, 'cols': 4}, {'required'}),
+            ('div', {}, ())
+        ):
+            self.assertEqual(
+                transform.html_head(*args), transform.to_html_head(*args)
+            )
@@ -0,0 +1,138 @@
+import time
+import unittest
+
+from framework import instrumentation, middleware
+from framework.http import request, response
+
+__author__ = 'Justus Adam'
+
+
+def make_request():
+    return request.Request.from_path_and_post(
+        'localhost', '/page', 'get', {}, False
+    )
+
+
+class TestSpans(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.discard()
+
+    def test_disabled(self):
+        req = make_request()
+        self.assertIsNone(instrumentation.begin(req, {}))
+        self.assertIsNone(req.trace)
+        self.assertIs(instrumentation.span('db'), instrumentation.null_span)
+        with instrumentation.span('db') as span:
+            self.assertIsNone(span.duration)
+
+    def test_nesting(self):
+        req = make_request()
+        trace = instrumentation.begin(req, {'instrumentation': True})
+        self.assertIs(req.trace, trace)
+        self.assertIs(instrumentation.current(), trace)
+
+        with instrumentation.span('outer'):
+            with instrumentation.span('db'):
+                pass
+            with instrumentation.span('db'):
+                time.sleep(0.001)
+
+        self.assertEqual([s.name for s in trace.spans], ['outer', 'db', 'db'])
+        self.assertEqual([s.depth for s in trace.spans], [0, 1, 1])
+        outer, first, second = trace.spans
+        self.assertGreaterEqual(outer.duration, first.duration + second.duration)
+
+        totals = trace.totals()
+        self.assertEqual(list(totals), ['outer', 'db'])
+        self.assertEqual(totals['db'][1], 2)
+
+    def test_timed(self):
+        @instrumentation.timed('work')
+        def work(a):
+            return a * 2
+
+        self.assertEqual(work(2), 4)
+        trace = instrumentation.begin(make_request(), {'instrumentation': True})
+        self.assertEqual(work(3), 6)
+        self.assertEqual([s.name for s in trace.spans], ['work'])
+
+    def test_server_timing(self):
+        req = make_request()
+        settings = {'instrumentation': True, 'server_timing': True}
+        trace = instrumentation.begin(req, settings)
+        with instrumentation.span('db'):
+            pass
+        with instrumentation.span('db'):
+            pass
+        with instrumentation.span('render'):
+            pass
+        resp = response.Response(body=b'', code=200)
+        instrumentation.finish(trace, req, resp, settings)
+
+        self.assertIsNone(instrumentation.current())
+        parts = resp.headers['Server-Timing'].value.split(', ')
+        self.assertEqual(
+            [part.split(';')[0] for part in parts], ['total', 'db', 'render']
+        )
+        self.assertTrue(parts[1].endswith(';desc="2x"'))
+
+    def test_middleware_spans(self):
+        class Answer(middleware.Handler):
+            def handle_request(self, request):
+                return 'answer'
+
+        trace = instrumentation.begin(make_request(), {'instrumentation': True})
+        hook = Answer()
+        hook.register_instance()
+        try:
+            res = instrumentation.return_call_hooks_with(
+                trace, middleware.Handler, 'mw.request',
+                lambda self, request: self.handle_request(request),
+                None
+            )
+        finally:
+            middleware.Handler.get_hooks().remove(hook)
+
+        self.assertEqual(res, 'answer')
+        names = [s.name for s in trace.spans]
+        self.assertEqual(names[0], 'mw.request')
+        self.assertEqual(names[-1], 'mw.request.test_instrumentation.Answer')
+        self.assertEqual(trace.route, 'test_instrumentation.Answer')
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets(self):
+        histogram = instrumentation.Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual(
+            histogram.cumulative(),
+            [(0.1, 2), (1.0, 3), (float('inf'), 4)]
+        )
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.75), 1.0)
+        self.assertIsNone(instrumentation.Histogram().quantile(0.5))
+
+    def test_route_statistics(self):
+        statistics = instrumentation.RouteStatistics(buckets=(1.0, ))
+        trace = instrumentation.Trace()
+        trace.route = 'module.controller'
+        with trace.span('db'):
+            pass
+        trace.finish()
+        statistics.trace_finished(None, None, trace)
+        statistics.trace_finished(None, None, trace)
+
+        self.assertEqual(statistics.routes(), ['module.controller'])
+        self.assertEqual(
+            statistics.histograms[('module.controller', 'total')].count, 2
+        )
+        self.assertEqual(
+            statistics.histograms[('module.controller', 'db')].count, 2
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
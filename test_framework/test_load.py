@@ -0,0 +1,131 @@
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+import unittest
+
+REPOSITORY = pathlib.Path(__file__).resolve().parent.parent
+
+if str(REPOSITORY) not in sys.path:
+    sys.path.insert(0, str(REPOSITORY))
+
+from benchmarks import load
+
+__author__ = 'Justus Adam'
+
+
+def sample(time, requests, rss=None, fds=None, **rows):
+    return load.Sample(time, requests, rss, fds, rows)
+
+
+def modules_importable():
+    # the modules of the demo app need a peewee version they support
+    return subprocess.call(
+        (sys.executable, '-c', 'import dycm.users.users'),
+        cwd=str(REPOSITORY),
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [str(REPOSITORY / 'dynamic_content')]
+            + os.environ.get('PYTHONPATH', '').split(os.pathsep)
+        )),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    ) == 0
+
+
+class TestParseMix(unittest.TestCase):
+    def test_weights(self):
+        self.assertEqual(load.parse_mix('GET /node/1=5, get /login'), (
+            load.RequestSpec('GET', '/node/1', None, 5),
+            load.RequestSpec('GET', '/login', None, 1)
+        ))
+
+    def test_post_body(self):
+        self.assertEqual(
+            load.parse_mix('POST /login?username=a&password=b=2'),
+            (load.RequestSpec(
+                'POST', '/login', 'username=a&password=b', 2
+            ),)
+        )
+
+    def test_query_of_get_stays_in_path(self):
+        # the last '=' separates the weight
+        spec, = load.parse_mix('GET /node?page=2=3')
+        self.assertEqual(spec.path, '/node?page=2')
+        self.assertIsNone(spec.body)
+        self.assertEqual(spec.weight, 3)
+
+    def test_empty(self):
+        self.assertRaises(ValueError, load.parse_mix, ' , ')
+
+
+class TestDetectGrowth(unittest.TestCase):
+    def test_slope(self):
+        self.assertEqual(load.slope([(0, 1), (1, 3), (2, 5)]), 2)
+        self.assertEqual(load.slope([(0, 1), (1, None), (2, 5)]), 2)
+        self.assertEqual(load.slope([(1, 1), (1, 5)]), 0.0)
+        self.assertEqual(load.slope([(1, 1)]), 0.0)
+
+    def test_steady(self):
+        samples = [
+            sample(i, i * 1000, 50 * 2 ** 20, 20, session=3, page=10)
+            for i in range(10)
+        ]
+        self.assertEqual(load.detect_growth(samples), [])
+
+    def test_growth(self):
+        samples = [
+            sample(i * 60, i * 1000, (50 + 2 * i) * 2 ** 20, 20 + 5 * i,
+                   session=3 + 100 * i, page=10)
+            for i in range(10)
+        ]
+        findings = load.detect_growth(samples)
+        self.assertEqual(len(findings), 3)
+        self.assertTrue(findings[0].startswith('RSS grows by 2.00 MiB/min'))
+        self.assertIn('file descriptors grow by 5.0', findings[1])
+        self.assertIn('table session grows by 100.0', findings[2])
+
+    def test_warmup_is_ignored(self):
+        # growth only while the caches fill up
+        samples = [
+            sample(i, i * 1000, fds=min(i, 2) * 50, page=10)
+            for i in range(10)
+        ]
+        self.assertEqual(load.detect_growth(samples, warmup=0.3), [])
+        self.assertTrue(load.detect_growth(samples, warmup=0))
+
+    def test_too_few_samples(self):
+        samples = [sample(i, i * 1000, fds=i * 100) for i in range(2)]
+        self.assertEqual(load.detect_growth(samples), [])
+
+
+@unittest.skipUnless(modules_importable(), 'dycm cannot be imported')
+class TestServerProcess(unittest.TestCase):
+    def test_serves_requests(self):
+        port = load.free_port()
+        server = load.ServerProcess(port)
+        statistics = load.Statistics()
+        stop = threading.Event()
+        try:
+            server.start()
+            thread = threading.Thread(
+                target=load.client,
+                args=('localhost', port,
+                      load.parse_mix('GET /login=1,GET /node/1=1'),
+                      statistics, stop)
+            )
+            thread.start()
+            stop.wait(2)
+            stop.set()
+            thread.join()
+            self.assertGreater(statistics.count, 0)
+            self.assertEqual(set(statistics.codes), {200})
+            self.assertFalse(statistics.errors)
+            # the server uses the database of the temporary project
+            self.assertGreater(server.rows().get('page', 0), 0)
+            if sys.platform.startswith('linux'):
+                self.assertGreater(server.rss(), 0)
+                self.assertGreater(server.fds(), 0)
+        finally:
+            stop.set()
+            server.stop()
@@ -0,0 +1,88 @@
+import importlib
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from framework.machinery import linker, manifest, scanner
+
+__author__ = 'Justus Adam'
+
+
+MODULE = '''
+manifest_test_symbol = 'linked'
+unrelated = 4
+'''
+
+
+@scanner.NameHook.make('manifest_test_symbol')
+class ManifestTestLink(linker.SimpleLink):
+    __slots__ = ()
+
+    def link_action(self):
+        pass
+
+    def unlink_action(self):
+        pass
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.directory.name)
+        package = root / 'manifest_test_pkg'
+        package.mkdir()
+        self.source = package / '__init__.py'
+        self.source.write_text(MODULE)
+        sys.path.insert(0, str(root))
+        self.module = importlib.import_module('manifest_test_pkg')
+        self.modules = (('manifest_test_pkg', self.module), )
+        self.path = root / 'manifest.json'
+
+    def tearDown(self):
+        sys.path.remove(self.directory.name)
+        del sys.modules['manifest_test_pkg']
+        self.directory.cleanup()
+
+    def scan(self, loaded):
+        instance = scanner.Scanner()
+        instance.scan(self.modules, loaded, 'key')
+        return instance.linker['manifest_test_pkg']
+
+    def test_cold_and_warm(self):
+        links = self.scan(manifest.Manifest.load(self.path))
+        self.assertEqual(len(links), 1)
+        self.assertIsInstance(next(iter(links)), ManifestTestLink)
+
+        loaded = manifest.Manifest.load(self.path)
+        self.assertEqual(loaded.symbols('manifest_test_pkg'), ['manifest_test_symbol'])
+        self.assertTrue(loaded.matches('key', self.modules))
+        self.assertFalse(loaded.matches('other settings', self.modules))
+
+        links = self.scan(loaded)
+        self.assertEqual(len(links), 1)
+        self.assertEqual(next(iter(links)).variable, 'linked')
+
+    def test_changed_source(self):
+        self.scan(manifest.Manifest.load(self.path))
+        loaded = manifest.Manifest.load(self.path)
+
+        # same content with a new modification time is still valid
+        stat = self.source.stat()
+        os.utime(str(self.source), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertTrue(loaded.matches('key', self.modules))
+
+        self.source.write_text(MODULE + 'another = 5\n')
+        self.assertFalse(loaded.matches('key', self.modules))
+
+        (self.source.parent / 'added.py').write_text('')
+        self.assertFalse(loaded.matches('key', self.modules))
+
+    def test_broken_file(self):
+        self.path.write_text('{not json')
+        self.assertEqual(manifest.Manifest.load(self.path).entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
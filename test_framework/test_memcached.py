@@ -0,0 +1,126 @@
+import socket
+import unittest
+
+from framework import cache
+from framework.cache import memcached, standin
+
+__author__ = 'Justus Adam'
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def start_server(clock):
+    server = standin.Server(('localhost', 0), standin.Store(clock))
+    server.start()
+    return server
+
+
+class TestMemcachedBackend(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.servers = [start_server(self.clock) for _ in range(2)]
+        self.backend = cache.MemcachedBackend(
+            [server.address for server in self.servers], pool_size=2
+        )
+
+    def tearDown(self):
+        self.backend.close()
+        for server in self.servers:
+            server.stop()
+
+    def test_get_set_delete(self):
+        self.assertIsNone(self.backend.get('a'))
+        self.assertTrue(self.backend.set('a', b'value\r\nwith break'))
+        self.assertEqual(self.backend.get('a'), b'value\r\nwith break')
+        self.backend.delete('a')
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_ttl(self):
+        self.backend.set('a', b'value', 10)
+        self.clock.now += 9
+        self.assertEqual(self.backend.get('a'), b'value')
+        self.clock.now += 1
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_get_many(self):
+        keys = ['key{}'.format(i) for i in range(50)]
+        for key in keys:
+            self.backend.set(key, key.encode())
+        self.assertEqual(
+            self.backend.get_many(keys + ['missing']),
+            {key: key.encode() for key in keys}
+        )
+        # distributed over both servers
+        for server in self.servers:
+            self.assertTrue(server.store._entries)
+
+    def test_clear(self):
+        self.backend.set('a', b'1')
+        self.backend.clear()
+        self.assertIsNone(self.backend.get('a'))
+
+    def test_cache(self):
+        tagged = cache.Cache(self.backend)
+        tagged.set('a', {'value': 1}, tags=('t', ))
+        self.assertEqual(tagged.get('a'), {'value': 1})
+        tagged.invalidate('t')
+        self.assertIsNone(tagged.get('a'))
+
+    def test_unreachable(self):
+        sock = socket.socket()
+        sock.bind(('localhost', 0))
+        address = 'localhost:{}'.format(sock.getsockname()[1])
+        sock.close()
+        backend = cache.MemcachedBackend([address], timeout=0.5)
+        self.assertIsNone(backend.get('a'))
+        self.assertFalse(backend.set('a', b'1'))
+        self.assertEqual(backend.get_many(['a', 'b']), {})
+
+
+class TestHashRing(unittest.TestCase):
+    def test_consistent(self):
+        keys = ['key{}'.format(i) for i in range(1000)]
+        three = memcached.HashRing(('a', 'b', 'c'))
+        two = memcached.HashRing(('a', 'b'))
+        moved = [key for key in keys if three.node(key) != two.node(key)]
+        self.assertTrue(all(three.node(key) == 'c' for key in moved))
+        share = sum(1 for key in keys if three.node(key) == 'c') / len(keys)
+        self.assertTrue(0.2 < share < 0.5, share)
+
+
+class TestStandin(unittest.TestCase):
+    def setUp(self):
+        self.server = start_server(Clock())
+        self.connection = memcached.Connection(
+            memcached.parse_address(self.server.address), 1
+        )
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.stop()
+
+    def command(self, line):
+        self.connection.send(line)
+        return self.connection.readline()
+
+    def test_commands(self):
+        self.assertEqual(self.command(b'add a 5 0 1\r\n1\r\n'), b'STORED')
+        self.assertEqual(self.command(b'add a 0 0 1\r\n2\r\n'), b'NOT_STORED')
+        self.assertEqual(self.command(b'incr a 41\r\n'), b'42')
+        self.assertEqual(self.command(b'append a 0 0 1\r\nx\r\n'), b'STORED')
+        self.assertEqual(self.command(b'get a\r\n'), b'VALUE a 5 3')
+        self.assertEqual(self.connection.read(3), b'42x')
+        self.assertEqual(self.connection.readline(), b'END')
+        self.assertEqual(self.command(b'replace b 0 0 1\r\n1\r\n'), b'NOT_STORED')
+        self.assertEqual(self.command(b'version\r\n'), b'VERSION ' + standin.VERSION)
+        self.assertEqual(self.command(b'bogus\r\n'), b'ERROR')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import functools
+import unittest
+
+from framework import instrumentation, metrics
+from framework.http import request, response
+
+__author__ = 'Justus Adam'
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter(self):
+        counter = self.registry.counter(
+            'requests_total', 'Requests.', ('route', 'code')
+        )
+        counter.labels('a', 200).inc()
+        counter.labels('a', 200).inc(2)
+        counter.labels('b"\n', 404).inc()
+        self.assertIs(
+            self.registry.counter('requests_total', 'Requests.'), counter
+        )
+        self.assertRaises(ValueError, counter.labels, 'a')
+        self.assertRaises(ValueError, counter.inc)
+        self.assertEqual(self.registry.render(), '\n'.join((
+            '# HELP requests_total Requests.',
+            '# TYPE requests_total counter',
+            'requests_total{route="a",code="200"} 3',
+            'requests_total{route="b\\"\\n",code="404"} 1',
+        )) + '\n')
+
+    def test_gauge(self):
+        gauge = self.registry.gauge('in_progress', 'Running.')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        self.assertIn('in_progress 1\n', self.registry.render())
+        gauge.set_function(lambda: 7)
+        self.assertIn('in_progress 7\n', self.registry.render())
+        self.assertRaises(
+            TypeError, self.registry.counter, 'in_progress', 'Running.'
+        )
+
+    def test_histogram(self):
+        histogram = self.registry.histogram(
+            'latency_seconds', 'Latency.', buckets=(0.1, 1)
+        )
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        self.assertEqual(histogram.render()[2:], [
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1"} 2',
+            'latency_seconds_bucket{le="+Inf"} 2',
+            'latency_seconds_sum 0.55',
+            'latency_seconds_count 2',
+        ])
+
+    def test_lru_cache(self):
+        @functools.lru_cache()
+        def square(a):
+            return a * a
+
+        metrics.register_lru_cache('test.square', square)
+        square(2)
+        square(2)
+        square(3)
+        text = metrics.get_registry().render()
+        self.assertIn(
+            'dc_cache_requests_total{cache="test.square",result="hit"} 1', text
+        )
+        self.assertIn(
+            'dc_cache_requests_total{cache="test.square",result="miss"} 2', text
+        )
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def test_trace(self):
+        req = request.Request.from_path_and_post(
+            'localhost', '/page', 'get', {}, False
+        )
+        settings = {'metrics': True}
+        in_progress = metrics.requests_in_progress.labels().get()
+        trace = instrumentation.begin(req, settings)
+        self.assertEqual(
+            metrics.requests_in_progress.labels().get(), in_progress + 1
+        )
+        trace.route = 'test_metrics.page'
+        for _ in range(3):
+            with instrumentation.span('db'):
+                pass
+        instrumentation.finish(
+            trace, req, response.Response(body=b'', code=200), settings
+        )
+
+        self.assertEqual(
+            metrics.requests_in_progress.labels().get(), in_progress
+        )
+        self.assertEqual(
+            metrics.requests_total.labels(
+                'test_metrics.page', 'get', 200
+            ).get(), 1
+        )
+        queries = metrics.db_queries.labels('test_metrics.page')
+        self.assertEqual((queries.count, queries.sum), (1, 3))
+        self.assertIn(
+            'dc_http_request_duration_seconds_count'
+            '{route="test_metrics.page"} 1',
+            metrics.get_registry().render()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+from framework.backend import orm, migrations
+
+__author__ = 'Justus Adam'
+
+
+class Article(orm.BaseModel):
+    section = orm.CharField()
+    slug = orm.CharField()
+    body = orm.TextField()
+
+
+_module = 'test_migrations'
+
+
+class TestIndexes(unittest.TestCase):
+    def setUp(self):
+        orm.database_proxy.create_tables([Article], safe=True)
+        migrations.index(Article, 'section', 'slug')
+
+    def tearDown(self):
+        migrations._indexes.pop(Article, None)
+        orm.database_proxy.drop_tables([Article], safe=True)
+
+    def test_unknown_field(self):
+        self.assertRaises(ValueError, migrations.index, Article, 'title')
+
+    def test_create(self):
+        self.assertEqual(len(migrations.missing_indexes(Article)), 1)
+        self.assertEqual(
+            migrations.create_indexes([Article]), ['article_section_slug']
+        )
+        self.assertEqual(migrations.missing_indexes(Article), [])
+        self.assertEqual(migrations.create_indexes([Article]), [])
+
+    def test_covered_by_longer_index(self):
+        migrations.index(Article, 'section')
+        self.assertEqual(len(migrations.missing_indexes(Article)), 2)
+        migrations.create_indexes([Article])
+        self.assertEqual(migrations.missing_indexes(Article), [])
+
+    def test_check(self):
+        query = Article.select().where(
+            Article.section == 'a', Article.slug == 'b'
+        )
+        self.assertEqual(len(migrations.full_scans(query)), 1)
+        migrations.create_indexes([Article])
+        self.assertEqual(migrations.full_scans(query), [])
+
+        migrations.hot_query('articles by body')(
+            lambda: Article.select().where(Article.body == 'x')
+        )
+        try:
+            report = migrations.check()
+            self.assertIn('articles by body', report)
+        finally:
+            del migrations._hot_queries['articles by body']
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        migrations.ensure_table()
+        self.calls = []
+
+    def tearDown(self):
+        for key in tuple(migrations._migrations):
+            if key[0] == _module:
+                del migrations._migrations[key]
+        migrations.AppliedMigration.delete().where(
+            migrations.AppliedMigration.module == _module
+        ).execute()
+        orm.database_proxy.drop_tables([Article], safe=True)
+
+    def register(self, version, function=None):
+        def migration(database):
+            self.calls.append(version)
+            if function is not None:
+                function(database)
+        migrations.migration(_module, version)(migration)
+
+    def test_order_and_record(self):
+        self.register(2)
+        self.register(1)
+        applied = migrations.migrate()
+        self.assertEqual([a.version for a in applied], [1, 2])
+        self.assertEqual(self.calls, [1, 2])
+        self.assertEqual(migrations.migrate(), [])
+        self.register(3)
+        migrations.migrate()
+        self.assertEqual(self.calls, [1, 2, 3])
+
+    def test_duplicate(self):
+        self.register(1)
+        self.assertRaises(migrations.MigrationError, self.register, 1)
+
+    def test_failure_rolls_back(self):
+        orm.database_proxy.create_tables([Article])
+
+        def insert_and_fail(database):
+            Article.create(section='a', slug='b', body='c')
+            raise RuntimeError('broken')
+
+        self.register(1, insert_and_fail)
+        self.assertRaises(migrations.MigrationError, migrations.migrate)
+        self.assertNotIn((_module, 1), migrations.applied())
+        self.assertEqual(Article.select().count(), 0)
+
+    def test_mark_applied(self):
+        self.register(1)
+        self.assertEqual(len(migrations.mark_applied()), 1)
+        self.assertEqual(migrations.migrate(), [])
+        self.assertEqual(self.calls, [])
+
+    def test_mark_applied_for_modules(self):
+        self.register(1)
+        self.assertEqual(migrations.mark_applied({'other'}), [])
+        self.assertEqual(len(migrations.migrate()), 1)
+        self.assertEqual(self.calls, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import unittest
+
+from framework.errors import exceptions
+from framework.http import multipart
+
+__author__ = 'Justus Adam'
+
+
+boundary = 'testboundary1234'
+
+body = (
+    b'preamble\r\n'
+    b'--testboundary1234\r\n'
+    b'Content-Disposition: form-data; name="name"\r\n'
+    b'\r\n'
+    b'image.png\r\n'
+    b'--testboundary1234\r\n'
+    b'Content-Disposition: form-data; name="file"; filename="a \\"b\\".png"\r\n'
+    b'Content-Type: image/png\r\n'
+    b'\r\n'
+    b'\x89PNG\r\n\x1a\n\x00\xff\r\n--not-the-boundary\r\n'
+    b'--testboundary1234--\r\n'
+)
+
+file_content = b'\x89PNG\r\n\x1a\n\x00\xff\r\n--not-the-boundary'
+
+
+class TestMultipartParser(unittest.TestCase):
+    def check(self, form, files):
+        self.assertEqual(form, {'name': ['image.png']})
+        self.assertEqual(len(files['file']), 1)
+        upload = files['file'][0]
+        self.assertEqual(upload.filename, 'a "b".png')
+        self.assertEqual(upload.content_type, 'image/png')
+        self.assertEqual(upload.size, len(file_content))
+        self.assertEqual(upload.read(), file_content)
+        upload.close()
+
+    def test_single_chunk(self):
+        parser = multipart.MultipartParser(boundary)
+        parser.feed(body)
+        self.check(*parser.close())
+
+    def test_every_chunk_size(self):
+        for size in range(1, 40):
+            parser = multipart.MultipartParser(boundary)
+            for i in range(0, len(body), size):
+                parser.feed(body[i:i + size])
+            self.check(*parser.close())
+
+    def test_spooling(self):
+        parser = multipart.MultipartParser(boundary, spool_size=4)
+        parser.feed(body)
+        form, files = parser.close()
+        self.assertTrue(files['file'][0].file._rolled)
+        self.check(form, files)
+
+    def test_incomplete(self):
+        parser = multipart.MultipartParser(boundary)
+        parser.feed(body[:-30])
+        self.assertRaises(ValueError, parser.close)
+
+    def test_field_limit(self):
+        parser = multipart.MultipartParser(boundary, max_field_size=4)
+        self.assertRaises(
+            exceptions.RequestBodyTooLarge, parser.feed, body
+        )
+
+    def test_parse_body(self):
+        form, files, payload = multipart.parse_body(
+            io.BytesIO(body),
+            'multipart/form-data; boundary="{}"'.format(boundary),
+            str(len(body))
+        )
+        self.assertIsNone(payload)
+        self.check(form, files)
+
+    def test_parse_urlencoded(self):
+        raw = b'a=1&b=2&a=3'
+        form, files, payload = multipart.parse_body(
+            io.BytesIO(raw),
+            'application/x-www-form-urlencoded',
+            len(raw)
+        )
+        self.assertEqual(form, {'a': ['1', '3'], 'b': ['2']})
+        self.assertEqual(files, {})
+        self.assertEqual(payload, raw.decode())
+
+    def test_body_limit(self):
+        self.assertRaises(
+            exceptions.RequestBodyTooLarge,
+            multipart.parse_body,
+            io.BytesIO(b''),
+            'multipart/form-data; boundary=x',
+            1024 ** 4
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import threading
+import unittest
+
+from framework import http, cache
+from framework.http import coalesce
+from framework.middleware import pagecache
+from framework.util import stale
+
+__author__ = 'Justus Adam'
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.pages = pagecache.PageCache()
+        self.pages.cache = stale.StaleCache(
+            'page', 10, 20, cache.Cache(cache.MemoryBackend()), self.clock
+        )
+        self.processed = []
+        self.pages.pipeline = self.pipeline
+        coalesce.reset()
+
+    def tearDown(self):
+        coalesce.reset()
+
+    def pipeline(self, request):
+        coalesce.reset()
+        self.processed.append(request.path)
+        self.pages.store(request, http.response.Response(b'new'))
+
+    @staticmethod
+    def request(headers=None, path='/page'):
+        return http.Request('localhost', 8080, path, 'get', {}, headers, False, None)
+
+    def test_lookup_and_store(self):
+        self.assertIsNone(self.pages.lookup(self.request()))
+        self.pages.store(self.request(), http.response.Response(b'old'))
+        self.assertEqual(self.pages.lookup(self.request()).body, b'old')
+        self.assertIsNone(self.pages.lookup(self.request(path='/other')))
+        self.assertIsNone(self.pages.lookup(self.request({'Cookie': 'SESS=a'})))
+
+    def test_refresh(self):
+        self.pages.store(self.request(), http.response.Response(b'old'))
+        self.clock.now = 15
+        self.assertEqual(self.pages.lookup(self.request()).body, b'old')
+        self.pages.refresher.join()
+        self.assertEqual(self.processed, ['/page'])
+        self.assertEqual(self.pages.lookup(self.request()).body, b'new')
+
+        self.clock.now = 100
+        self.assertIsNone(self.pages.lookup(self.request()))
+
+    def test_not_stored(self):
+        self.pages.store(self.request(), http.response.Response(b'', code=404))
+        self.pages.store(
+            self.request(), http.response.Response(b'', cookies={'SESS': 'a'})
+        )
+        self.pages.store(
+            self.request({'Cookie': 'SESS=a'}), http.response.Response(b'')
+        )
+        self.assertIsNone(self.pages.lookup(self.request()))
+
+    def test_private_not_stored(self):
+        # e.g. a page with the login form and its single use csrf token
+        coalesce.mark_private()
+        self.pages.store(self.request(), http.response.Response(b'token'))
+        self.assertIsNone(self.pages.lookup(self.request()))
+
+        coalesce.reset()
+        self.pages.store(self.request(), http.response.Response(b'public'))
+        self.assertEqual(self.pages.lookup(self.request()).body, b'public')
+
+    def test_private_is_per_thread(self):
+        thread = threading.Thread(target=coalesce.mark_private)
+        thread.start()
+        thread.join()
+        self.assertTrue(coalesce.shareable(http.response.Response(b'')))
+
+
+if __name__ == '__main__':
+    unittest.main()
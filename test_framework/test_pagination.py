@@ -0,0 +1,136 @@
+import datetime
+import unittest
+from urllib import parse
+
+from framework.backend import orm
+from framework.util import pagination
+
+__author__ = 'Justus Adam'
+
+
+class Entry(orm.BaseModel):
+    date_created = orm.DateField()
+
+
+class Event(orm.BaseModel):
+    date_created = orm.DateTimeField()
+
+
+def query(url):
+    return parse.parse_qs(parse.urlsplit(url).query)
+
+
+class TestCursor(unittest.TestCase):
+    def test_roundtrip(self):
+        values = [
+            datetime.date(2015, 3, 1),
+            datetime.datetime(2015, 3, 1, 12, 30, 5, 10),
+            42,
+            'text'
+        ]
+        self.assertEqual(
+            pagination.decode_cursor(pagination.encode_cursor(values)), values
+        )
+
+    def test_invalid(self):
+        for cursor in ('', '!!', pagination.encode_cursor([['X', 'a']])):
+            self.assertRaises(
+                pagination.InvalidCursor, pagination.decode_cursor, cursor
+            )
+
+
+class TestKeyset(unittest.TestCase):
+    fields = (Entry.date_created, Entry.oid)
+
+    @classmethod
+    def setUpClass(cls):
+        orm.database_proxy.create_tables([Entry], safe=True)
+        start = datetime.date(2015, 1, 1)
+        # three entries per day, ties are broken by oid
+        for i in range(11):
+            Entry.create(date_created=start + datetime.timedelta(days=i // 3))
+        cls.expected = [
+            a.oid for a in Entry.select().order_by(
+                Entry.date_created.desc(), Entry.oid.desc()
+            )
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        orm.database_proxy.drop_tables([Entry])
+
+    def page(self, get=None):
+        return pagination.keyset(Entry.select(), self.fields, 4, get)
+
+    def test_forward_and_back(self):
+        page = self.page()
+        self.assertIsNone(page.next_cursor)
+        pages = [[a.oid for a in page]]
+        self.assertIsNone(page.prev_url('/entries'))
+        while page.next_url('/entries') is not None:
+            page = self.page(query(page.next_url('/entries')))
+            pages.append([a.oid for a in page])
+        self.assertEqual([len(a) for a in pages], [4, 4, 3])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        back = []
+        while page.prev_url('/entries') is not None:
+            page = self.page(query(page.prev_url('/entries')))
+            back.append([a.oid for a in page])
+        self.assertEqual(back, pages[-2::-1])
+
+    def test_invalid_cursor_gives_first_page(self):
+        with self.assertLogs(pagination.__name__, 'WARNING'):
+            page = self.page({'after': ['garbage']})
+        self.assertEqual([a.oid for a in page], self.expected[:4])
+
+
+class TestDatetimeKeyset(unittest.TestCase):
+    """
+    Cursors keep the time, rows of the same day are neither skipped
+     nor repeated
+    """
+    fields = (Event.date_created, Event.oid)
+
+    @classmethod
+    def setUpClass(cls):
+        orm.database_proxy.create_tables([Event], safe=True)
+        start = datetime.datetime(2015, 1, 1, 9, 30)
+        for i in range(10):
+            # two entries per time, all of them on two days
+            Event.create(
+                date_created=start + datetime.timedelta(
+                    days=i // 5, hours=i // 2 % 3, microseconds=i // 2 * 10
+                )
+            )
+        cls.expected = [
+            a.oid for a in Event.select().order_by(
+                Event.date_created.desc(), Event.oid.desc()
+            )
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        orm.database_proxy.drop_tables([Event])
+
+    def page(self, get=None):
+        return pagination.keyset(Event.select(), self.fields, 3, get)
+
+    def test_forward_and_back(self):
+        page = self.page()
+        pages = [[a.oid for a in page]]
+        while page.next_url('/events') is not None:
+            page = self.page(query(page.next_url('/events')))
+            pages.append([a.oid for a in page])
+        self.assertEqual([len(a) for a in pages], [3, 3, 3, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        back = []
+        while page.prev_url('/events') is not None:
+            page = self.page(query(page.prev_url('/events')))
+            back.append([a.oid for a in page])
+        self.assertEqual(back, pages[-2::-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
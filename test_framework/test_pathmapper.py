@@ -110,3 +110,33 @@ class TestMapper(unittest.TestCase):
                 self.assertIs(
                     mapper.resolve(request3)[0].function, function
                 )
+
+    def test_remove_handlers(self):
+        method = 'get'
+
+        def request(path):
+            return http.Request('localhost', 8080, path, method, None, None, False, None)
+
+        for mapper in (self.mt_mapper, self.t_mapper):
+            handlers = []
+            for path, function, teststring, result, typeargs in self.testpaths1:
+                handler = ControlFunction(function, path, method, False, None)
+                handler.typeargs = typeargs
+                mapper.add_path(path, handler)
+                handlers.append((handler, teststring))
+
+            removed, removed_path = handlers[2]
+            mapper.remove_handlers(lambda h: h is removed)
+            for handler, teststring in handlers:
+                if handler is removed:
+                    self.assertRaises(ControllerError, mapper.find_handler, request(teststring))
+                else:
+                    self.assertIs(mapper.find_handler(request(teststring))[0], handler)
+
+            # the path can be registered again after removal
+            mapper.add_path(self.testpaths1[2][0], removed)
+            self.assertIs(mapper.find_handler(request(removed_path))[0], removed)
+
+            mapper.remove_handlers(lambda h: True)
+            self.assertEqual(len(mapper), 0)
+            self.assertIsNone(mapper.wildcard)
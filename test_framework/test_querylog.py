@@ -0,0 +1,91 @@
+import unittest
+
+from framework import instrumentation
+from framework.backend import orm, querylog
+from framework.http import request, response
+from framework.middleware import debug
+
+__author__ = 'Justus Adam'
+
+
+def make_request():
+    return request.Request.from_path_and_post(
+        'localhost', '/page', 'get', {}, False
+    )
+
+
+class TestShape(unittest.TestCase):
+    def test_sql_shape(self):
+        for sql, shape in (
+            ('SELECT * FROM "user" WHERE "oid" = 12',
+             'SELECT * FROM "user" WHERE "oid" = ?'),
+            ("SELECT  *\n FROM t1 WHERE name = 'it''s'",
+             'SELECT * FROM t1 WHERE name = ?'),
+            ('SELECT * FROM t WHERE id IN (?, ?, ?)',
+             'SELECT * FROM t WHERE id IN (?...)'),
+            ('SELECT * FROM t WHERE id IN (%s,%s)',
+             'SELECT * FROM t WHERE id IN (?...)'),
+        ):
+            self.assertEqual(querylog.sql_shape(sql), shape)
+
+    def test_suspects(self):
+        log = querylog.QueryLog(threshold=3)
+        for i in range(4):
+            log.record('SELECT * FROM t WHERE id = {}'.format(i), 0.001, 'a')
+        log.record('SELECT * FROM other', 0.002, 'b')
+        self.assertEqual(log.count, 5)
+        self.assertAlmostEqual(log.duration, 0.006)
+        suspects = log.suspects()
+        self.assertEqual(len(suspects), 1)
+        shape, queries = suspects[0]
+        self.assertEqual(shape, 'SELECT * FROM t WHERE id = ?')
+        self.assertEqual(len(queries), 4)
+        with self.assertLogs(querylog.__name__, 'WARNING'):
+            log.report('route')
+
+
+class TestAccounting(unittest.TestCase):
+    settings = {'query_accounting': True, 'n_plus_one_threshold': 2}
+
+    def tearDown(self):
+        instrumentation.discard()
+
+    def test_record(self):
+        req = make_request()
+        trace = instrumentation.begin(req, self.settings)
+        querylog.QueryAccounting.trace_started.__wrapped__(
+            querylog.QueryAccounting(), self.settings, req, trace
+        )
+        log = querylog.current()
+        self.assertIsNotNone(log)
+
+        for i in range(3):
+            orm.database_proxy.execute_sql('SELECT {}'.format(i))
+
+        self.assertEqual(log.count, 3)
+        self.assertEqual(len(log.suspects()), 1)
+        self.assertIn('test_querylog.py:', log.queries[0].site)
+        self.assertTrue(log.queries[0].site.endswith('in test_record'))
+        self.assertEqual(trace.totals()['db'][1], 3)
+
+        resp = response.Response(
+            body=b'<html><body><p>page</p></body></html>', code=200
+        )
+        debug.Toolbar().handle_response(req, resp)
+        self.assertIn(b'id="dc-debug-toolbar"', resp.body)
+        self.assertIn(b'SELECT ?', resp.body)
+        self.assertTrue(resp.body.endswith(b'</body></html>'))
+
+        querylog.QueryAccounting().trace_finished(req, resp, trace)
+        self.assertIsNone(querylog.current())
+
+    def test_disabled(self):
+        orm.database_proxy.execute_sql('SELECT 1')
+        self.assertIsNone(querylog.current())
+        resp = response.Response(body=b'<body></body>', code=200)
+        debug.Toolbar().handle_response(make_request(), resp)
+        self.assertEqual(resp.body, b'<body></body>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from framework import http, hooks
+from framework.application import reloader
+from framework.errors import exceptions
+from framework.includes import SettingsDict
+from framework.machinery import component
+
+__author__ = 'Justus Adam'
+
+
+SOURCE = '''
+from framework import route, http
+from framework.machinery import component
+
+
+VERSION = {!r}
+
+
+@route.controller_function(
+    'reload_test_page', method=http.RequestMethods.GET, query=False
+)
+def page():
+    return VERSION
+
+
+@component.Component('ReloadTestComponent')
+class Thing(object):
+    pass
+'''
+
+unloaded = []
+
+
+@hooks.register()
+class RecordUnload(reloader.UnloadHook):
+    __slots__ = ()
+
+    def unload(self, package):
+        unloaded.append(package)
+
+
+def resolve(path):
+    pathmap = component.get_component('PathMap').get()
+    request = http.Request('localhost', 8080, path, 'get', {}, None, False, None)
+    handler, args, kwargs = pathmap.resolve(request)
+    return handler(*args, **kwargs)
+
+
+class TestReloader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = pathlib.Path(self.directory.name) / 'reload_test_pkg' / '__init__.py'
+        self.source.parent.mkdir()
+        self.source.write_text(SOURCE.format('first'))
+        sys.path.insert(0, self.directory.name)
+        self.dont_write_bytecode = sys.dont_write_bytecode
+        sys.dont_write_bytecode = True
+
+    def tearDown(self):
+        if 'reload_test_pkg' in sys.modules:
+            reloader.unload('reload_test_pkg')
+        sys.dont_write_bytecode = self.dont_write_bytecode
+        sys.path.remove(self.directory.name)
+        self.directory.cleanup()
+
+    def test_reload(self):
+        reloader.load('reload_test_pkg')
+        self.assertEqual(resolve('/reload_test_page'), 'first')
+        first = component.get_component('ReloadTestComponent').get()
+
+        self.source.write_text(SOURCE.format('second version'))
+        reloader.reload('reload_test_pkg')
+        self.assertIn('reload_test_pkg', unloaded)
+        self.assertEqual(resolve('/reload_test_page'), 'second version')
+        second = component.get_component('ReloadTestComponent').get()
+        self.assertIsNot(type(first), type(second))
+
+        reloader.unload('reload_test_pkg')
+        self.assertNotIn('reload_test_pkg', sys.modules)
+        self.assertRaises(exceptions.ControllerError, resolve, '/reload_test_page')
+        self.assertRaises(
+            exceptions.ComponentNotLoaded,
+            component.get_component('ReloadTestComponent').get
+        )
+
+
+class TestKnownModules(unittest.TestCase):
+    def setUp(self):
+        self.settings = component.get_component(SettingsDict).get()
+        self.modules = self.settings.get('modules', [])
+        self.settings['modules'] = ['node']
+
+    def tearDown(self):
+        self.settings['modules'] = self.modules
+
+    def test_configured(self):
+        self.assertTrue(reloader.is_configured('node'))
+        for name in ('framework', 'os', 'users'):
+            self.assertFalse(reloader.is_configured(name))
+
+    def test_available(self):
+        self.assertTrue(reloader.is_available('users'))
+        for name in ('framework', 'os', 'node.model', '..'):
+            self.assertFalse(reloader.is_available(name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from framework.backend import orm, replicas
+from framework.http import request, response
+
+__author__ = 'Justus Adam'
+
+
+def make_request(method='get', headers=None):
+    return request.Request.from_path_and_post(
+        'localhost', '/page', method, headers or {}, False
+    )
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRouting(unittest.TestCase):
+    """
+    SQLite files stand in for the primary and two replicas,
+     each holding a single row naming it
+    """
+    names = ('primary', 'replica1', 'replica2')
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in self.names:
+            db = orm.SqliteDatabase(self.path(name))
+            db.execute_sql('CREATE TABLE item (name TEXT)')
+            db.execute_sql('INSERT INTO item VALUES (?)', (name, ))
+            db.close()
+        self.clock = Clock()
+        self.replica_set = replicas.ReplicaSet(
+            [
+                replicas.Replica(
+                    name, orm.InstrumentedSqliteDatabase(self.path(name))
+                )
+                for name in self.names[1:]
+            ],
+            retry_interval=5,
+            clock=self.clock
+        )
+        self.db = orm.RoutedSqliteDatabase(
+            self.path('primary'), replicas=self.replica_set
+        )
+        replicas.reset()
+
+    def tearDown(self):
+        replicas.reset()
+        for db in (self.db, ) + tuple(
+            a.database for a in self.replica_set.replicas
+        ):
+            # peewee 2 fails closing databases never connected
+            if not db.is_closed():
+                db.close()
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name + '.db')
+
+    def read(self):
+        return self.db.execute_sql('SELECT name FROM item').fetchone()[0]
+
+    def test_is_read(self):
+        self.assertTrue(replicas.is_read('  select * from item'))
+        self.assertFalse(replicas.is_read('SELECT * FROM item FOR UPDATE'))
+        self.assertFalse(replicas.is_read('UPDATE item SET name = 1'))
+
+    def test_round_robin(self):
+        self.assertEqual(
+            [self.read() for _ in range(4)],
+            ['replica1', 'replica2', 'replica1', 'replica2']
+        )
+
+    def test_write_pins_to_primary(self):
+        self.db.execute_sql("UPDATE item SET name = 'written'")
+        self.assertTrue(replicas.pinned())
+        self.assertEqual(self.read(), 'written')
+
+    def test_get_write_does_not_pin_client(self):
+        # e.g. the csrf token of the login form rendered on every page
+        with replicas.Scope(make_request(), 5) as scope:
+            self.db.execute_sql("UPDATE item SET name = 'token'")
+            self.assertEqual(self.read(), 'token')
+            res = scope.stamp(response.Response('body'))
+        self.assertNotIn('Set-Cookie', res.headers)
+        self.assertNotIn(replicas.PIN_COOKIE, res.cookies)
+
+        with replicas.Scope(make_request('post'), 5) as scope:
+            self.db.execute_sql("UPDATE item SET name = 'posted'")
+            res = scope.stamp(response.Response('body'))
+        self.assertIn(replicas.PIN_COOKIE, res.headers['Set-Cookie'].value)
+
+    def test_transaction_reads_primary(self):
+        with self.db.atomic():
+            self.assertEqual(self.read(), 'primary')
+
+    def test_failover(self):
+        broken = replicas.Replica(
+            'broken',
+            orm.InstrumentedSqliteDatabase(
+                os.path.join(self.directory, 'missing', 'broken.db')
+            )
+        )
+        self.replica_set = self.db.replicas = replicas.ReplicaSet(
+            [broken, self.replica_set.replicas[1]], 5, self.clock
+        )
+        with self.assertLogs(replicas.__name__, 'WARNING'):
+            self.assertEqual(self.read(), 'replica2')
+        self.assertFalse(broken.healthy(self.clock()))
+        self.assertEqual([self.read() for _ in range(2)], ['replica2'] * 2)
+        self.clock.now = 5
+        self.assertTrue(broken.healthy(self.clock()))
+
+        self.replica_set.replicas[1].down_until = 10
+        with self.assertLogs(replicas.__name__, 'WARNING'):
+            self.assertEqual(self.read(), 'primary')
+
+    def test_query_errors_are_raised(self):
+        self.assertRaises(
+            orm.OperationalError,
+            self.db.execute_sql, 'SELECT * FROM missing_table'
+        )
+        for replica in self.replica_set.replicas:
+            self.assertTrue(replica.healthy(self.clock()))
+
+
+class TestScope(unittest.TestCase):
+    def test_post_pins(self):
+        with replicas.Scope(make_request('post')):
+            self.assertTrue(replicas.pinned())
+        self.assertFalse(replicas.pinned())
+        with replicas.Scope(make_request()):
+            self.assertFalse(replicas.pinned())
+
+    def test_cookie_pins(self):
+        req = make_request(headers={'Cookie': replicas.PIN_COOKIE + '=1'})
+        with replicas.Scope(req):
+            self.assertTrue(replicas.pinned())
+
+    def test_stamp(self):
+        with replicas.Scope(make_request('post'), 5) as scope:
+            res = scope.stamp(response.Response('body'))
+            self.assertNotIn('Set-Cookie', res.headers)
+            replicas._local.wrote = True
+            res = scope.stamp(response.Response('body', cookies={'SESS': 'a'}))
+            self.assertIn('SESS=a', res.headers['Set-Cookie'].value)
+            self.assertIn(replicas.PIN_COOKIE, res.headers['Set-Cookie'].value)
+            self.assertEqual(res.cookies[replicas.PIN_COOKIE]['max-age'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from framework.backend import orm, search
+
+__author__ = 'Justus Adam'
+
+
+documents = {
+    1: ('Welcome', '<p>Thank you for choosing <b>dynamic_content</b></p>'),
+    2: ('Caching pages', '<p>Pages are cached, fragments are cached too</p>'),
+    3: ('Release notes', '<p>This release adds caching of pages</p>'),
+    4: ('Search', '<p>Full text search &amp; ranking</p>')
+}
+
+
+class IndexTests(object):
+    """
+    Tests run against every index implementation
+    """
+    def make_index(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.index = self.make_index()
+        self.index.clear()
+        for doc_id, (title, body) in documents.items():
+            self.index.update(doc_id, title, body)
+
+    def ids(self, text, limit=10, offset=0):
+        return [a.doc_id for a in self.index.search(text, limit, offset)]
+
+    def test_all_words_match(self):
+        self.assertEqual(set(self.ids('pages caching')), {2, 3})
+        self.assertEqual(self.ids('pages ranking'), [])
+        self.assertEqual(self.ids('  '), [])
+
+    def test_title_ranks_higher(self):
+        self.assertEqual(self.ids('caching'), [2, 3])
+
+    def test_html_is_stripped(self):
+        self.assertEqual(self.ids('ranking'), [4])
+        self.assertEqual(self.ids('amp'), [])
+        self.assertEqual(self.ids('p'), [])
+
+    def test_paging(self):
+        everything = self.ids('pages')
+        self.assertEqual(len(everything), 2)
+        self.assertEqual(
+            self.ids('pages', 1) + self.ids('pages', 1, 1), everything
+        )
+
+    def test_update_and_remove(self):
+        self.index.update(1, 'Welcome', 'Nothing about caching')
+        self.assertIn(1, self.ids('caching'))
+        self.assertEqual(self.ids('choosing'), [])
+        self.index.remove(1)
+        self.assertNotIn(1, self.ids('caching'))
+
+    def test_snippet(self):
+        hit, = self.index.search('ranking', 1)
+        self.assertIn(
+            '<b>ranking</b>', search.render_snippet(hit.snippet)
+        )
+
+
+class TestMemoryIndex(IndexTests, unittest.TestCase):
+    def make_index(self):
+        return search.MemoryIndex()
+
+
+@unittest.skipUnless(
+    search.fts5_available(orm.database_proxy), 'sqlite without FTS5'
+)
+class TestFts5Index(IndexTests, unittest.TestCase):
+    def make_index(self):
+        return search.Fts5Index(orm.database_proxy, 'test_search_index')
+
+    def tearDown(self):
+        orm.database_proxy.execute_sql('DROP TABLE "test_search_index"')
+
+
+class TestCreate(unittest.TestCase):
+    def test_kinds(self):
+        self.assertIsInstance(
+            search.create_index(kind='memory'), search.MemoryIndex
+        )
+        if search.fts5_available(orm.database_proxy):
+            index = search.create_index(table='test_create_index')
+            self.assertIsInstance(index, search.Fts5Index)
+            self.assertTrue(index.created)
+            self.assertFalse(
+                search.create_index(table='test_create_index').created
+            )
+            orm.database_proxy.execute_sql('DROP TABLE "test_create_index"')
+
+
+if __name__ == '__main__':
+    unittest.main()
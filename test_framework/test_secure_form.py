@@ -4,6 +4,7 @@ __author__ = 'Justus Adam'
 
 import unittest
 from framework.middleware import csrf
+from framework.http import coalesce, response
 import binascii
 
 
@@ -29,6 +30,13 @@ class MyTestCase(unittest.TestCase):
 
         self.assertRaises(peewee.DoesNotExist, csrf.ARToken.get, form_id=fid, token=binascii.unhexlify(token.encode()))
 
+    def test_token_makes_page_private(self):
+        coalesce.reset()
+        self.assertTrue(coalesce.shareable(response.Response(b'')))
+        csrf.new()
+        self.assertFalse(coalesce.shareable(response.Response(b'')))
+        coalesce.reset()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import unittest
+
+from framework import cache
+from framework.util import stale
+
+__author__ = 'Justus Adam'
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStaleCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = stale.StaleCache(
+            'test', 10, 20, cache.Cache(cache.MemoryBackend()), self.clock
+        )
+
+    def test_states(self):
+        self.assertEqual(self.cache.lookup('a'), (None, stale.MISS))
+        self.cache.store('a', 1)
+        self.assertEqual(self.cache.lookup('a'), (1, stale.FRESH))
+        self.clock.now = 15
+        self.assertEqual(self.cache.lookup('a'), (1, stale.STALE))
+        self.clock.now = 30
+        self.assertEqual(self.cache.lookup('a'), (None, stale.MISS))
+
+    def test_strict(self):
+        unpicklable = (a for a in ())
+        self.cache.store('a', unpicklable)
+        self.assertEqual(self.cache.lookup('a'), (None, stale.MISS))
+        self.cache.strict = True
+        self.assertRaises(TypeError, self.cache.store, 'a', unpicklable)
+
+    def test_tags(self):
+        self.cache.store(('a', 1), 1, tags=('t', ))
+        self.assertEqual(self.cache.lookup(('a', 1)), (1, stale.FRESH))
+        self.cache.cache.invalidate('t')
+        self.assertEqual(self.cache.lookup(('a', 1)), (None, stale.MISS))
+
+
+class TestFetch(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = stale.StaleCache(
+            'test', 10, 20, cache.Cache(cache.MemoryBackend()), self.clock
+        )
+        self.refresher = stale.Refresher('test-refresh')
+        self.computed = []
+
+    def compute(self):
+        self.computed.append(stale.refreshing())
+        return len(self.computed)
+
+    def fetch(self):
+        return stale.fetch(self.cache, self.refresher, 'key', self.compute)
+
+    def test_fetch(self):
+        self.assertEqual(self.fetch(), 1)
+        self.assertEqual(self.fetch(), 1)
+        self.clock.now = 15
+        # served stale, refreshed in the background
+        self.assertEqual(self.fetch(), 1)
+        self.refresher.join()
+        self.assertEqual(self.computed, [False, True])
+        self.assertEqual(self.fetch(), 2)
+
+    def test_single_refresh(self):
+        release = threading.Event()
+        self.assertTrue(self.refresher.submit('key', release.wait))
+        self.assertFalse(self.refresher.submit('key', release.wait))
+        release.set()
+        self.refresher.join()
+        self.assertTrue(self.refresher.submit('key', release.wait))
+        self.refresher.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from framework import startup
+
+__author__ = 'Justus Adam'
+
+
+class TestTimeline(unittest.TestCase):
+    def test_nesting(self):
+        timeline = startup.Timeline()
+        with timeline.span('outer', 'boot') as outer:
+            with timeline.span('inner', 'boot') as inner:
+                pass
+        self.assertEqual(timeline.events, [inner, outer])
+        self.assertAlmostEqual(outer.own, outer.duration - inner.duration)
+        self.assertEqual(inner.own, inner.duration)
+
+    def test_summary(self):
+        timeline = startup.Timeline()
+        timeline.accumulate('NameHook', 'scanner', 0.5)
+        timeline.accumulate('NameHook', 'scanner', 0.25)
+        timeline.accumulate('MatchingTypeHook', 'scanner', 1.0)
+        self.assertEqual(timeline.summary(), [
+            ('scanner', 'MatchingTypeHook', 1.0, 1),
+            ('scanner', 'NameHook', 0.75, 2)
+        ])
+        self.assertIn('NameHook', timeline.report())
+
+    def test_chrome_trace(self):
+        timeline = startup.Timeline()
+        with timeline.span('scanner', 'boot'):
+            pass
+        timeline.accumulate('queries', 'db', 0.1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'trace.json'
+            timeline.write_chrome_trace(path)
+            with path.open() as file:
+                events = json.load(file)['traceEvents']
+        self.assertEqual(
+            [(e['name'], e['ph']) for e in events],
+            [('scanner', 'X'), ('db:queries', 'C')]
+        )
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        startup.disable()
+
+    def test_disabled(self):
+        self.assertIsNone(startup.active())
+        self.assertIs(startup.span('a', 'b'), startup.null_event)
+
+    def test_imports(self):
+        with tempfile.TemporaryDirectory() as directory:
+            (pathlib.Path(directory) / 'startup_test_module.py').write_text('a = 1\n')
+            sys.path.insert(0, directory)
+            try:
+                timeline = startup.enable()
+                import startup_test_module
+                self.assertEqual(startup_test_module.a, 1)
+            finally:
+                sys.path.remove(directory)
+                sys.modules.pop('startup_test_module', None)
+        self.assertIn(
+            ('startup_test_module', 'import'),
+            [(e.name, e.category) for e in timeline.events]
+        )
+
+    def test_first_request_stops(self):
+        class Request:
+            path = '/'
+
+        timeline = startup.enable()
+        with startup.first_request(Request()):
+            pass
+        self.assertIsNone(startup.active())
+        self.assertEqual([(e.name, e.category) for e in timeline.events], [('/', 'warmup')])
+
+
+if __name__ == '__main__':
+    unittest.main()
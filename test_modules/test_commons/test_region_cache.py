@@ -0,0 +1,84 @@
+import unittest
+
+from framework import http, cache
+from framework.http import coalesce, response
+from framework.middleware import csrf
+from dycm.commons import decorator, page
+from dycm.users import login
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+class TestRegionCache(unittest.TestCase):
+    def setUp(self):
+        self.compiled = []
+        self.compile_region = decorator.compile_region
+        decorator.compile_region = self.compile
+        self.regions = decorator.RegionCache()
+        decorator.RegionCache.configure.__wrapped__(
+            self.regions, {'region_cache_ttl': 10, 'region_cache_stale': 20}
+        )
+        self.regions.cache.cache = cache.Cache(cache.MemoryBackend())
+        self.content = None
+
+    def tearDown(self):
+        decorator.compile_region = self.compile_region
+
+    def compile(self, region_name, region_config, theme, client):
+        self.compiled.append(region_name)
+        if self.content is None:
+            return len(self.compiled)
+        return page.Component(
+            decorator.wrap(region_config, region_name, [self.content])
+        )
+
+    @staticmethod
+    def request(headers=None):
+        return http.Request('localhost', 8080, '/page', 'get', {}, headers, False, None)
+
+    def get(self, request):
+        return self.regions.get(request, 'sidebar', {}, 'default_theme', None)
+
+    def test_anonymous_cached(self):
+        self.assertEqual(self.get(self.request()), 1)
+        self.assertEqual(self.get(self.request()), 1)
+        self.assertEqual(self.compiled, ['sidebar'])
+
+    def test_cookies_skip_cache(self):
+        session = {'Cookie': 'SESS=a'}
+        self.assertEqual(self.get(self.request(session)), 1)
+        self.assertEqual(self.get(self.request(session)), 2)
+        # nor did they fill the cache for anonymous clients
+        self.assertEqual(self.get(self.request()), 3)
+
+    def test_login_region(self):
+        # the sidebar of the demo, a csrf.SecureForm with frozen elements
+        self.content = login.LOGIN_COMMON
+        first = self.get(self.request())
+        cached = self.get(self.request())
+        self.assertEqual(self.compiled, ['sidebar'])
+        self.assertIsNot(cached, first)
+
+        csrf.ARToken.create_table(fail_silently=True)
+        coalesce.reset()
+        rendered = str(cached.content)
+        self.assertIn('login-form', rendered)
+        # the csrf token is created when rendering, not cached
+        self.assertFalse(coalesce.shareable(response.Response(b'')))
+        self.assertNotEqual(rendered, str(cached.content))
+        coalesce.reset()
+
+    def test_unpicklable_region_fails(self):
+        self.content = (a for a in ())
+        self.assertRaises(TypeError, self.get, self.request())
+
+    def test_disabled(self):
+        self.regions.cache.ttl = 0
+        self.get(self.request())
+        self.get(self.request())
+        self.assertEqual(len(self.compiled), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import gzip
+import pathlib
+import tempfile
+import unittest
+
+from framework.http import request
+from framework.middleware import compression
+from dycm.file import file
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+def make_request(headers):
+    return request.Request.from_path_and_post(
+        'localhost', '/public/style.css', 'get', headers, False
+    )
+
+
+class TestPrecompressed(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.directory.name)
+        with (self.root / 'style.css').open('w') as css:
+            css.write('body { margin: 0; }\n' * 200)
+        with (self.root / 'plain.css').open('w') as css:
+            css.write('p { margin: 0; }\n')
+        compression.precompress_file(self.root / 'style.css')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def serve(self, name, headers):
+        return file.serve_from.__wrapped__(
+            {}, make_request(headers), name, self.directory.name
+        )
+
+    def test_gzip_variant(self):
+        resp = self.serve('style.css', {'Accept-Encoding': 'gzip'})
+        self.assertEqual(resp.headers['Content-Encoding'].value, 'gzip')
+        self.assertEqual(resp.headers['Vary'].value, 'Accept-Encoding')
+        self.assertEqual(
+            gzip.decompress(resp.body), b'body { margin: 0; }\n' * 200
+        )
+
+    def test_plain_variant_varies(self):
+        resp = self.serve('style.css', {})
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(resp.headers['Vary'].value, 'Accept-Encoding')
+        self.assertEqual(resp.body, b'body { margin: 0; }\n' * 200)
+
+    def test_without_sibling(self):
+        resp = self.serve('plain.css', {'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertNotIn('Vary', resp.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+A content type with one field and a page in the test database
+"""
+import unittest
+
+from framework import cache, instrumentation
+from framework.backend import orm, querylog, search as backend_search
+from framework.http import request
+from dycm.commons import model as commonsmodel
+from dycm.node import cache as node_cache, content_handler, model, search
+from dycm.theming import model as theming_model
+from dycm.users import model as users_model
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+CONTENT_TYPE = 'testarticle'
+FIELD = 'testbody'
+
+EDIT_PERMISSION = 'edit content type ' + CONTENT_TYPE
+
+
+class Client(object):
+    def __init__(self, access_group, permissions, user=None):
+        self.access_group = access_group
+        self.permissions = set(permissions)
+        self.user = user
+
+    def check_permission(self, permission):
+        return permission in self.permissions
+
+
+class Request(object):
+    def __init__(self, client):
+        self.client = client
+
+
+class DcObj(object):
+    def __init__(self, client):
+        self.request = Request(client)
+
+
+def reader(access_group=1):
+    return Client(access_group, ('access content type ' + CONTENT_TYPE, ))
+
+
+def editor(access_group=2, user=None):
+    return Client(
+        access_group,
+        (
+            'access content type ' + CONTENT_TYPE,
+            EDIT_PERMISSION,
+            'add content type ' + CONTENT_TYPE
+        ),
+        user
+    )
+
+
+class NodeTestCase(unittest.TestCase):
+    """
+    Fresh tables for every test, the node cache in memory
+     and the search index in memory
+    """
+    def models(self):
+        return [
+            theming_model.Theme, model.ContentType, users_model.AccessGroup,
+            users_model.User, commonsmodel.Menu, commonsmodel.MenuItem,
+            model.Page, model.FieldType, model.FieldConfig
+        ]
+
+    def setUp(self):
+        models = self.models()
+        orm.database_proxy.drop_tables(models, safe=True)
+        orm.database_proxy.create_tables(models)
+        self.data = model.field(FIELD)
+        self.data.drop_table(fail_silently=True)
+        self.data.create_table()
+
+        theme = theming_model.Theme.create(
+            machine_name='test_theme', path='themes/test_theme'
+        )
+        self.content_type = model.ContentType.create(
+            machine_name=CONTENT_TYPE, theme=theme
+        )
+        field_type = model.FieldType.create(
+            machine_name=FIELD, handler='node.text_field_handler'
+        )
+        model.FieldConfig.create(
+            field_type=field_type, content_type=self.content_type
+        )
+        group = users_model.AccessGroup.create(machine_name='test_group')
+        self.user = users_model.User.create(
+            username='test_user', email_address='test@example.com',
+            access_group=group
+        )
+        self.page = model.Page.create(
+            content_type=self.content_type, page_title='Title',
+            creator=self.user, published=True
+        )
+        self.data.create(page_type='node', page_id=self.page.oid, content='old')
+        self.handler = content_handler.FieldBasedPageContent(self.content_type)
+
+        self.node_cache = node_cache.get_node_cache()
+        self.saved_cache = self.node_cache.cache, self.node_cache.ttl
+        self.node_cache.cache = cache.Cache(cache.MemoryBackend())
+        self.node_cache.ttl = 300
+
+        self.node_search = search.get_node_search()
+        self.saved_search = self.node_search.index, self.node_search.loaded
+        self.node_search.index = backend_search.MemoryIndex()
+        self.node_search.loaded = True
+
+    def tearDown(self):
+        self.node_cache.cache, self.node_cache.ttl = self.saved_cache
+        self.node_search.index, self.node_search.loaded = self.saved_search
+        self.data.drop_table(fail_silently=True)
+        orm.database_proxy.drop_tables(self.models(), safe=True)
+
+    def view(self, client=None):
+        return self.handler.access(DcObj(client or reader()), self.page)
+
+    def edit_query(self, content, title='Title'):
+        return {
+            'title': [title],
+            'parent-menu': ['none'],
+            FIELD: [content],
+            'published': ['on']
+        }
+
+    def field_queries(self, function):
+        """
+        :param function: callable without arguments
+        :return: number of queries function ran on the field data table
+        """
+        settings = {'query_accounting': True}
+        req = request.Request.from_path_and_post(
+            'localhost', '/node', 'get', {}, False
+        )
+        trace = instrumentation.begin(req, settings)
+        querylog.QueryAccounting.trace_started.__wrapped__(
+            querylog.QueryAccounting(), settings, req, trace
+        )
+        try:
+            function()
+            table = FIELD + '_data'
+            return sum(1 for a in querylog.current().queries if table in a.shape)
+        finally:
+            querylog._local.log = None
+            instrumentation.discard()
@@ -0,0 +1,50 @@
+from dycm.node import cache as node_cache
+
+from . import base
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+class TestNodeCache(base.NodeTestCase):
+    def test_second_view_skips_field_queries(self):
+        self.assertEqual(self.field_queries(self.view), 1)
+        self.assertEqual(self.field_queries(self.view), 0)
+        self.assertIn('old', self.view()['content'])
+
+    def test_editorial_per_access_group(self):
+        edit_link = '/node/{}/edit'.format(self.page.oid)
+        with_links = self.view(base.editor())['editorial']
+        self.assertIn(edit_link, with_links)
+        self.assertNotIn(edit_link, self.view(base.reader())['editorial'])
+        # cached per group, not per page
+        self.assertEqual(self.view(base.editor())['editorial'], with_links)
+
+    def test_edit_invalidates(self):
+        self.view()
+        self.handler.do_edit(self.page, self.edit_query('new'))
+        content = self.view()['content']
+        self.assertIn('new', content)
+        self.assertNotIn('old', content)
+
+    def test_add_invalidates(self):
+        # an entry for the oid the next page gets, e.g. left from a deleted page
+        next_oid = self.page.oid + 1
+        key = (base.CONTENT_TYPE, next_oid, 'access')
+        self.node_cache.content(*key + (lambda: 'stale', ))
+        self.handler.process_add(
+            self.edit_query('added', 'Added'), base.editor(user=self.user)
+        )
+        self.assertEqual(
+            self.node_cache.content(*key + (lambda: 'fresh', )), 'fresh'
+        )
+
+    def test_invalidate_tag(self):
+        self.view()
+        self.node_cache.cache.invalidate(node_cache.page_tag(self.page.oid))
+        self.assertEqual(self.field_queries(self.view), 1)
+
+    def test_disabled(self):
+        self.node_cache.ttl = 0
+        self.assertEqual(self.field_queries(self.view), 1)
+        self.assertEqual(self.field_queries(self.view), 1)
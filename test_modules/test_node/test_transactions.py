@@ -0,0 +1,87 @@
+from framework.backend import orm
+from dycm.node import content_handler, model
+
+from . import base
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+SECOND_FIELD = 'testsummary'
+
+
+class TestNodeWrites(base.NodeTestCase):
+    """
+    Page and field writes of an edit or an addition commit together
+    """
+    def setUp(self):
+        super().setUp()
+        self.second = model.field(SECOND_FIELD)
+        self.second.drop_table(fail_silently=True)
+        self.second.create_table()
+        model.FieldConfig.create(
+            field_type=model.FieldType.create(
+                machine_name=SECOND_FIELD, handler='node.text_field_handler'
+            ),
+            content_type=self.content_type,
+            weight=1
+        )
+        self.second.create(
+            page_type='node', page_id=self.page.oid, content='old summary'
+        )
+        self.handler = content_handler.FieldBasedPageContent(self.content_type)
+        self.assertEqual(
+            [a.name for a in self.handler.fields], [base.FIELD, SECOND_FIELD]
+        )
+
+    def tearDown(self):
+        self.second.drop_table(fail_silently=True)
+        super().tearDown()
+
+    def query(self, title='New title'):
+        query = self.edit_query('new body', title)
+        query[SECOND_FIELD] = ['new summary']
+        return query
+
+    def contents(self, data):
+        return [a.content for a in data.select().order_by(data.oid)]
+
+    def test_failed_edit_changes_nothing(self):
+        # the write of the second field fails after the first succeeded
+        self.second.drop_table()
+        self.assertRaises(
+            orm.OperationalError, self.handler.do_edit, self.page, self.query()
+        )
+        self.assertEqual(self.contents(self.data), ['old'])
+        page = model.Page.get(model.Page.oid == self.page.oid)
+        self.assertEqual(page.page_title, 'Title')
+
+    def test_failed_add_creates_nothing(self):
+        self.second.drop_table()
+        self.assertRaises(
+            orm.OperationalError,
+            self.handler.process_add,
+            self.query('Added'),
+            base.editor(user=self.user)
+        )
+        self.assertEqual(model.Page.select().count(), 1)
+        self.assertEqual(self.contents(self.data), ['old'])
+
+    def test_edit(self):
+        self.handler.do_edit(self.page, self.query())
+        self.assertEqual(self.contents(self.data), ['new body'])
+        self.assertEqual(self.contents(self.second), ['new summary'])
+        page = model.Page.get(model.Page.oid == self.page.oid)
+        self.assertEqual(page.page_title, 'New title')
+
+    def test_edit_creates_missing_field_row(self):
+        # e.g. the field was added to the content type after the page
+        self.second.delete().execute()
+        self.handler.do_edit(self.page, self.query())
+        row = self.second.get(
+            self.second.page_id == self.page.oid,
+            self.second.page_type == 'node'
+        )
+        self.assertEqual(row.content, 'new summary')
+        self.assertEqual(self.contents(self.second), ['new summary'])
+        self.assertEqual(self.contents(self.data), ['new body'])
@@ -0,0 +1,2 @@
+__author__ = 'Justus Adam'
+__version__ = '0.1'
@@ -0,0 +1,124 @@
+import unittest
+
+from framework import http
+from dycm.users import throttle
+
+__author__ = 'Justus Adam'
+__version__ = '0.1'
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestThrottle(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.throttle = throttle.Throttle(3, 60, self.clock)
+
+    def test_limit(self):
+        for _ in range(3):
+            self.assertEqual(self.throttle.retry_after('a'), 0)
+            self.throttle.hit('a')
+        self.assertEqual(self.throttle.retry_after('a'), 60)
+        self.assertEqual(self.throttle.retry_after('b'), 0)
+
+    def test_sliding_window(self):
+        for now in (0, 10, 20):
+            self.clock.now = now
+            self.throttle.hit('a')
+        self.clock.now = 30
+        # until the oldest event leaves the window
+        self.assertEqual(self.throttle.retry_after('a'), 30)
+        self.clock.now = 60
+        self.assertEqual(self.throttle.retry_after('a'), 0)
+        self.throttle.hit('a')
+        self.assertEqual(self.throttle.retry_after('a'), 10)
+
+    def test_reset(self):
+        for _ in range(3):
+            self.throttle.hit('a')
+        self.throttle.reset('a')
+        self.assertEqual(self.throttle.retry_after('a'), 0)
+
+    def test_disabled(self):
+        unlimited = throttle.Throttle(0, 60, self.clock)
+        for _ in range(10):
+            unlimited.hit('a')
+        self.assertEqual(unlimited.retry_after('a'), 0)
+
+    def test_purge(self):
+        small = throttle.Throttle(1, 60, self.clock, max_keys=2)
+        small.hit('a')
+        small.hit('b')
+        self.clock.now = 60
+        small.hit('c')
+        self.assertEqual(set(small._events), {'c'})
+
+
+class TestLoginThrottle(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.limiter = throttle.LoginThrottle()
+        self.limiter.addresses = throttle.Throttle(5, 300, self.clock)
+        self.limiter.users = throttle.Throttle(2, 300, self.clock)
+
+    def test_user_lockout(self):
+        for _ in range(2):
+            self.assertEqual(self.limiter.attempt('peter', '10.0.0.1'), 0)
+            self.limiter.failed('peter')
+        # other addresses do not help
+        self.assertEqual(self.limiter.attempt('peter', '10.0.0.2'), 300)
+        self.assertEqual(self.limiter.attempt('justus', '10.0.0.2'), 0)
+        self.clock.now = 300
+        self.assertEqual(self.limiter.attempt('peter', '10.0.0.3'), 0)
+
+    def test_address_limit(self):
+        for i in range(5):
+            self.assertEqual(self.limiter.attempt('user' + str(i), '10.0.0.1'), 0)
+            self.clock.now += 1
+        self.assertEqual(self.limiter.attempt('other', '10.0.0.1'), 295)
+        self.assertEqual(self.limiter.attempt('other', '10.0.0.2'), 0)
+        # rejected attempts are not counted
+        self.clock.now = 300
+        self.assertEqual(self.limiter.attempt('other', '10.0.0.1'), 0)
+
+    def test_success_resets(self):
+        self.limiter.failed('peter')
+        self.limiter.succeeded('peter')
+        self.limiter.failed('peter')
+        self.assertEqual(self.limiter.attempt('peter', None), 0)
+        self.limiter.failed('peter')
+        self.assertEqual(self.limiter.attempt('peter', None), 300)
+
+    def test_configure(self):
+        limiter = throttle.LoginThrottle()
+        limiter.configure.__wrapped__(limiter, {
+            'login_attempts_per_address': 0,
+            'login_failures_per_user': 1,
+            'login_throttle_window': 10
+        })
+        self.assertEqual(limiter.users.limit, 1)
+        self.assertEqual(limiter.users.window, 10)
+        self.assertEqual(limiter.addresses.limit, 0)
+
+
+class TestClientAddress(unittest.TestCase):
+    def test_header(self):
+        request = http.Request(
+            'localhost', 8080, '/login', 'post', {},
+            {'REMOTE_ADDR': '10.0.0.1'}, False, None
+        )
+        self.assertEqual(throttle.client_address(request), '10.0.0.1')
+        request = http.Request(
+            'localhost', 8080, '/login', 'post', {}, {}, False, None
+        )
+        self.assertIsNone(throttle.client_address(request))
+
+
+if __name__ == '__main__':
+    unittest.main()